@@ -9,6 +9,9 @@ This makes it easy for users to create deep learning applications.
 Python Version Required: 3.7+
 Dependencies: numpy, opencv-python>=4.5.5.64, Pillow>=9.0.1, PySide6>=6.4.2, PyYAML>=6.0, captcha>=0.4
 """
+import time
+_import_start = time.perf_counter()
+
 import platform
 import sys
 import pkg_resources
@@ -18,6 +21,10 @@ from PIL import ImageFont
 from PySide6.QtCore import QFile, QIODevice
 import warnings
 from . import RecSystem
+from .monitor.Timeline import timeline
+
+if timeline.enabled():
+    timeline.record('imports', _import_start, category='import')
 
 # Check Python version
 if not sys.version_info >= (3, 7):
@@ -49,6 +56,7 @@ current_dir = os.path.dirname(os.path.realpath(__file__))
 
 # Use os.path.join to join paths
 font_path = os.path.join(current_dir, 'GB2312.ttf')
+_font_start = time.perf_counter()
 
 try:
     fontC = ImageFont.truetype(font_path, 24)  # Set display font
@@ -76,6 +84,9 @@ except IOError:
     except Exception as e:
         raise IOError("Unable to load font from temporary file: " + str(e))
 
+if timeline.enabled():
+    timeline.record('font load', _font_start, category='font')
+
 __package_name__ = 'QtFusion'
 __version__ = '0.5.3'
 __author__ = 'Seasal Wesley'
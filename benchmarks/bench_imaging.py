@@ -0,0 +1,133 @@
+# QtFusion, AGPL-3.0 license
+"""
+Benchmark of the image utilities used on every displayed frame.
+
+Measures cv_imread throughput for JPEG and PNG files, drawRectBox with a growing number of boxes,
+cvImageToQtPixmap + scalePixmap at common resolutions and HeatmapGenerator.get_heatmap by feature channel count.
+
+    python benchmarks/bench_imaging.py [--repeat N] [--output FILE]
+"""
+import argparse
+import os
+import tempfile
+
+from common import get_app, import_qtfusion, measure, rate, synthetic_frame, write_results
+
+
+class _FeatureMaps:
+    """
+    Minimal stand-in for the output of a model layer, exposing the detach().cpu().numpy() chain get_heatmap uses.
+    """
+
+    def __init__(self, array):
+        self.array = array
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, index):
+        return _FeatureMaps(self.array[index])
+
+    def detach(self):
+        return self
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+def bench_imread(repeat):
+    import cv2
+    from QtFusion.utils import cv_imread
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        frame = synthetic_frame(1280, 720)
+        for extension in ("jpg", "png"):
+            file_path = os.path.join(directory, f"frame.{extension}")
+            cv2.imwrite(file_path, frame)
+            results[extension] = rate(measure(lambda: cv_imread(file_path), repeat, 10))
+    return results
+
+
+def bench_draw_boxes(repeat, counts=(1, 10, 50)):
+    import numpy as np
+    from QtFusion.utils import drawRectBox
+
+    frame = synthetic_frame(1280, 720)
+    rng = np.random.default_rng(1)
+    results = {}
+    for count in counts:
+        boxes = []
+        for _ in range(count):
+            x, y = int(rng.integers(0, 1100)), int(rng.integers(0, 600))
+            boxes.append((x, y, x + int(rng.integers(40, 180)), y + int(rng.integers(40, 120))))
+
+        def draw():
+            image = frame
+            for i, box in enumerate(boxes):
+                image = drawRectBox(image, box, color=(255, 56, 56), addText=f"object {i} 0.87")
+        results[f"{count}_boxes"] = rate(measure(draw, repeat), count)
+    return results
+
+
+def bench_pixmap(repeat, sizes=((640, 480), (1280, 720), (1920, 1080))):
+    from PySide6.QtCore import QSize
+    from QtFusion.utils.Pixmap import cvImageToQtPixmap, scalePixmap
+
+    get_app()
+    results = {}
+    for width, height in sizes:
+        frame = synthetic_frame(width, height)
+        target = QSize(800, 600)
+        results[f"{width}x{height}"] = {
+            "convert": rate(measure(lambda: cvImageToQtPixmap(frame), repeat, 10)),
+            "convert_and_scale": rate(measure(lambda: scalePixmap(cvImageToQtPixmap(frame), target, True),
+                                              repeat, 10)),
+        }
+    return results
+
+
+def bench_heatmap(repeat, channels=(16, 64, 256)):
+    import numpy as np
+    from QtFusion.models.Heatmap import HeatmapGenerator
+
+    frame = synthetic_frame(1280, 720)
+    rng = np.random.default_rng(2)
+    results = {}
+    for count in channels:
+        generator = HeatmapGenerator()
+        generator.hook.features = _FeatureMaps(rng.random((1, count, 80, 80), dtype=np.float32))
+        results[f"{count}_channels"] = rate(measure(lambda: generator.get_heatmap(frame), repeat))
+    return results
+
+
+def run(repeat=5):
+    """
+    Run the benchmark.
+
+    :param repeat: The number of timed rounds per case.
+    :return: A dictionary of results keyed by operation.
+    """
+    import_qtfusion()
+    results = {
+        "cv_imread": bench_imread(repeat),
+        "drawRectBox": bench_draw_boxes(repeat),
+        "pixmap": bench_pixmap(repeat),
+        "heatmap": bench_heatmap(repeat),
+    }
+    for group, cases in results.items():
+        for case, result in cases.items():
+            timing = result.get("convert_and_scale", result)
+            print(f"{group:12s} {case:16s} {timing['median_ms']:8.2f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per case")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+    print("Results written to", write_results("imaging", run(args.repeat), args.output))
@@ -0,0 +1,76 @@
+# QtFusion, AGPL-3.0 license
+"""
+Benchmark of package import time.
+
+Every import is measured in a fresh interpreter, so module caches of earlier rounds do not hide the cost. The time of
+an interpreter that only imports the benchmark helpers is reported as the baseline.
+
+    python benchmarks/bench_import.py [--repeat N] [--output FILE]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from common import write_results
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MODULES = ("QtFusion", "QtFusion.styles", "QtFusion.widgets", "QtFusion.handlers", "QtFusion.models")
+
+_SCRIPT = """
+import sys, time
+sys.path.insert(0, {bench_dir!r})
+start = time.perf_counter()
+from common import import_qtfusion
+if {module!r}:
+    import importlib
+    import_qtfusion()
+    importlib.import_module({module!r})
+print(time.perf_counter() - start)
+"""
+
+
+def time_import(module, repeat):
+    """
+    Import a module in fresh interpreters.
+
+    :param module: The module name, or '' for the baseline.
+    :param repeat: The number of interpreters to start.
+    :return: A dictionary with the median, minimum and maximum import time in milliseconds.
+    """
+    rounds = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", _SCRIPT.format(bench_dir=BENCH_DIR, module=module)],
+                                capture_output=True, text=True, check=True).stdout
+        rounds.append(float(output.strip().splitlines()[-1]) * 1000)
+    return {"median_ms": statistics.median(rounds), "min_ms": min(rounds), "max_ms": max(rounds), "repeat": repeat}
+
+
+def run(repeat=5):
+    """
+    Run the benchmark.
+
+    :param repeat: The number of fresh interpreters per module.
+    :return: A dictionary of results keyed by module name.
+    """
+    results = {"baseline": time_import("", repeat)}
+    for module in MODULES:
+        try:
+            results[module] = time_import(module, repeat)
+        except subprocess.CalledProcessError as e:
+            results[module] = {"error": e.stderr.strip().splitlines()[-1] if e.stderr else str(e)}
+    for module, result in results.items():
+        if "error" in result:
+            print(f"{module:20s} failed: {result['error']}")
+        else:
+            print(f"{module:20s} {result['median_ms']:8.2f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+    print("Results written to", write_results("import", run(args.repeat), args.output))
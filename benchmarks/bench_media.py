@@ -0,0 +1,74 @@
+# QtFusion, AGPL-3.0 license
+"""
+Benchmark of the MediaHandler frame loop on a generated video.
+
+Writes a test video with cv2.VideoWriter and measures the frames per second of plain cv2.VideoCapture reads and of
+MediaHandler._grabFrame (read, frame processors, frameReady emission) with metrics disabled and enabled.
+
+    python benchmarks/bench_media.py [--repeat N] [--frames N] [--output FILE]
+"""
+import argparse
+import os
+import tempfile
+
+from common import get_app, import_qtfusion, make_video, measure, rate, write_results
+
+
+def _blur(image):
+    import cv2
+    return cv2.GaussianBlur(image, (5, 5), 0)
+
+
+def run(repeat=5, frames=120):
+    """
+    Run the benchmark.
+
+    :param repeat: The number of timed rounds per case.
+    :param frames: The number of frames in the generated video.
+    :return: A dictionary of results keyed by case.
+    """
+    import cv2
+    import_qtfusion()
+    from QtFusion.handlers import MediaHandler
+
+    get_app()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        video = make_video(os.path.join(directory, "test.avi"), frames)
+
+        def read_only():
+            cap = cv2.VideoCapture(video)
+            while cap.read()[0]:
+                pass
+            cap.release()
+
+        results["VideoCapture.read"] = rate(measure(read_only, repeat), frames)
+
+        for variant, metrics in (("MediaHandler", False), ("MediaHandler+metrics", True)):
+            handler = MediaHandler(video)
+            handler.addFrameProcessor(_blur)
+            handler.frameReady.connect(lambda image: None)
+            handler.enableMetrics(metrics)
+
+            def grab_all():
+                handler.cap.open(video)
+                for _ in range(frames):
+                    handler._grabFrame()
+                handler.cap.release()
+
+            results[variant] = rate(measure(grab_all, repeat), frames)
+            if metrics:
+                results[variant]["stages"] = handler.get_metrics()["stages"]
+
+    for name, result in results.items():
+        print(f"{name:22s} {result['per_second']:8.1f} frames/s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per case")
+    parser.add_argument("--frames", type=int, default=120, help="frames in the generated video")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+    print("Results written to", write_results("media", run(args.repeat, args.frames), args.output))
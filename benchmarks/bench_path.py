@@ -0,0 +1,69 @@
+# QtFusion, AGPL-3.0 license
+"""
+Benchmark of the path helpers on synthetic directory trees.
+
+Builds trees of increasing size in a temporary directory and measures get_size on the tree and list_files on a flat
+directory.
+
+    python benchmarks/bench_path.py [--repeat N] [--output FILE]
+"""
+import argparse
+import os
+import tempfile
+
+from common import import_qtfusion, measure, rate, write_results
+
+
+def build_tree(root, depth, fanout, files):
+    """
+    Create a directory tree with 'files' small files per directory.
+
+    :return: The number of files created.
+    """
+    created = 0
+    for i in range(files):
+        with open(os.path.join(root, f"file_{i}.bin"), "wb") as file:
+            file.write(b"\0" * (128 + i))
+        created += 1
+    if depth > 0:
+        for i in range(fanout):
+            child = os.path.join(root, f"dir_{i}")
+            os.mkdir(child)
+            created += build_tree(child, depth - 1, fanout, files)
+    return created
+
+
+def run(repeat=5, shapes=((2, 4, 10), (3, 5, 10), (3, 8, 20))):
+    """
+    Run the benchmark.
+
+    :param repeat: The number of timed rounds per case.
+    :param shapes: (depth, fanout, files per directory) of the generated trees.
+    :return: A dictionary of results keyed by function and tree size.
+    """
+    import_qtfusion()
+    from QtFusion.path import get_size, list_files
+
+    results = {"get_size": {}, "list_files": {}}
+    for depth, fanout, files in shapes:
+        with tempfile.TemporaryDirectory() as root:
+            count = build_tree(root, depth, fanout, files)
+            results["get_size"][f"{count}_files"] = rate(measure(lambda: get_size(root), repeat), count)
+
+    for count in (100, 1000, 10000):
+        with tempfile.TemporaryDirectory() as root:
+            build_tree(root, 0, 0, count)
+            results["list_files"][f"{count}_files"] = rate(measure(lambda: list_files(root), repeat), count)
+
+    for function, cases in results.items():
+        for case, result in cases.items():
+            print(f"{function:10s} {case:12s} {result['median_ms']:8.2f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per case")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+    print("Results written to", write_results("path", run(args.repeat), args.output))
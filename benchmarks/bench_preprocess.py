@@ -0,0 +1,72 @@
+# QtFusion, AGPL-3.0 license
+"""
+Benchmark of detector preprocessing: the usual per-frame letterbox implementation against models.Preprocessor.
+
+Both variants produce the same NCHW float32 RGB tensor scaled to [0, 1]. The naive variant allocates new arrays at
+every step (letterbox, colour conversion, transposition, dtype conversion, batch stacking), the Preprocessor writes
+into its preallocated batch.
+
+    python benchmarks/bench_preprocess.py [--repeat N] [--imgsz N] [--output FILE]
+"""
+import argparse
+
+from common import import_qtfusion, measure, rate, synthetic_frame, write_results
+
+SHAPES = ((480, 640), (720, 1280), (1080, 1920), (2160, 3840))
+
+
+def naive_preprocess(images, imgsz):
+    """
+    The per-frame preprocessing most Detector subclasses implement by hand.
+    """
+    import cv2
+    import numpy as np
+    from QtFusion.models.Preprocess import letterbox
+
+    batch = []
+    for image in images:
+        image = letterbox(image, imgsz)[0]
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB).transpose(2, 0, 1)
+        batch.append(np.ascontiguousarray(image).astype(np.float32) / 255.0)
+    return np.stack(batch)
+
+
+def run(repeat=5, imgsz=640, batch_sizes=(1, 8)):
+    """
+    Run the benchmark.
+
+    :param repeat: The number of timed rounds per case.
+    :param imgsz: The model input size.
+    :param batch_sizes: The batch sizes to measure.
+    :return: A dictionary of results keyed by variant, input resolution and batch size.
+    """
+    import numpy as np
+    import_qtfusion()
+    from QtFusion.models.Preprocess import Preprocessor
+
+    results = {"naive": {}, "Preprocessor": {}}
+    for height, width in SHAPES:
+        frame = synthetic_frame(width, height)
+        for batch_size in batch_sizes:
+            images = [frame] * batch_size
+            preprocessor = Preprocessor(imgsz, batch_size)
+            if not np.allclose(naive_preprocess(images, imgsz), preprocessor(images)[0], atol=1e-6):
+                raise AssertionError("Preprocessor output differs from the naive implementation")
+            case = f"{width}x{height}_b{batch_size}"
+            results["naive"][case] = rate(measure(lambda: naive_preprocess(images, imgsz), repeat, 10), batch_size)
+            results["Preprocessor"][case] = rate(measure(lambda: preprocessor(images), repeat, 10), batch_size)
+
+    for case, naive in results["naive"].items():
+        fast = results["Preprocessor"][case]
+        print(f"{case:16s} naive {naive['median_ms']:8.2f} ms  Preprocessor {fast['median_ms']:8.2f} ms  "
+              f"x{naive['median_ms'] / fast['median_ms']:.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per case")
+    parser.add_argument("--imgsz", type=int, default=640, help="model input size")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+    print("Results written to", write_results("preprocess", run(args.repeat, args.imgsz), args.output))
@@ -0,0 +1,87 @@
+# QtFusion, AGPL-3.0 license
+"""
+Benchmark of style sheet application per bundled theme.
+
+For every theme the time of QWidget.setStyleSheet on a populated window is measured twice: with the source text as
+read from qss/ (the behaviour before the theme bundle) and with the minified text served from qss/themes.qssb.
+
+    python benchmarks/bench_qss.py [--repeat N] [--output FILE]
+"""
+import argparse
+import os
+
+from common import REPO_DIR, get_app, import_qtfusion, measure, write_results
+
+
+def build_window(rows=20):
+    """
+    Build a window with a representative mix of widgets.
+
+    :param rows: The number of widget rows to create.
+    :return: The top-level widget, already shown.
+    """
+    from PySide6.QtWidgets import (QCheckBox, QComboBox, QGridLayout, QLabel, QLineEdit, QProgressBar, QPushButton,
+                                   QTableWidget, QToolButton, QWidget)
+    window = QWidget()
+    layout = QGridLayout(window)
+    for row in range(rows):
+        layout.addWidget(QLabel(f"Label {row}"), row, 0)
+        layout.addWidget(QLineEdit(f"Edit {row}"), row, 1)
+        layout.addWidget(QPushButton(f"Button {row}"), row, 2)
+        layout.addWidget(QToolButton(), row, 3)
+        layout.addWidget(QCheckBox(f"Check {row}"), row, 4)
+        combo = QComboBox()
+        combo.addItems(["a", "b", "c"])
+        layout.addWidget(combo, row, 5)
+        layout.addWidget(QProgressBar(), row, 6)
+    layout.addWidget(QTableWidget(50, 6), rows, 0, 1, 7)
+    window.show()
+    get_app().processEvents()
+    return window
+
+
+def run(repeat=5):
+    """
+    Run the benchmark.
+
+    :param repeat: The number of timed rounds per theme and variant.
+    :return: A dictionary of results keyed by theme name.
+    """
+    import_qtfusion()
+    from QtFusion.styles import BaseStyle, StyleRegistry
+    from QtFusion.styles.QssBundle import BUNDLE_NAME
+
+    app = get_app()
+    window = build_window()
+    qss_dir = os.path.join(REPO_DIR, "qss")
+    styles = {name: os.path.join(qss_dir, os.path.basename(path)) for name, path in BaseStyle._styles.items()}
+    source = StyleRegistry(styles)
+    bundled = StyleRegistry(styles, bundle=os.path.join(qss_dir, BUNDLE_NAME))
+    if bundled._bundle is None:
+        raise RuntimeError(f"Theme bundle not found in {qss_dir}, build it with python -m QtFusion.styles.QssBundle")
+
+    def apply(text):
+        window.setStyleSheet("")
+        window.setStyleSheet(text)
+        app.processEvents()
+
+    results = {}
+    for name in source.names():
+        source_text, bundled_text = source.get_text(name), bundled.get_text(name)
+        results[name] = {
+            "source_chars": len(source_text),
+            "bundled_chars": len(bundled_text),
+            "source": measure(lambda: apply(source_text), repeat),
+            "bundled": measure(lambda: apply(bundled_text), repeat),
+        }
+        print(f"{name:12s} {results[name]['source']['median_ms']:8.2f} ms -> "
+              f"{results[name]['bundled']['median_ms']:8.2f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per theme and variant")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+    print("Results written to", write_results("qss", run(args.repeat), args.output))
@@ -0,0 +1,101 @@
+# QtFusion, AGPL-3.0 license
+"""
+Benchmark of window setup from settings files.
+
+Generates a YAML settings file for a window with many labels, buttons and icons and measures loadYamlSettings with a
+cold and a warm YAML cache, then measures loadQssStyles and the StyleRegistry for a few themes on the same window.
+Per-theme source vs. bundled numbers are produced by bench_qss.py.
+
+    python benchmarks/bench_settings.py [--repeat N] [--widgets N] [--output FILE]
+"""
+import argparse
+import os
+import tempfile
+
+import yaml
+
+from common import REPO_DIR, get_app, import_qtfusion, measure, write_results
+
+THEMES = ("Aqua.qss", "DarkGreen.qss", "MacOS.qss")
+
+
+def build_settings(directory, widgets):
+    """
+    Write a YAML settings file and build the matching window.
+
+    :param directory: The directory the YAML file is written to.
+    :param widgets: The number of label/button pairs.
+    :return: A (window, yaml_file) tuple.
+    """
+    from PySide6.QtWidgets import QGridLayout, QLabel, QPushButton, QWidget
+    window = QWidget()
+    layout = QGridLayout(window)
+    icon = os.path.join(REPO_DIR, "default_icons", "home.png")
+    settings = {}
+    for i in range(widgets):
+        label, button = QLabel(objectName=f"label_{i}"), QPushButton(objectName=f"button_{i}")
+        layout.addWidget(label, i, 0)
+        layout.addWidget(button, i, 1)
+        settings[f"label_{i}"] = {"type": "QLabel", "text": f"Label {i}"}
+        settings[f"button_{i}"] = {"type": "QPushButton", "text": f"Button {i}", "icon": icon}
+    yaml_file = os.path.join(directory, "settings.yaml")
+    with open(yaml_file, "w", encoding="utf-8") as file:
+        yaml.safe_dump(settings, file, allow_unicode=True)
+    window.show()
+    get_app().processEvents()
+    return window, yaml_file
+
+
+def run(repeat=5, widgets=100):
+    """
+    Run the benchmark.
+
+    :param repeat: The number of timed rounds per case.
+    :param widgets: The number of label/button pairs in the generated settings.
+    :return: A dictionary of results.
+    """
+    import_qtfusion()
+    from QtFusion.styles import StyleRegistry, clearYamlCache, loadQssStyles, loadYamlSettings
+
+    app = get_app()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        window, yaml_file = build_settings(directory, widgets)
+
+        def cold():
+            clearYamlCache()
+            loadYamlSettings(window, yaml_file, REPO_DIR)
+
+        results["yaml_cold"] = measure(cold, repeat)
+        results["yaml_warm"] = measure(lambda: loadYamlSettings(window, yaml_file, REPO_DIR), repeat)
+
+        registry = StyleRegistry({theme: os.path.join(REPO_DIR, "qss", theme) for theme in THEMES})
+        for theme in THEMES:
+            qss_file = os.path.join(REPO_DIR, "qss", theme)
+
+            def load_qss():
+                window.setStyleSheet("")
+                loadQssStyles(window, qss_file, REPO_DIR)
+                app.processEvents()
+
+            def registry_apply():
+                window.setStyleSheet("")
+                registry.apply(window, theme)
+                app.processEvents()
+
+            results[f"loadQssStyles:{theme}"] = measure(load_qss, repeat)
+            results[f"registry:{theme}"] = measure(registry_apply, repeat)
+        window.close()
+
+    for name, result in results.items():
+        print(f"{name:28s} {result['median_ms']:8.2f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per case")
+    parser.add_argument("--widgets", type=int, default=100, help="label/button pairs in the generated settings")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+    print("Results written to", write_results("settings", run(args.repeat, args.widgets), args.output))
@@ -0,0 +1,101 @@
+# QtFusion, AGPL-3.0 license
+"""
+Benchmark of result table updates.
+
+Inserts detection rows with updateTable into a QTableWidget and into a QTableView backed by a DetectionTableModel,
+and appends array batches to an ArrayTableModel, processing events after each batch as a running application would.
+
+    python benchmarks/bench_table.py [--repeat N] [--rows N] [--output FILE]
+"""
+import argparse
+
+from common import get_app, import_qtfusion, measure, rate, write_results
+
+HEADERS = ["#", "File", "Class", "Score", "Box", "Time"]
+
+
+def _rows(count):
+    return [(f"frame_{i}.jpg", "person", 0.87, [120, 48, 360, 420], f"{i * 0.033:.3f}") for i in range(count)]
+
+
+def bench_table_widget(rows):
+    from PySide6.QtWidgets import QTableWidget
+    from QtFusion.widgets import updateTable
+
+    app, data = get_app(), _rows(rows)
+
+    def insert():
+        table = QTableWidget(0, len(HEADERS))
+        table.show()
+        for i, row in enumerate(data):
+            updateTable(table, i, *row)
+        app.processEvents()
+    return insert
+
+
+def bench_detection_model(rows):
+    from PySide6.QtWidgets import QTableView
+    from QtFusion.widgets import DetectionTableModel, attachTableModel, updateTable
+
+    app, data = get_app(), _rows(rows)
+
+    def insert():
+        view = QTableView()
+        model = DetectionTableModel(HEADERS, max_rows=max(rows, 1000))
+        attachTableModel(view, model)
+        view.show()
+        for i, row in enumerate(data):
+            updateTable(view, i, *row)
+        model.flush()
+        app.processEvents()
+    return insert
+
+
+def bench_array_model(rows, batch=100):
+    import numpy as np
+    from PySide6.QtWidgets import QTableView
+    from QtFusion.widgets import ArrayTableModel, attachTableModel
+
+    app = get_app()
+    rng = np.random.default_rng(3)
+    times, classes = np.arange(batch) * 0.033, rng.integers(0, 80, batch)
+    scores, boxes = rng.random(batch), rng.random((batch, 4)) * 640
+
+    def insert():
+        view = QTableView()
+        model = ArrayTableModel([("Time", "f8"), ("Class", "i4"), ("Score", "f4"), ("Box", "f4", 4)])
+        attachTableModel(view, model)
+        view.show()
+        for _ in range(rows // batch):
+            model.appendArrays(times, classes, scores, boxes)
+            model.flush()
+            app.processEvents()
+    return insert
+
+
+def run(repeat=5, rows=1000):
+    """
+    Run the benchmark.
+
+    :param repeat: The number of timed rounds per case.
+    :param rows: The number of rows inserted per round.
+    :return: A dictionary of results keyed by table implementation.
+    """
+    import_qtfusion()
+    results = {
+        "QTableWidget": rate(measure(bench_table_widget(rows), repeat), rows),
+        "DetectionTableModel": rate(measure(bench_detection_model(rows), repeat), rows),
+        "ArrayTableModel": rate(measure(bench_array_model(rows), repeat), rows),
+    }
+    for name, result in results.items():
+        print(f"{name:20s} {result['median_ms']:8.2f} ms for {rows} rows ({result['per_second']:.0f} rows/s)")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per case")
+    parser.add_argument("--rows", type=int, default=1000, help="rows inserted per round")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+    print("Results written to", write_results("table", run(args.repeat, args.rows), args.output))
@@ -0,0 +1,64 @@
+# QtFusion, AGPL-3.0 license
+"""
+Benchmark of UserManager operations on a temporary SQLite database.
+
+Measures register, get_user, verify_login and change_password with and without the lookup cache.
+
+    python benchmarks/bench_users.py [--repeat N] [--users N] [--output FILE]
+"""
+import argparse
+import os
+import tempfile
+
+from common import import_qtfusion, measure, rate, write_results
+
+
+def bench_manager(repeat, users, cache_size):
+    from QtFusion.manager import UserManager
+
+    names = [f"user{i:05d}" for i in range(users)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        manager = UserManager(os.path.join(directory, "users.db"), cache_size=cache_size)
+        counter = iter(range(10 ** 9))
+
+        def register():
+            round_id = next(counter)
+            for name in names:
+                manager.register(f"{name}_{round_id}", "secret123", "")
+
+        results["register"] = rate(measure(register, repeat), users)
+        for name in names:
+            manager.register(name, "secret123", "")
+        results["get_user"] = rate(measure(lambda: [manager.get_user(name) for name in names], repeat), users)
+        results["verify_login"] = rate(measure(lambda: [manager.verify_login(name, "secret123") for name in names],
+                                               repeat), users)
+        results["change_password"] = rate(measure(lambda: [manager.change_password(name, "secret456")
+                                                           for name in names[:50]], repeat), 50)
+        manager.conn.close()
+    return results
+
+
+def run(repeat=5, users=200):
+    """
+    Run the benchmark.
+
+    :param repeat: The number of timed rounds per operation.
+    :param users: The number of users per round.
+    :return: A dictionary of results keyed by cache configuration and operation.
+    """
+    import_qtfusion()
+    results = {"uncached": bench_manager(repeat, users, 0), "cached": bench_manager(repeat, users, users * 2)}
+    for variant, operations in results.items():
+        for operation, result in operations.items():
+            print(f"{variant:9s} {operation:16s} {result['per_second']:10.0f} ops/s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per operation")
+    parser.add_argument("--users", type=int, default=200, help="users per round")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+    print("Results written to", write_results("users", run(args.repeat, args.users), args.output))
@@ -0,0 +1,140 @@
+# QtFusion, AGPL-3.0 license
+"""
+Shared helpers for the QtFusion benchmarks.
+
+The benchmarks run headless: the offscreen Qt platform is selected before PySide6 is imported, and QtFusion is
+imported either from the installed package or, when running from a source checkout, from the repository directory.
+"""
+import importlib
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")  # Ignored by git.
+
+
+def import_qtfusion():
+    """
+    Import QtFusion, falling back to the source checkout this benchmark lives in.
+
+    :return: The QtFusion package module.
+    """
+    try:
+        return importlib.import_module("QtFusion")
+    except ImportError:
+        spec = importlib.util.spec_from_file_location("QtFusion", os.path.join(REPO_DIR, "__init__.py"),
+                                                      submodule_search_locations=[REPO_DIR])
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["QtFusion"] = module
+        spec.loader.exec_module(module)
+        return module
+
+
+def get_app():
+    """
+    Get the QApplication instance, creating one if needed.
+
+    :return: The QApplication instance.
+    """
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def measure(func, repeat=5, number=1):
+    """
+    Time a callable.
+
+    :param func: The callable to time. It is called without arguments.
+    :param repeat: The number of timed rounds.
+    :param number: The number of calls per round.
+    :return: A dictionary with the median, minimum and maximum time per call in milliseconds.
+    """
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) * 1000 / number)
+    return {"median_ms": statistics.median(rounds), "min_ms": min(rounds), "max_ms": max(rounds),
+            "repeat": repeat, "number": number}
+
+
+def write_results(name, results, output=None):
+    """
+    Write benchmark results to a JSON file together with information about the environment.
+
+    :param name: The name of the benchmark.
+    :param results: The benchmark results.
+    :param output: The output file. Defaults to '<name>.json' in benchmarks/results.
+    :return: The path of the written file.
+    """
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{name}.json")
+    document = {
+        "benchmark": name,
+        "python": platform.python_version(),
+        "platform": f"{platform.system()} {platform.release()}",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(document, file, indent=2)
+    return output
+
+
+def synthetic_frame(width=1280, height=720, seed=0):
+    """
+    Create a reproducible BGR test frame with smooth gradients and noise, which compresses like a camera image.
+
+    :param width: The frame width.
+    :param height: The frame height.
+    :param seed: The random seed.
+    :return: A uint8 array of shape (height, width, 3).
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=2)
+    frame += rng.normal(0, 12, frame.shape).astype(np.float32)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def make_video(file_path, frames=120, width=640, height=480, fps=30):
+    """
+    Write a synthetic test video with cv2.VideoWriter.
+
+    :param file_path: The output file; the extension selects the container ('.avi' uses MJPG).
+    :param frames: The number of frames.
+    :param width: The frame width.
+    :param height: The frame height.
+    :param fps: The frame rate.
+    :return: The path of the written file.
+    """
+    import cv2
+    writer = cv2.VideoWriter(file_path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    base = synthetic_frame(width, height)
+    for i in range(frames):
+        writer.write(cv2.putText(base.copy(), str(i), (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3))
+    writer.release()
+    return file_path
+
+
+def rate(result, items=1):
+    """
+    Add an items-per-second figure to a result of measure().
+
+    :param result: The dictionary returned by measure().
+    :param items: The number of items processed per call.
+    :return: The same dictionary.
+    """
+    result["per_second"] = items * 1000 / result["median_ms"] if result["median_ms"] else float("inf")
+    return result
@@ -0,0 +1,69 @@
+# QtFusion, AGPL-3.0 license
+"""
+Compare two benchmark result files, e.g. from two QtFusion versions.
+
+Every timing (an entry with a 'median_ms' value) present in both files is listed with its change. Timings that got
+slower by more than the threshold are reported as regressions, and the exit status is 1 if there are any.
+
+    python benchmarks/compare.py baseline.json candidate.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+
+
+def collect(node, prefix=""):
+    """
+    Flatten the timings of a result document.
+
+    :param node: A (nested) result dictionary.
+    :param prefix: The path of 'node' in the document.
+    :return: A dictionary mapping 'benchmark/case/...' paths to median milliseconds.
+    """
+    timings = {}
+    if isinstance(node, dict):
+        if isinstance(node.get("median_ms"), (int, float)):
+            timings[prefix] = node["median_ms"]
+        for key, value in node.items():
+            if isinstance(value, dict):
+                timings.update(collect(value, f"{prefix}/{key}" if prefix else key))
+    return timings
+
+
+def compare(baseline, candidate, threshold=10.0):
+    """
+    Compare the timings of two result documents.
+
+    :param baseline: The baseline document.
+    :param candidate: The candidate document.
+    :param threshold: The slowdown in percent above which a timing counts as a regression.
+    :return: A list of (path, baseline ms, candidate ms, change in percent, is regression) tuples.
+    """
+    before, after = collect(baseline.get("results", baseline)), collect(candidate.get("results", candidate))
+    rows = []
+    for path in sorted(before.keys() & after.keys()):
+        old, new = before[path], after[path]
+        change = (new - old) / old * 100 if old else 0.0
+        rows.append((path, old, new, change, change > threshold))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", help="result file of the baseline version")
+    parser.add_argument("candidate", help="result file of the candidate version")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline_doc = json.load(file)
+    with open(args.candidate, encoding="utf-8") as file:
+        candidate_doc = json.load(file)
+
+    comparison = compare(baseline_doc, candidate_doc, args.threshold)
+    width = max((len(row[0]) for row in comparison), default=10)
+    for path, old, new, change, regression in comparison:
+        print(f"{path:{width}s} {old:10.2f} ms {new:10.2f} ms {change:+7.1f}%{'  REGRESSION' if regression else ''}")
+    regressions = sum(row[4] for row in comparison)
+    print(f"{len(comparison)} timings compared, {regressions} regression(s) above {args.threshold:.0f}%")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,47 @@
+# QtFusion, AGPL-3.0 license
+"""
+Run every QtFusion benchmark and write the combined results to one JSON file.
+
+A benchmark that cannot run (for example because an optional dependency is missing) is recorded with its error
+instead of stopping the run. Compare two result files with compare.py.
+
+    python benchmarks/run_all.py [--repeat N] [--only NAME ...] [--output FILE]
+"""
+import argparse
+import importlib
+import time
+import traceback
+
+from common import write_results
+
+BENCHMARKS = ("import", "imaging", "media", "preprocess", "table", "users", "settings", "qss", "path")
+
+
+def run(names=BENCHMARKS, repeat=5):
+    """
+    Run the selected benchmarks.
+
+    :param names: The benchmark names, i.e. the module names without the 'bench_' prefix.
+    :param repeat: The number of timed rounds passed to every benchmark.
+    :return: A dictionary of results keyed by benchmark name.
+    """
+    results = {}
+    for name in names:
+        print(f"== {name}")
+        start = time.perf_counter()
+        try:
+            results[name] = importlib.import_module(f"bench_{name}").run(repeat=repeat)
+        except Exception as e:
+            traceback.print_exc()
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        print(f"-- {name} finished in {time.perf_counter() - start:.1f} s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per case")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS, help="benchmarks to run")
+    parser.add_argument("--output", default=None, help="output JSON file (default: benchmarks/results/all.json)")
+    args = parser.parse_args()
+    print("Results written to", write_results("all", run(args.only, args.repeat), args.output))
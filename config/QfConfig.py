@@ -9,6 +9,7 @@ sessions.
 
 Features:
 - Enable or disable verbose output globally.
+- Enable or disable the startup timeline (see QtFusion.monitor.Timeline).
 - Save and load configuration settings to and from a file.
 - Reset configuration to default values.
 
@@ -17,6 +18,7 @@ settings.
 """
 
 import json
+import os
 
 
 class QF_Config:
@@ -30,6 +32,8 @@ class QF_Config:
     """
 
     VERBOSE = True
+    # Startup profiling can also be switched on before import with QTFUSION_PROFILE_STARTUP=1
+    PROFILE_STARTUP = os.environ.get('QTFUSION_PROFILE_STARTUP', '') not in ('', '0')
 
     @classmethod
     def set_verbose(cls, mode=True):
@@ -45,13 +49,27 @@ class QF_Config:
         """
         return cls.VERBOSE
 
+    @classmethod
+    def set_profile_startup(cls, mode=True):
+        """
+        Enable or disable recording of the startup timeline.
+        """
+        cls.PROFILE_STARTUP = mode
+
+    @classmethod
+    def is_profile_startup(cls):
+        """
+        Check if the startup timeline is being recorded.
+        """
+        return cls.PROFILE_STARTUP
+
     @classmethod
     def save_config(cls, file_path):
         """
         Save the current configuration to a file.
         """
         with open(file_path, 'w') as file:
-            json.dump({'VERBOSE': cls.VERBOSE}, file)
+            json.dump({'VERBOSE': cls.VERBOSE, 'PROFILE_STARTUP': cls.PROFILE_STARTUP}, file)
 
     @classmethod
     def load_config(cls, file_path):
@@ -61,6 +79,7 @@ class QF_Config:
         with open(file_path, 'r') as file:
             config = json.load(file)
             cls.VERBOSE = config.get('VERBOSE', True)
+            cls.PROFILE_STARTUP = config.get('PROFILE_STARTUP', False)
 
     @classmethod
     def reset_config(cls):
@@ -68,3 +87,4 @@ class QF_Config:
         Reset configuration to default values.
         """
         cls.VERBOSE = True
+        cls.PROFILE_STARTUP = False
@@ -0,0 +1,366 @@
+# QtFusion, AGPL-3.0 license
+"""
+Integration of asyncio with the Qt event loop.
+
+AsyncBridge owns an asyncio event loop and runs it in small steps from a QTimer in the GUI thread, so coroutines can
+await network clients, worker threads and Qt signals without blocking the interface and without a polling loop of
+their own. Everything runs in the GUI thread, which means coroutines may update widgets directly. A step only runs
+when there is work: a QSocketNotifier on every file descriptor of the asyncio selector (including the self-pipe
+written by call_soon_threadsafe(), e.g. when an executor job finishes) wakes the bridge, and asyncio timers schedule
+the next step for their due time. An idle bridge therefore costs no CPU time.
+
+The helpers mediaFrames() and processImages() implement MediaHandler.frames() and ImageHandler.process_async():
+
+    async for frame in media_handler.frames():
+        ...
+    image = await image_handler.process_async('image.jpg')
+"""
+import asyncio
+import imghdr
+import math
+import os
+import selectors
+import sys
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QObject, QSocketNotifier, QTimer
+
+from ..utils.ImageUtils import cv_imread
+
+_END = object()  # Marks the end of a frame stream.
+
+
+class _NotifyingSelector(selectors.DefaultSelector):
+    """
+    A selector that watches its registered file descriptors with QSocketNotifiers and calls 'wakeup' when one becomes
+    ready. A notifier is disabled after it has fired until rearm() is called, so Qt does not report the same ready
+    descriptor again before the asyncio loop has handled it.
+    """
+
+    _TYPES = ((selectors.EVENT_READ, QSocketNotifier.Read), (selectors.EVENT_WRITE, QSocketNotifier.Write))
+
+    def __init__(self, wakeup, parent):
+        super().__init__()
+        self._wakeup = wakeup
+        self._parent = parent
+        self._notifiers = {}  # fd -> list of QSocketNotifier
+
+    def register(self, fileobj, events, data=None):
+        key = super().register(fileobj, events, data)
+        self._watch(key.fd, events)
+        return key
+
+    def unregister(self, fileobj):
+        key = super().unregister(fileobj)
+        self._watch(key.fd, 0)
+        return key
+
+    def modify(self, fileobj, events, data=None):
+        key = super().modify(fileobj, events, data)
+        self._watch(key.fd, events)
+        return key
+
+    def close(self):
+        for fd in list(self._notifiers):
+            self._watch(fd, 0)
+        super().close()
+
+    def rearm(self):
+        """
+        Enables the notifiers that fired since the last call.
+        """
+        for notifiers in self._notifiers.values():
+            for notifier in notifiers:
+                if not notifier.isEnabled():
+                    notifier.setEnabled(True)
+
+    def _watch(self, fd, events):
+        for notifier in self._notifiers.pop(fd, ()):
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+        notifiers = [QSocketNotifier(fd, kind, self._parent) for event, kind in self._TYPES if events & event]
+        for notifier in notifiers:
+            notifier.activated.connect(lambda *args, notifier=notifier: self._activated(notifier))
+        if notifiers:
+            self._notifiers[fd] = notifiers
+
+    def _activated(self, notifier):
+        notifier.setEnabled(False)
+        self._wakeup()
+
+
+class AsyncBridge(QObject):
+    """
+    Runs an asyncio event loop inside the Qt event loop.
+
+    Every step processes the ready callbacks of the asyncio loop and polls its selector without blocking. The next step
+    is scheduled immediately while callbacks are ready, when a watched file descriptor becomes ready, and at the next
+    asyncio timer. The proactor loop used on Windows has no descriptors to watch, so there the bridge also steps after
+    'interval' milliseconds at the latest, which bounds the latency of I/O completions. The same bound applies if the
+    loop does not expose the ready and scheduled queues of asyncio.BaseEventLoop.
+    """
+
+    def __init__(self, interval=10, parent=None):
+        """
+        Initializes the bridge and starts stepping a new asyncio event loop.
+
+        :param interval: The longest time between two steps in milliseconds on Windows, or if the loop does not
+                         expose its queues. Default is 10.
+        :param parent: The parent QObject. Default is None.
+        """
+        super().__init__(parent)
+        self.interval = interval
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._step)
+        if sys.platform == 'win32':
+            self._selector = None
+            self._loop = asyncio.new_event_loop()
+        else:
+            self._selector = _NotifyingSelector(self.wakeup, self)
+            self._loop = asyncio.SelectorEventLoop(self._selector)
+        self._timer.start(0)
+
+    @property
+    def loop(self):
+        """
+        The asyncio event loop run by the bridge.
+        """
+        return self._loop
+
+    def wakeup(self):
+        """
+        Schedules the next step as soon as Qt is idle, e.g. after a Qt slot has resolved an asyncio future.
+        """
+        if not self._loop.is_closed():
+            self._timer.start(0)
+
+    def create_task(self, coro):
+        """
+        Schedules a coroutine on the bridged loop.
+
+        :param coro: The coroutine.
+        :return: The asyncio.Task running the coroutine.
+        """
+        task = self._loop.create_task(coro)
+        self.wakeup()
+        return task
+
+    def run_until_complete(self, coro):
+        """
+        Runs a coroutine while processing Qt events, e.g. from a script or a test that has no running Qt event loop.
+
+        :param coro: The coroutine or future.
+        :return: The result of the coroutine.
+        """
+        future = asyncio.ensure_future(coro, loop=self._loop)
+        if not future.done():
+            waiter = QEventLoop()
+            future.add_done_callback(lambda f: waiter.quit())
+            self.wakeup()
+            waiter.exec()
+        return future.result()
+
+    def wait_signal(self, signal, timeout=None):
+        """
+        Creates a future that is resolved by the next emission of a Qt signal.
+
+        :param signal: The bound Qt signal.
+        :param timeout: The time in seconds after which the future fails with TimeoutError. Default is None, which
+                        waits without a timeout.
+        :return: An awaitable resolving to the signal argument, a tuple of arguments, or None if there are none.
+        """
+        future = self._loop.create_future()
+
+        def onSignal(*args):
+            if not future.done():
+                future.set_result(args[0] if len(args) == 1 else (args or None))
+                self.wakeup()
+
+        signal.connect(onSignal)
+        future.add_done_callback(lambda f: signal.disconnect(onSignal))
+        return asyncio.wait_for(future, timeout) if timeout is not None else future
+
+    def close(self):
+        """
+        Stops stepping, cancels the pending tasks and closes the asyncio loop.
+        """
+        self._timer.stop()
+        if self._loop.is_closed():
+            return
+        tasks = asyncio.all_tasks(self._loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+        self._loop.close()
+
+    def _step(self):
+        """
+        Runs one iteration of the asyncio loop and schedules the next step.
+        """
+        loop = self._loop
+        if loop.is_closed():
+            return
+        loop.call_soon(loop.stop)
+        loop.run_forever()
+
+        # asyncio has no public API for the next deadline, so peek at the queues of BaseEventLoop to sleep until there
+        # is work. Without them, or without watched descriptors, fall back to the interval; otherwise an idle loop
+        # waits for a notifier or wakeup() without a timer.
+        ready = getattr(loop, '_ready', None)
+        scheduled = getattr(loop, '_scheduled', None)
+        delay = None if self._selector is not None and ready is not None and scheduled is not None else self.interval
+        if ready:
+            delay = 0
+        elif scheduled:
+            due = max(0, math.ceil((scheduled[0].when() - loop.time()) * 1000))
+            delay = due if delay is None else min(delay, due)
+        if self._selector is not None:
+            self._selector.rearm()
+        if delay is not None:
+            self._timer.start(delay)
+
+
+_bridge = None
+
+
+def asyncBridge():
+    """
+    Returns the application-wide AsyncBridge, creating it on first use.
+
+    A QCoreApplication (or QApplication) must exist. The bridge is closed when the application quits.
+
+    :return: The shared AsyncBridge instance.
+    """
+    global _bridge
+    if _bridge is None or _bridge.loop.is_closed():
+        app = QCoreApplication.instance()
+        if app is None:
+            raise RuntimeError('AsyncBridge requires a QCoreApplication instance.')
+        _bridge = AsyncBridge()
+        app.aboutToQuit.connect(_bridge.close)
+    return _bridge
+
+
+async def mediaFrames(handler, maxsize=2, start=True, idle_timeout=0.5):
+    """
+    Yields the processed frames of a MediaHandler with backpressure.
+
+    Frames are queued as frameReady delivers them. When 'maxsize' frames are waiting, the media timer is paused until
+    the consumer catches up, so a slow consumer lowers the capture rate instead of accumulating frames. The stream
+    ends when the media is closed, or when the feed stops on its own (e.g. at the end of a video file).
+
+    :param handler: The MediaHandler.
+    :param maxsize: The number of queued frames at which capture is paused. Default is 2.
+    :param start: Whether to start the media if it is not running. Media started here is stopped when the stream ends.
+    :param idle_timeout: The time in seconds without frames after which the feed is checked for having stopped.
+    """
+    bridge = asyncBridge()
+    timer = handler.timer_media
+    queue = asyncio.Queue()  # Unbounded so the end marker always fits; 'maxsize' is enforced by pausing the timer.
+    paused = False
+
+    def onFrame(image):
+        nonlocal paused
+        queue.put_nowait(image)
+        if queue.qsize() >= maxsize and timer.isActive():
+            timer.stop()
+            paused = True
+            if handler.metrics is not None:
+                handler.metrics.count('backpressure')
+        if handler.metrics is not None:
+            handler.metrics.gauge('queue', queue.qsize())
+        bridge.wakeup()
+
+    def onClosed():
+        queue.put_nowait(_END)
+        bridge.wakeup()
+
+    handler.frameReady.connect(onFrame)
+    handler.mediaClosed.connect(onClosed)
+    started = start and not timer.isActive()
+    try:
+        if started:
+            handler.startMedia()
+        while True:
+            try:
+                image = await asyncio.wait_for(queue.get(), idle_timeout)
+            except asyncio.TimeoutError:
+                if paused or timer.isActive():
+                    continue
+                break
+            if image is _END:
+                break
+            if paused and queue.qsize() < maxsize:
+                paused = False
+                timer.start()
+            yield image
+    finally:
+        handler.frameReady.disconnect(onFrame)
+        handler.mediaClosed.disconnect(onClosed)
+        if started:
+            if timer.isActive() or paused:
+                handler.stopMedia()
+        elif paused:
+            timer.start()
+
+
+def _readImage(handler, image_path):
+    """
+    Decodes an image and applies the frame processors of a handler. Runs in a worker thread.
+    """
+    image = cv_imread(image_path)
+    for func in handler.frame_processors:
+        image = func(image)
+    return image
+
+
+async def processImages(handler, path=None, executor=None):
+    """
+    Processes an image file or a directory of images of an ImageHandler without blocking the event loop.
+
+    Decoding and the frame processors run in an executor, so the processors must not touch widgets. frameReady is
+    emitted in the GUI thread for every processed image, as by ImageHandler.startProcess().
+
+    :param handler: The ImageHandler.
+    :param path: The file or directory path. Defaults to the path set on the handler.
+    :param executor: The concurrent.futures executor. Defaults to the default executor of the loop.
+    :return: The processed image for a file, or a list of (file path, image) tuples for a directory.
+    """
+    loop = asyncio.get_running_loop()
+    path = path or handler.path
+    if path and os.path.isfile(path):
+        handler.imageOpened.emit()
+        try:
+            image = await loop.run_in_executor(executor, _readImage, handler, path)
+        except Exception as e:
+            handler.imageFailed.emit('Failed to open image at {}: {}'.format(path, str(e)))
+            raise
+        handler.frameReady.emit(image)
+        return image
+    if not path or not os.path.isdir(path):
+        handler.imageFailed.emit('Path does not exist: {}'.format(path))
+        raise FileNotFoundError(path)
+
+    handler.imageOpened.emit()
+    handler.processing = True
+    results = []
+    try:
+        for filename in os.listdir(path):
+            if not handler.processing:
+                break
+            file_path = os.path.join(path, filename)
+            if not os.path.isfile(file_path) or imghdr.what(file_path) is None:
+                continue
+            try:
+                image = await loop.run_in_executor(executor, _readImage, handler, file_path)
+            except Exception as e:
+                handler.imageFailed.emit('Failed to open image at {}: {}'.format(file_path, str(e)))
+                continue
+            handler.file_name = file_path
+            handler.frameReady.emit(image)
+            results.append((file_path, image))
+    finally:
+        handler.processing = False
+    return results
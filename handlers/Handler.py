@@ -10,23 +10,36 @@ Classes:
   starting/stopping the feed, frame processing, and emitting signals for various media events.
 - ImageHandler: Manages and processes image files, emitting signals to communicate the progress and results of the
   image processing tasks.
+
+Both handlers can collect hot-path metrics (see QtFusion.monitor.Metrics) after enableMetrics() is called, and both
+offer async APIs (MediaHandler.frames(), ImageHandler.process_async()) that run on the asyncio loop of
+QtFusion.handlers.AsyncBridge.
 """
 import imghdr
 import os
 import platform
+import time
 import cv2
 from IMcore.IMprocessor import IMediaSignals, ImageSignals
+from PySide6.QtCore import Signal
+from .AsyncBridge import mediaFrames, processImages
+from .Recorder import AsyncVideoWriter
+from ..monitor.Metrics import MetricsSource, processorName
 from ..utils.ImageUtils import cv_imread
 
 
-class MediaHandler(IMediaSignals):
+class MediaHandler(IMediaSignals, MetricsSource):
     """
     The MediaHandler class is responsible for handling media feeds, such as video files or live camera streams.
     It inherits from IMediaSignals and thus has access to a range of signals for different media states and events.
     The class supports frame processing, where each frame captured from the media can be processed using
-    user-defined functions.
+    user-defined functions. When metrics are enabled, every frame records the 'capture', 'processor:<name>', 'emit'
+    and 'frame' stages, and timer ticks that miss a frame period are counted as 'dropped'.
     """
 
+    metricsUpdated = Signal(dict)  # Emitted periodically with a metrics snapshot while metrics are enabled.
+    dualFrameReady = Signal(object, object)  # (display frame, inference frame) while the inference output is enabled.
+
     def __init__(self, device=0, fps=30, parent=None):
         """
         Initializes the MediaHandler object with the same parameters as the IMediaSignals class.
@@ -42,6 +55,14 @@ class MediaHandler(IMediaSignals):
         self.cap = cv2.VideoCapture()
         self.timer_media.timeout.connect(self._grabFrame)  # Connect the signal to the frame grabbing function.
 
+        self.recorder = None  # The AsyncVideoWriter while recording.
+        self.inference_frame = None  # The inference frame of the frame being processed, see setInferenceOutput().
+        self._inference = None  # (size, interpolation, color conversion) of the inference output.
+        self._capture_properties = None
+        self._process_interval = 1
+        self._frame_index = 0
+        self._last_tick = None
+
     def addFrameProcessor(self, func):
         """
         Adds a frame processing function to the list. This function will be applied to each frame of the media.
@@ -111,8 +132,12 @@ class MediaHandler(IMediaSignals):
         if not flag:
             self.mediaFailed.emit('Unable to open device: {}'.format(self.device))
         else:
-            # If the media feed is successfully opened, emit a success signal and start the timer.
+            # If the media feed is successfully opened, apply the capture properties, emit a success signal and start
+            # the timer.
+            if self._capture_properties:
+                self._applyCaptureProperties()
             self.mediaOpened.emit()
+            self._last_tick = None
             self.timer_media.start(1000 // self.fps)
 
     def stopMedia(self):
@@ -121,10 +146,203 @@ class MediaHandler(IMediaSignals):
         """
 
         self.timer_media.stop()  # Stop the timer.
+        if self.recorder is not None:
+            self.stopRecording()
         if self.cap:
             self.cap.release()  # Release the VideoCapture object in OpenCV.
         self.mediaClosed.emit()  # Emit a signal that the media feed is closed.
 
+    def frames(self, maxsize=2, start=True):
+        """
+        Returns an async iterator over the processed frames, for use on the AsyncBridge loop:
+
+            async for frame in media_handler.frames():
+                ...
+
+        Capture is paused while 'maxsize' frames are waiting for the consumer. The media is started if it is not
+        running, and media started this way is stopped when the iteration ends.
+
+        :param maxsize: The number of queued frames at which capture is paused. Default is 2.
+        :param start: Whether to start the media if it is not running. Default is True.
+        :return: An async generator yielding frames.
+        """
+        return mediaFrames(self, maxsize, start)
+
+    def setCaptureProperties(self, width=None, height=None, fourcc=None, buffersize=None, fps=None):
+        """
+        Sets properties of the capture device. They are applied when the media is opened, and immediately if it is
+        open already. Properties that are None are left unchanged. Not every backend supports every property; the
+        returned values show what the device actually uses.
+
+        Requesting the detector input resolution directly from the camera avoids resizing every frame, 'MJPG' lets
+        most USB cameras deliver high resolutions at full frame rate, and a buffer size of 1 keeps the latency low
+        because no stale frames wait in the driver queue.
+
+        :param width: The frame width (CAP_PROP_FRAME_WIDTH).
+        :param height: The frame height (CAP_PROP_FRAME_HEIGHT).
+        :param fourcc: The four character code of the stream format (CAP_PROP_FOURCC), e.g. 'MJPG'.
+        :param buffersize: The number of frames buffered by the driver (CAP_PROP_BUFFERSIZE).
+        :param fps: The frame rate requested from the device (CAP_PROP_FPS). The read rate is set with setFps().
+        :return: The current values if the media is open (see getCaptureProperties()), None otherwise.
+        """
+        properties = dict(self._capture_properties or {})
+        for prop, value in ((cv2.CAP_PROP_FOURCC, fourcc), (cv2.CAP_PROP_FRAME_WIDTH, width),
+                            (cv2.CAP_PROP_FRAME_HEIGHT, height), (cv2.CAP_PROP_FPS, fps),
+                            (cv2.CAP_PROP_BUFFERSIZE, buffersize)):
+            if value is not None:
+                properties[prop] = cv2.VideoWriter_fourcc(*value) if prop == cv2.CAP_PROP_FOURCC else value
+        self._capture_properties = properties
+        if self.cap.isOpened():
+            self._applyCaptureProperties()
+            return self.getCaptureProperties()
+        return None
+
+    def getCaptureProperties(self):
+        """
+        Returns the capture properties reported by the open device.
+
+        :return: A dictionary with 'width', 'height', 'fourcc', 'buffersize' and 'fps', or None if no media is open.
+        """
+        if not self.cap.isOpened():
+            return None
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        return {'width': int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                'height': int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                'fourcc': ''.join(chr((code >> 8 * i) & 0xFF) for i in range(4)) if code > 0 else None,
+                'buffersize': int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+                'fps': self.cap.get(cv2.CAP_PROP_FPS)}
+
+    def setProcessInterval(self, interval):
+        """
+        Processes only every n-th captured frame. The other frames are still read, so a video keeps its speed and a
+        camera does not queue up stale frames, but they are neither processed nor emitted. Used to shed load when the
+        frame processors cannot keep up (see QtFusion.monitor.AdaptiveQuality). With metrics enabled, the left out
+        frames are counted as 'skipped'.
+
+        :param interval: Process every n-th frame. 1 (the default) processes every frame.
+        """
+        if interval < 1:
+            raise ValueError('Process interval must be at least 1, got {}.'.format(interval))
+        self._process_interval = int(interval)
+
+    def processInterval(self):
+        """
+        Gets the process interval set with setProcessInterval().
+
+        :return: The interval in frames.
+        """
+        return self._process_interval
+
+    def setInferenceOutput(self, size, interpolation=cv2.INTER_AREA, color=None):
+        """
+        Enables the dual-output mode. Every captured frame is resized once to the inference size (before the frame
+        processors run) and emitted together with the processed display frame by 'dualFrameReady'. Both frames are
+        shared by all connected slots, which therefore must not modify them. With metrics enabled, the resize is
+        recorded as the 'inference_resize' stage.
+
+        While the frame processors and the frameReady slots run, the inference frame of the current frame is
+        available as 'inference_frame', so a detector processor can run on it instead of resizing the display frame
+        itself, and draw its results on the display frame:
+
+            handler.setInferenceOutput(detector.imgsz, color=cv2.COLOR_BGR2RGB)
+
+            def detect(image):
+                results = detector.detect(handler.inference_frame)
+                ...  # Draw the results on 'image', scaling the boxes from the inference size to image.shape.
+                return image
+
+            handler.addFrameProcessor(detect)
+
+        :param size: The inference size as (width, height), or an int for a square size such as Detector.imgsz.
+                     None disables the inference output.
+        :param interpolation: The cv2 interpolation flag. Default is cv2.INTER_AREA, the best choice for downscaling.
+        :param color: An optional cv2 colour conversion code, e.g. cv2.COLOR_BGR2RGB. Default is None.
+        """
+        if size is None:
+            self._inference = None
+            return
+        if isinstance(size, int):
+            size = (size, size)
+        self._inference = (tuple(size), interpolation, color)
+
+    def _applyCaptureProperties(self):
+        """
+        Applies the stored capture properties to the open device. The format is set before the resolution, since
+        many cameras only offer high resolutions in some formats.
+        """
+        for prop in (cv2.CAP_PROP_FOURCC, cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT, cv2.CAP_PROP_FPS,
+                     cv2.CAP_PROP_BUFFERSIZE):
+            if prop in self._capture_properties:
+                self.cap.set(prop, self._capture_properties[prop])
+
+    def _inferenceFrame(self, image):
+        """
+        Produces the inference frame from a captured frame.
+        """
+        size, interpolation, color = self._inference
+        if (image.shape[1], image.shape[0]) != size:
+            image = cv2.resize(image, size, interpolation=interpolation)
+        if color is not None:
+            image = cv2.cvtColor(image, color)
+        return image
+
+    def startRecording(self, file_path, fps=None, fourcc='mp4v', queue_size=32, policy='drop',
+                       segment_seconds=None, segment_bytes=None):
+        """
+        Starts recording the processed frames, i.e. the frames emitted by 'frameReady'. The frames are encoded on a
+        background thread by an AsyncVideoWriter, so the frame timer is not blocked by the encoder. Recording stops
+        with stopRecording() or stopMedia(). With metrics enabled, the encoder queue depth is reported as the
+        'record_queue' gauge and frames the encoder could not take are counted as 'record_dropped'.
+
+        :param file_path: The output file. The extension selects the container, e.g. '.mp4' or '.avi'.
+        :param fps: The frame rate stored in the file. Default is None, which uses the fps of the handler.
+        :param fourcc: The four character code of the codec. Default is 'mp4v'.
+        :param queue_size: The maximum number of frames waiting for the encoder. Default is 32.
+        :param policy: 'drop' discards frames while the encoder queue is full, 'block' waits for it. Default is 'drop'.
+        :param segment_seconds: Starts a new file after this many seconds of video. Default is None.
+        :param segment_bytes: Starts a new file once the current one has reached about this size (see
+                              QtFusion.handlers.Recorder for the accuracy). Default is None.
+        :return: The AsyncVideoWriter.
+        """
+        if self.recorder is not None:
+            self.stopRecording()
+        self.recorder = AsyncVideoWriter(file_path, fps or self.fps, fourcc, queue_size, policy,
+                                         segment_seconds=segment_seconds, segment_bytes=segment_bytes)
+        self.frameReady.connect(self._recordFrame)
+        return self.recorder
+
+    def stopRecording(self):
+        """
+        Stops recording, waits until the queued frames are encoded and closes the file.
+
+        :return: The final recording statistics (see AsyncVideoWriter.stats()), or None if not recording.
+        """
+        recorder = self.recorder
+        if recorder is None:
+            return None
+        self.frameReady.disconnect(self._recordFrame)
+        self.recorder = None
+        recorder.close()
+        return recorder.stats()
+
+    def recordingStats(self):
+        """
+        Returns the statistics of the current recording, such as the encoder queue depth and the dropped frames.
+
+        :return: A dictionary (see AsyncVideoWriter.stats()), or None if not recording.
+        """
+        return self.recorder.stats() if self.recorder is not None else None
+
+    def _recordFrame(self, image):
+        """
+        Passes a processed frame to the recorder.
+        """
+        queued = self.recorder.write(image)
+        if self._metrics is not None:
+            if not queued:
+                self._metrics.count('record_dropped')
+            self._metrics.gauge('record_queue', self.recorder.queueDepth())
+
     def setDevice(self, device):
         """
         Sets the media source device.
@@ -136,26 +354,68 @@ class MediaHandler(IMediaSignals):
     def _grabFrame(self):
         """
         Internal method called by the timer to grab and process frames from the media feed.
-        Emits a signal with the processed frame.
-        """
+        Emits a signal with the processed frame. While metrics are enabled, the latency of every stage is recorded.
+        """
+        metrics = self._metrics
+        start = now = None
+        if metrics is not None:
+            start = now = time.perf_counter()
+            if self._last_tick is not None and self.fps:
+                missed = int((start - self._last_tick) * self.fps + 0.5) - 1
+                if missed > 0:
+                    metrics.count('dropped', missed)
+            self._last_tick = start
 
         flag, image = self.cap.read()  # Read a frame from the media feed.
-        if flag:
-            for func in self.frame_processors:  # Apply all frame processing functions to the frame.
-                image = func(image)
-            self.frameReady.emit(image)  # Emit a signal that the frame is ready.
-        else:
+        now = self._lap(metrics, 'capture', now)
+        if not flag:
             self.timer_media.stop()  # If a frame can't be read, stop the timer.
-
-
-class ImageHandler(ImageSignals):
+            if metrics is not None:
+                metrics.count('read_failures')
+                self._publishMetrics(now)
+            return
+        if self._process_interval > 1:
+            self._frame_index += 1
+            if self._frame_index % self._process_interval:
+                if metrics is not None:
+                    metrics.count('skipped')
+                    self._publishMetrics(now)
+                return
+
+        inference = None
+        if self._inference is not None:
+            # Produce the inference frame from the unprocessed capture, so it carries no annotations.
+            inference = self.inference_frame = self._inferenceFrame(image)
+            now = self._lap(metrics, 'inference_resize', now)
+        for func in self.frame_processors:  # Apply all frame processing functions to the frame.
+            image = func(image)
+            if metrics is not None:
+                now = self._lap(metrics, processorName(func), now)
+        self.frameReady.emit(image)  # Emit a signal that the frame is ready.
+        if inference is not None:
+            self.dualFrameReady.emit(image, inference)
+        self.inference_frame = None
+        if metrics is not None:
+            now = self._lap(metrics, 'emit', now)
+            metrics.record('frame', (now - start) * 1000)
+            metrics.count('frames')
+            self._publishMetrics(now)
+
+
+class ImageHandler(ImageSignals, MetricsSource):
     """
     ImageHandler is responsible for managing and processing image files. It provides functionalities to process images
     individually or in batches if provided with a directory path. The class supports custom image processing
     functionalities, where each image can be processed using user-defined functions. Signals are emitted to indicate
     the progress and results of the image processing tasks.
+
+    When metrics are enabled, every image records the latency of the 'decode' stage, of each frame processor, of the
+    'emit' stage and of the whole 'frame', and directory runs report the number of remaining files as the 'queue'
+    gauge.
     """
 
+    metricsUpdated = Signal(dict)  # Emitted periodically with a metrics snapshot while metrics are enabled.
+
     def __init__(self, parent=None):
         """
         Constructs an ImageHandler with an optional parent.
@@ -200,9 +460,12 @@ class ImageHandler(ImageSignals):
             if os.path.isfile(self.path):
                 self._processImage(self.path)
             elif os.path.isdir(self.path):
-                for filename in os.listdir(self.path):
+                filenames = os.listdir(self.path)
+                for i, filename in enumerate(filenames):
                     if not self.processing:
                         break
+                    if self._metrics is not None:
+                        self._metrics.gauge('queue', len(filenames) - i)
                     file_path = os.path.join(self.path, filename)
                     if os.path.isfile(file_path) and imghdr.what(file_path) is not None:
                         self.file_name = file_path
@@ -211,6 +474,17 @@ class ImageHandler(ImageSignals):
                 self.imageFailed.emit('Path does not exist: {}'.format(self.path))
             self.processing = False
 
+    async def process_async(self, path=None, executor=None):
+        """
+        Processes an image file or a directory of images without blocking the GUI. Decoding and the frame processors
+        run in a worker thread; 'frameReady' is emitted in the GUI thread for every image.
+
+        :param path: The file or directory path. Defaults to the path set with setPath().
+        :param executor: The concurrent.futures executor. Default is None, which uses the default executor of the loop.
+        :return: The processed image for a file, or a list of (file path, image) tuples for a directory.
+        """
+        return await processImages(self, path, executor)
+
     def stopProcess(self):
         """
         Stops the ongoing image processing tasks. Emits an 'imageClosed' signal after processing is stopped.
@@ -221,16 +495,30 @@ class ImageHandler(ImageSignals):
         """
         Processes a single image file. Applies all the functions in 'frame_processors' to the image. Emits the
         'frameReady' signal if the image is successfully processed, or the 'imageFailed' signal if an error occurs.
+        While metrics are enabled, the latency of every stage is recorded.
 
         :param image_path: The path of the image to be processed.
         """
+        metrics = self._metrics
+        start = time.perf_counter() if metrics is not None else None
         try:
             image = cv_imread(image_path)
+            now = self._lap(metrics, 'decode', start)
             for func in self.frame_processors:
                 image = func(image)
+                if metrics is not None:
+                    now = self._lap(metrics, processorName(func), now)
             self.frameReady.emit(image)
+            if metrics is not None:
+                now = self._lap(metrics, 'emit', now)
+                metrics.record('frame', (now - start) * 1000)
+                metrics.count('frames')
         except Exception as e:
+            if metrics is not None:
+                metrics.count('failures')
             self.imageFailed.emit('Failed to open image at {}: {}'.format(image_path, str(e)))
+        if metrics is not None:
+            self._publishMetrics(time.perf_counter())
 
     def isActive(self):
         """
@@ -0,0 +1,386 @@
+# QtFusion, AGPL-3.0 license
+"""
+Capture and detection for many media sources at once.
+
+MultiMediaHandler reads every source (camera or video file) in its own capture thread, paced to a per-source frame
+rate. Each capture thread only keeps the newest frame of its source. A single scheduler thread collects these frames
+round-robin, so every source gets a fair share even when one camera delivers faster than the others, and dispatches
+them in batches to a small worker pool that applies the frame processors and one shared Detector. Results are emitted
+with the source id and capture timestamp; the signals are delivered to slots in the GUI thread as queued connections.
+"""
+import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from PySide6.QtCore import QObject, Signal
+
+from ..models.AbstractModel import Detector
+from ..monitor.Metrics import MetricsSource, processorName
+
+
+class _Source:
+    """
+    The state of one capture source, shared between its capture thread and the scheduler.
+    """
+    __slots__ = ('id', 'device', 'fps', 'thread', 'frame', 'timestamp', 'frames', 'dropped', 'running', 'started',
+                 'ended')
+
+    def __init__(self, source_id, device, fps):
+        self.id = source_id
+        self.device = device
+        self.fps = fps
+        self.thread = None
+        self.frame = None  # The newest captured frame that has not been dispatched yet.
+        self.timestamp = 0.0
+        self.frames = 0
+        self.dropped = 0
+        self.running = False
+        self.started = 0.0
+        self.ended = 0.0
+
+
+def _openCapture(device):
+    """
+    Opens a cv2.VideoCapture the same way as MediaHandler.startMedia().
+
+    :param device: The camera device number or the path to a video file.
+    :return: The VideoCapture, or None if it cannot be opened.
+    """
+    cap = cv2.VideoCapture()
+    if isinstance(device, int):
+        flag = cap.open(device, cv2.CAP_DSHOW if platform.system() == 'Windows' else cv2.CAP_ANY)
+    else:
+        flag = cap.open(device, cv2.CAP_FFMPEG)
+    return cap if flag else None
+
+
+class MultiMediaHandler(QObject, MetricsSource):
+    """
+    Manages several media sources with one capture scheduler and one shared detector.
+
+    When metrics are enabled, the handler records the latency of each frame processor, of the 'detect' stage per batch
+    and of the whole 'batch', counts the processed 'frames', and reports the batch size as the 'batch_size' gauge.
+    Frames replaced by a newer frame before they were dispatched are counted per source, see sourceStats().
+
+    Signals:
+        frameReady (object, float, object): Source id, capture timestamp (time.time()) and processed frame.
+        resultReady (object, float, object, object): Source id, timestamp, frame and detector result. Only emitted
+            when a detector is set.
+        sourceOpened (object): Emitted by the capture thread after a source has been opened.
+        sourceFailed (object, str): Emitted when a source cannot be opened.
+        sourceClosed (object): Emitted when a source stops, e.g. at the end of a video file.
+    """
+
+    frameReady = Signal(object, float, object)
+    resultReady = Signal(object, float, object, object)
+    sourceOpened = Signal(object)
+    sourceFailed = Signal(object, str)
+    sourceClosed = Signal(object)
+    metricsUpdated = Signal(dict)  # Emitted periodically with a metrics snapshot while metrics are enabled.
+
+    def __init__(self, detector=None, batch_size=4, workers=1, parent=None):
+        """
+        Initializes the MultiMediaHandler.
+
+        :param detector: A Detector shared by all sources. Default is None (frames are only processed).
+        :param batch_size: The maximum number of frames dispatched to a worker at once. Default is 4.
+        :param workers: The number of worker threads. Values above 1 require a thread-safe detector. Default is 1.
+        :param parent: The parent QObject. Default is None.
+        """
+        super().__init__(parent)
+        self.detector = detector
+        self.batch_size = batch_size
+        self.workers = workers
+        self.frame_processors = []
+        self._sources = {}
+        self._cond = threading.Condition()
+        self._running = False
+        self._in_flight = 0
+        self._next = 0
+        self._scheduler = None
+        self._executor = None
+        self._metrics_lock = threading.Lock()
+
+    def addSource(self, source_id, device, fps=30):
+        """
+        Adds a media source. If the handler is running, the source starts capturing immediately.
+
+        :param source_id: A hashable id that identifies the source in the signals.
+        :param device: The camera device number or the path to a video file.
+        :param fps: The target frame rate of the source. 0 reads as fast as the source delivers. Default is 30.
+        """
+        if source_id in self._sources:
+            raise ValueError('Source already exists: {}'.format(source_id))
+        source = _Source(source_id, device, fps)
+        with self._cond:
+            self._sources[source_id] = source
+        if self._running:
+            self._startSource(source)
+
+    def removeSource(self, source_id):
+        """
+        Stops and removes a media source.
+
+        :param source_id: The id of the source.
+        """
+        with self._cond:
+            source = self._sources.pop(source_id, None)
+        if source is not None:
+            self._stopSource(source)
+
+    def sources(self):
+        """
+        Returns the ids of the managed sources.
+
+        :return: A list of source ids.
+        """
+        return list(self._sources)
+
+    def setSourceFps(self, source_id, fps):
+        """
+        Sets the target frame rate of a source. Takes effect with the next captured frame.
+
+        :param source_id: The id of the source.
+        :param fps: The new frame rate. 0 reads as fast as the source delivers.
+        """
+        self._sources[source_id].fps = fps
+
+    def setDetector(self, detector):
+        """
+        Sets the Detector shared by all sources.
+
+        :param detector: The detector, or None to only apply the frame processors.
+        """
+        self.detector = detector
+
+    def addFrameProcessor(self, func):
+        """
+        Adds a frame processing function. Processors run in the worker threads before detection.
+
+        :param func: A function that takes an image as input and returns a processed image.
+        """
+        self.frame_processors.append(func)
+
+    def removeFrameProcessor(self, func):
+        """
+        Removes a frame processing function.
+
+        :param func: The function to remove from the frame processing list.
+        """
+        if func in self.frame_processors:
+            self.frame_processors.remove(func)
+
+    def start(self):
+        """
+        Starts the worker pool, the scheduler and the capture threads of all sources.
+        """
+        if self._running:
+            return
+        self._running = True
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='MultiMediaWorker')
+        self._scheduler = threading.Thread(target=self._schedule, name='MultiMediaScheduler', daemon=True)
+        self._scheduler.start()
+        for source in list(self._sources.values()):
+            self._startSource(source)
+
+    def stop(self):
+        """
+        Stops all capture threads and the scheduler, and waits for the dispatched batches to finish.
+        """
+        if not self._running:
+            return
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for source in list(self._sources.values()):
+            self._stopSource(source)
+        self._scheduler.join()
+        self._executor.shutdown(wait=True)
+        self._scheduler = self._executor = None
+
+    def isActive(self):
+        """
+        Checks if the handler is running.
+
+        :return: True if the handler has been started and not stopped.
+        """
+        return self._running
+
+    def sourceStats(self):
+        """
+        Returns capture statistics per source.
+
+        :return: A dictionary mapping source ids to dictionaries with 'frames' (captured), 'dropped' (replaced before
+                 dispatch), 'fps' (measured capture rate) and 'running'.
+        """
+        now = time.perf_counter()
+        stats = {}
+        for source in list(self._sources.values()):
+            elapsed = (source.ended or now) - source.started if source.started else 0
+            stats[source.id] = {'frames': source.frames, 'dropped': source.dropped, 'running': source.running,
+                                'fps': source.frames / elapsed if elapsed > 0 else 0.0}
+        return stats
+
+    def _startSource(self, source):
+        """
+        Starts the capture thread of a source.
+        """
+        source.running = True
+        source.thread = threading.Thread(target=self._capture, args=(source,), daemon=True,
+                                         name='MultiMediaCapture-{}'.format(source.id))
+        source.thread.start()
+
+    def _stopSource(self, source):
+        """
+        Signals the capture thread of a source to stop and waits for it.
+        """
+        source.running = False
+        if source.thread is not None and source.thread is not threading.current_thread():
+            source.thread.join()
+        source.thread = None
+
+    def _capture(self, source):
+        """
+        Capture thread: reads frames at the target rate and keeps the newest one for the scheduler.
+        """
+        cap = _openCapture(source.device)
+        if cap is None:
+            source.running = False
+            self.sourceFailed.emit(source.id, 'Unable to open device: {}'.format(source.device))
+            return
+        self.sourceOpened.emit(source.id)
+        source.started = time.perf_counter()
+        source.ended = 0.0
+        deadline = source.started
+        try:
+            while source.running:
+                flag, frame = cap.read()
+                if not flag:
+                    break
+                timestamp = time.time()
+                with self._cond:
+                    if source.frame is not None:
+                        source.dropped += 1
+                    source.frame, source.timestamp = frame, timestamp
+                    source.frames += 1
+                    self._cond.notify()
+
+                if source.fps:
+                    deadline += 1.0 / source.fps
+                    delay = deadline - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        deadline = time.perf_counter()  # Running late: do not try to catch up with a burst.
+        finally:
+            cap.release()
+            source.running = False
+            source.ended = time.perf_counter()
+            self.sourceClosed.emit(source.id)
+
+    def _schedule(self):
+        """
+        Scheduler thread: collects pending frames round-robin and dispatches them in batches.
+        """
+        cond = self._cond
+        while True:
+            with cond:
+                while self._running and (self._in_flight >= self.workers or not self._hasPending()):
+                    cond.wait()
+                if not self._running:
+                    return
+                sources = list(self._sources.values())
+                count = len(sources)
+                start = self._next % count
+                batch = []
+                for k in range(count):
+                    source = sources[(start + k) % count]
+                    if source.frame is not None:
+                        batch.append((source.id, source.timestamp, source.frame))
+                        source.frame = None
+                        if len(batch) >= self.batch_size:
+                            break
+                self._next = start + k + 1  # The next batch starts after the last source served.
+                self._in_flight += 1
+            self._executor.submit(self._process, batch)
+
+    def _hasPending(self):
+        """
+        Checks whether any source has an undispatched frame. Called with the condition held.
+        """
+        return any(source.frame is not None for source in self._sources.values())
+
+    def _process(self, batch):
+        """
+        Worker: applies the frame processors and the detector to a batch and emits the results.
+        """
+        try:
+            if self._metrics is not None:
+                frames, results = self._processMeasured(batch)
+            else:
+                frames = []
+                for source_id, timestamp, frame in batch:
+                    for func in self.frame_processors:
+                        frame = func(frame)
+                    frames.append(frame)
+                results = self._detect(frames)
+
+            for (source_id, timestamp, _), frame, result in zip(batch, frames, results):
+                self.frameReady.emit(source_id, timestamp, frame)
+                if self.detector is not None:
+                    self.resultReady.emit(source_id, timestamp, frame, result)
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify()
+
+    def _processMeasured(self, batch):
+        """
+        Same as the processing part of _process, but records the latency of every stage in the handler metrics.
+
+        :return: A tuple of (frames, results).
+        """
+        start = now = time.perf_counter()
+        timings = []
+        frames = []
+        for source_id, timestamp, frame in batch:
+            for func in self.frame_processors:
+                frame = func(frame)
+                last, now = now, time.perf_counter()
+                timings.append((processorName(func), (now - last) * 1000))
+            frames.append(frame)
+        results = self._detect(frames)
+        last, now = now, time.perf_counter()
+        with self._metrics_lock:
+            metrics = self._metrics
+            if metrics is not None:
+                for stage, ms in timings:
+                    metrics.record(stage, ms)
+                if self.detector is not None:
+                    metrics.record('detect', (now - last) * 1000)
+                metrics.record('batch', (now - start) * 1000)
+                metrics.count('frames', len(batch))
+                metrics.gauge('batch_size', len(batch))
+                self._publishMetrics(now)
+        return frames, results
+
+    def _detect(self, frames):
+        """
+        Runs the shared detector on a batch of frames.
+
+        Detectors that override Detector.predict_batch() get all preprocessed frames in one call. Other detectors run
+        preprocess, predict and postprocess frame by frame, since their postprocess may depend on the state left by
+        preprocess.
+
+        :param frames: The processed frames.
+        :return: A list with one result per frame (None without a detector).
+        """
+        detector = self.detector
+        if detector is None:
+            return [None] * len(frames)
+        if type(detector).predict_batch is not Detector.predict_batch:
+            predictions = detector.predict_batch([detector.preprocess(frame) for frame in frames])
+            return [detector.postprocess(prediction) for prediction in predictions]
+        return [detector.postprocess(detector.predict(detector.preprocess(frame))) for frame in frames]
@@ -0,0 +1,210 @@
+# QtFusion, AGPL-3.0 license
+"""
+Asynchronous video recording.
+
+AsyncVideoWriter accepts frames through a bounded queue and encodes them with cv2.VideoWriter on a background thread,
+so encoder latency never blocks the thread that produces the frames (e.g. the MediaHandler timer in the GUI thread).
+When the encoder falls behind, frames are either dropped or the producer is blocked, depending on the policy.
+Recordings can be split into segments by duration and/or file size. cv2.VideoWriter does not report how many bytes it
+has produced, and the muxer writes to disk in blocks, so the size of the open file is estimated from the average frame
+size: of the finished segments once one has been closed and measured, and of the flushed part of the current file
+before that. Until the muxer has flushed its first block, the first segment can therefore exceed the size limit by up
+to that block (typically a few hundred kilobytes).
+"""
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+from ..monitor.Metrics import LatencyHistogram
+
+
+class AsyncVideoWriter:
+    """
+    Writes frames to video files on a background thread.
+
+    With segmenting enabled, the files are named after 'file_path' with a running number, e.g. 'out_000.mp4',
+    'out_001.mp4'; otherwise 'file_path' is used as is.
+    """
+
+    POLICIES = ('drop', 'block')
+
+    def __init__(self, file_path, fps=30, fourcc='mp4v', queue_size=32, policy='drop', block_timeout=None,
+                 segment_seconds=None, segment_bytes=None):
+        """
+        Initializes the writer and starts its encoder thread. The video files are created with the first frame, whose
+        size is used for the whole recording; later frames of a different size are resized.
+
+        :param file_path: The output file. The extension selects the container, e.g. '.mp4' or '.avi'.
+        :param fps: The frame rate stored in the file. Default is 30.
+        :param fourcc: The four character code of the codec, e.g. 'mp4v', 'XVID', 'MJPG' or 'avc1'. Default is 'mp4v'.
+        :param queue_size: The maximum number of frames waiting for the encoder. Default is 32.
+        :param policy: 'drop' discards frames while the queue is full, 'block' makes write() wait. Default is 'drop'.
+        :param block_timeout: The longest wait of write() in seconds with the 'block' policy, after which the frame
+                              is dropped. Default is None (wait indefinitely).
+        :param segment_seconds: Starts a new file after this many seconds of video. Default is None.
+        :param segment_bytes: Starts a new file once the current one has reached about this size (see the module
+                              documentation for the accuracy). Default is None.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError('Unknown policy: {}. Expected one of {}.'.format(policy, self.POLICIES))
+        self.file_path = file_path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.segment_seconds = segment_seconds
+        self.segment_bytes = segment_bytes
+        self.error = None  # The message of an error that stopped the recording.
+        self.files = []  # The files written so far.
+        self.encode_latency = LatencyHistogram()
+        self._queue = queue.Queue(queue_size)
+        self._written = 0
+        self._dropped = 0
+        self._max_depth = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='AsyncVideoWriter', daemon=True)
+        self._thread.start()
+
+    def write(self, frame):
+        """
+        Queues a frame for encoding. Safe to call from any single producer thread.
+
+        :param frame: A BGR (or grayscale) uint8 image.
+        :return: True if the frame was queued, False if it was dropped or the writer is closed or failed.
+        """
+        if self._closed or self.error is not None:
+            return False
+        try:
+            if self.policy == 'block':
+                self._queue.put(frame, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(frame)
+        except queue.Full:
+            self._dropped += 1
+            return False
+        depth = self._queue.qsize()
+        if depth > self._max_depth:
+            self._max_depth = depth
+        return True
+
+    def queueDepth(self):
+        """
+        Returns the number of frames waiting for the encoder.
+
+        :return: The current queue depth.
+        """
+        return self._queue.qsize()
+
+    def isRecording(self):
+        """
+        Checks whether the writer accepts frames.
+
+        :return: True if the writer is neither closed nor failed.
+        """
+        return not self._closed and self.error is None
+
+    def stats(self):
+        """
+        Returns recording statistics.
+
+        :return: A dictionary with the 'queue_depth', 'max_queue_depth', 'written' and 'dropped' frame counts, the
+                 'files' written so far, the 'encode' latency snapshot and the 'error' message (None if no error).
+        """
+        return {'queue_depth': self._queue.qsize(), 'max_queue_depth': self._max_depth, 'written': self._written,
+                'dropped': self._dropped, 'files': list(self.files), 'encode': self.encode_latency.snapshot(),
+                'error': self.error}
+
+    def close(self, wait=True):
+        """
+        Stops accepting frames, encodes the queued frames and closes the current file.
+
+        :param wait: Whether to wait until the encoder thread has finished. Default is True.
+        """
+        if not self._closed:
+            self._closed = True
+            while self._thread.is_alive():
+                try:
+                    self._queue.put(None, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+        if wait:
+            self._thread.join()
+
+    def _segmentPath(self, index):
+        """
+        Returns the file name of a segment.
+        """
+        if self.segment_seconds is None and self.segment_bytes is None:
+            return self.file_path
+        root, ext = os.path.splitext(self.file_path)
+        return '{}_{:03d}{}'.format(root, index, ext)
+
+    def _open(self, size):
+        """
+        Opens the next output file.
+        """
+        path = self._segmentPath(len(self.files))
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, size)
+        if not writer.isOpened():
+            raise IOError('Unable to open video writer for {} with codec {}'.format(path, self.fourcc))
+        self.files.append(path)
+        return writer
+
+    def _run(self):
+        """
+        Encoder thread: writes queued frames and starts new segments when a limit is reached.
+        """
+        writer = None
+        size = None
+        segment_frames = 0
+        frame_bytes = 0  # The estimated encoded size of a frame.
+        measured = False  # Whether frame_bytes comes from a finished segment.
+        flushed = 0  # The size of the current file on disk.
+        max_frames = int(self.segment_seconds * self.fps) if self.segment_seconds else None
+        try:
+            while True:
+                frame = self._queue.get()
+                if frame is None:
+                    break
+                start = time.perf_counter()
+                if writer is None:
+                    size = (frame.shape[1], frame.shape[0])
+                    writer = self._open(size)
+                else:
+                    if self.segment_bytes:
+                        size_on_disk = os.path.getsize(self.files[-1])
+                        if size_on_disk > flushed and not measured:
+                            # The muxer has just flushed a block, so the file holds about all frames written so far.
+                            frame_bytes = size_on_disk / segment_frames
+                        flushed = size_on_disk
+                    if (max_frames and segment_frames >= max_frames) or \
+                            (self.segment_bytes and max(flushed, segment_frames * frame_bytes) >= self.segment_bytes):
+                        writer.release()
+                        if self.segment_bytes:
+                            # Re-measure the closed file, whose size on disk is final now.
+                            frame_bytes, measured = os.path.getsize(self.files[-1]) / segment_frames, True
+                        writer = self._open(size)
+                        segment_frames = flushed = 0
+
+                if (frame.shape[1], frame.shape[0]) != size:
+                    frame = cv2.resize(frame, size)
+                if frame.ndim == 2:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+                writer.write(frame)
+                segment_frames += 1
+                self._written += 1
+                self.encode_latency.record((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            self.error = str(e)
+            while True:  # Unblock producers waiting on a full queue.
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+        finally:
+            if writer is not None:
+                writer.release()
@@ -0,0 +1,374 @@
+# QtFusion, AGPL-3.0 license
+"""
+Shared-memory frame transport to an inference process.
+
+SharedFrameRing is a ring of preallocated frame slots in a multiprocessing.shared_memory block. RemoteFrameProcessor
+uses it to move a frame processor into a separate process: the capturing side copies each frame into a free slot
+once, the worker process reads the slot as a zero-copy NumPy view, and only the slot number and frame shape travel
+over a queue. Small results such as boxes and scores come back over a result queue; returned images are written back
+into the slot. Frames and returned images larger than a slot (e.g. after a resolution change, or an upscaled frame)
+are pickled through the queues instead, which is slower.
+
+Because RemoteFrameProcessor is callable like a frame processor, an existing function can be moved out of process
+with a single change:
+
+    handler.addFrameProcessor(RemoteFrameProcessor(functools.partial(make_detector, 'weights.pt')))
+
+The worker is started with the 'spawn' method, so the factory and the function it returns must be importable
+(module-level functions or classes, functools.partial objects).
+"""
+import collections
+import multiprocessing
+import queue
+import time
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ..monitor.Metrics import LatencyHistogram
+
+
+class SharedFrameRing:
+    """
+    A fixed number of equally sized frame slots in one shared memory block.
+    """
+
+    def __init__(self, slots, slot_size, name=None):
+        """
+        Creates a new ring, or attaches to an existing one if 'name' is given.
+
+        :param slots: The number of slots.
+        :param slot_size: The size of every slot in bytes.
+        :param name: The name of an existing shared memory block. Default is None, which creates a new block.
+        """
+        self.slots = slots
+        self.slot_size = slot_size
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_size)
+        else:
+            self.shm = _attach(name)
+
+    @property
+    def name(self):
+        """
+        The name of the shared memory block, used to attach from another process.
+        """
+        return self.shm.name
+
+    def view(self, slot, shape, dtype=np.uint8):
+        """
+        Returns a NumPy view of a frame stored in a slot. The view is only valid until the slot is reused.
+
+        :param slot: The slot index.
+        :param shape: The frame shape.
+        :param dtype: The frame dtype.
+        :return: An ndarray backed by the shared memory.
+        """
+        return np.ndarray(shape, dtype, buffer=self.shm.buf, offset=slot * self.slot_size)
+
+    def write(self, slot, image):
+        """
+        Copies a frame into a slot.
+
+        :param slot: The slot index.
+        :param image: The frame.
+        :return: The view of the written frame.
+        """
+        if image.nbytes > self.slot_size:
+            raise ValueError('Frame of {} bytes does not fit into slots of {} bytes.'.format(image.nbytes,
+                                                                                             self.slot_size))
+        view = self.view(slot, image.shape, image.dtype)
+        if view is not image:
+            np.copyto(view, image, casting='no')
+        return view
+
+    def close(self):
+        """
+        Detaches from the shared memory block.
+        """
+        self.shm.close()
+
+    def unlink(self):
+        """
+        Frees the shared memory block. Only the creating process should call this.
+        """
+        self.shm.unlink()
+
+
+def _attach(name):
+    """
+    Attaches to an existing shared memory block without making this process responsible for freeing it.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13: spawned children share the resource tracker, where the name is already known.
+        return shared_memory.SharedMemory(name=name)
+
+
+def _processFunction(obj):
+    """
+    Turns the object built by the factory into a function of one frame. A Detector runs preprocess, predict and
+    postprocess.
+    """
+    if all(hasattr(obj, name) for name in ('preprocess', 'predict', 'postprocess')):
+        return lambda frame: obj.postprocess(obj.predict(obj.preprocess(frame)))
+    return obj
+
+
+def _isImage(result, frame):
+    """
+    Checks whether a result is an image rather than e.g. an array of boxes: it must be an array with the dtype and
+    number of dimensions of the frame.
+    """
+    return isinstance(result, np.ndarray) and result.dtype == frame.dtype and result.ndim == frame.ndim
+
+
+def _serve(ring_name, slots, slot_size, factory, requests, results):
+    """
+    Main function of the inference process.
+    """
+    ring = SharedFrameRing(slots, slot_size, ring_name)
+    try:
+        func = _processFunction(factory())
+    except Exception as e:
+        results.put((None, None, 'error', 'Failed to create the processor: {!r}'.format(e)))
+        ring.close()
+        return
+    results.put((None, None, 'ready', None))
+    try:
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            seq, slot, kind, payload = request
+            frame = ring.view(slot, *payload) if kind == 'slot' else payload
+            try:
+                result = func(frame)
+                if _isImage(result, frame) and result.nbytes <= slot_size:
+                    ring.write(slot, result)
+                    results.put((seq, slot, 'frame', (result.shape, result.dtype.str)))
+                elif _isImage(result, frame):
+                    results.put((seq, slot, 'image', result))  # Does not fit into the slot.
+                else:
+                    results.put((seq, slot, 'result', result))
+            except Exception as e:
+                results.put((seq, slot, 'error', repr(e)))
+            del frame
+    finally:
+        ring.close()
+
+
+def _shutdown(process, requests, ring):
+    """
+    Stops the inference process and frees the shared memory. Also runs when the processor is garbage collected.
+    """
+    if process.is_alive():
+        requests.put(None)
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    ring.close()
+    ring.unlink()
+
+
+class RemoteFrameProcessor:
+    """
+    A frame processor that runs a function in a separate process, with frames passed through shared memory.
+
+    In blocking mode (the default) a call waits for the remote function. If the function returns an image (an array
+    with the dtype and number of dimensions of the frame), the call returns a copy of it, so the remote function
+    behaves like a local frame processor; images larger than a slot are pickled through the result queue, which is
+    slower. Any other return value (e.g. boxes and scores) is stored in 'latest_result' and passed to 'on_result',
+    and the call returns the input image.
+
+    In non-blocking mode a call only submits the frame and returns it unchanged; results (including returned images)
+    are collected into 'latest_result' at the next calls, so inference overlaps with capture and display. Frames
+    arriving while all slots are busy are dropped.
+
+    Attributes:
+        latest_result: The most recent non-image result, or in non-blocking mode the most recent result of any kind.
+        latency (LatencyHistogram): Round-trip latency of completed frames in milliseconds.
+    """
+
+    def __init__(self, factory, slots=4, slot_size=None, blocking=True, timeout=5.0, on_result=None):
+        """
+        Initializes the processor. The worker process starts with the first frame, or with start().
+
+        :param factory: A picklable callable without arguments that returns, in the worker process, the function to
+                        apply to every frame or a Detector.
+        :param slots: The number of frame slots, i.e. the maximum number of frames in flight. Default is 4.
+        :param slot_size: The size of a slot in bytes. Default is None, which uses the size of the first frame.
+        :param blocking: Whether a call waits for its result. Default is True.
+        :param timeout: The time in seconds a blocking call waits for the worker. Default is 5.
+        :param on_result: A callable receiving every non-image result, called in the caller's thread. Default is None.
+        """
+        self.factory = factory
+        self.slots = slots
+        self.slot_size = slot_size
+        self.blocking = blocking
+        self.timeout = timeout
+        self.on_result = on_result
+        self.latest_result = None
+        self.latency = LatencyHistogram()
+        self._counters = collections.Counter()
+        self._ring = None
+        self._process = None
+        self._finalizer = None
+        self._free = collections.deque()
+        self._in_flight = {}  # seq -> send time
+        self._seq = 0
+
+    def start(self, slot_size=None):
+        """
+        Creates the shared memory ring and starts the worker process.
+
+        :param slot_size: The slot size in bytes, if not given to the constructor.
+        """
+        if self._process is not None:
+            return
+        self.slot_size = self.slot_size or slot_size
+        if not self.slot_size:
+            raise ValueError('The slot size is unknown before the first frame.')
+        context = multiprocessing.get_context('spawn')
+        self._ring = SharedFrameRing(self.slots, self.slot_size)
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        self._process = context.Process(target=_serve, name='RemoteFrameProcessor', daemon=True,
+                                        args=(self._ring.name, self.slots, self.slot_size, self.factory,
+                                              self._requests, self._results))
+        self._process.start()
+        self._finalizer = weakref.finalize(self, _shutdown, self._process, self._requests, self._ring)
+        self._free.extend(range(self.slots))
+
+        _, _, kind, payload = self._results.get(timeout=max(self.timeout, 60))
+        if kind == 'error':
+            self.close()
+            raise RuntimeError(payload)
+
+    def close(self):
+        """
+        Stops the worker process and frees the shared memory.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+        self._process = self._ring = self._finalizer = None
+        self._free.clear()
+        self._in_flight.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __call__(self, image):
+        """
+        Processes a frame in the worker process.
+
+        :param image: The frame.
+        :return: The image returned by the remote function, or the input image.
+        """
+        if self._process is None:
+            self.start(image.nbytes)
+        if not self.blocking:
+            self._collect(block=False)
+            if not self._free:
+                self._counters['dropped'] += 1
+                return image
+            self._submit(image)
+            return image
+
+        if not self._free:
+            self._collect(block=True)  # Results of earlier timed out frames free their slots.
+            if not self._free:
+                self._counters['dropped'] += 1
+                return image
+        seq = self._submit(image)
+        output = self._collect(block=True, until=seq)
+        return image if output is None else output
+
+    def stats(self):
+        """
+        Returns transport statistics.
+
+        :return: A dictionary with the counters 'submitted', 'completed', 'dropped', 'timeouts', 'errors' and
+                 'oversized' (frames pickled because they did not fit into a slot), the number of frames 'in_flight'
+                 and the round-trip 'latency' snapshot.
+        """
+        stats = {name: self._counters[name]
+                 for name in ('submitted', 'completed', 'dropped', 'timeouts', 'errors', 'oversized')}
+        stats['in_flight'] = len(self._in_flight)
+        stats['latency'] = self.latency.snapshot()
+        return stats
+
+    def _submit(self, image):
+        """
+        Copies a frame into a free slot and sends it to the worker. A frame larger than a slot is pickled through the
+        request queue instead; it still takes a slot, which receives the returned image if that fits.
+        """
+        image = np.ascontiguousarray(image)
+        slot = self._free.popleft()
+        seq = self._seq + 1
+        try:
+            if image.nbytes <= self._ring.slot_size:
+                self._ring.write(slot, image)
+                request = (seq, slot, 'slot', (image.shape, image.dtype.str))
+            else:
+                request = (seq, slot, 'array', image)
+                self._counters['oversized'] += 1
+            self._in_flight[seq] = time.perf_counter()
+            self._requests.put(request)
+        except Exception:
+            self._in_flight.pop(seq, None)
+            self._free.append(slot)
+            raise
+        self._seq = seq
+        self._counters['submitted'] += 1
+        return seq
+
+    def _collect(self, block, until=None):
+        """
+        Receives results and frees their slots.
+
+        :param block: Whether to wait for results. Without 'until', waits for one result if any is in flight.
+        :param until: The sequence number to wait for in blocking mode.
+        :return: A copy of the image returned for 'until', if any.
+        """
+        output = None
+        while self._in_flight:
+            try:
+                if block:
+                    seq, slot, kind, payload = self._results.get(timeout=self.timeout)
+                else:
+                    seq, slot, kind, payload = self._results.get_nowait()
+            except queue.Empty:
+                if block:
+                    self._counters['timeouts'] += 1
+                    if not self._process.is_alive():
+                        self.close()
+                        raise RuntimeError('The remote frame processor has exited.')
+                return output
+
+            self.latency.record((time.perf_counter() - self._in_flight.pop(seq)) * 1000)
+            self._counters['completed'] += 1
+            if kind in ('frame', 'image'):
+                image = self._ring.view(slot, *payload).copy() if kind == 'frame' else payload
+                if seq == until:
+                    output = image
+                else:
+                    self.latest_result = image
+            elif kind == 'error':
+                self._counters['errors'] += 1
+                if seq == until:
+                    self._free.append(slot)
+                    raise RuntimeError(payload)
+            else:
+                self.latest_result = payload
+                if self.on_result is not None:
+                    self.on_result(payload)
+            self._free.append(slot)
+            if block and (until is None or seq == until):
+                return output
+        return output
@@ -1,4 +1,9 @@
 # QtFusion, AGPL-3.0 license
 from .Handler import MediaHandler, ImageHandler
+from .AsyncBridge import AsyncBridge, asyncBridge
+from .MultiHandler import MultiMediaHandler
+from .SharedFrames import RemoteFrameProcessor, SharedFrameRing
+from .Recorder import AsyncVideoWriter
 
-__all__ = 'MediaHandler', 'ImageHandler'
+__all__ = ('MediaHandler', 'ImageHandler', 'AsyncBridge', 'asyncBridge', 'MultiMediaHandler', 'RemoteFrameProcessor',
+           'SharedFrameRing', 'AsyncVideoWriter')
@@ -0,0 +1,86 @@
+# QtFusion, AGPL-3.0 license
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from .UserManager import UserManager
+
+
+class AsyncUserManager:
+    """An awaitable front end for UserManager.
+
+    Every call runs on a dedicated worker thread, so database access and password hashing never block the event loop
+    (e.g. the asyncio loop of QtFusion.handlers.AsyncBridge). A single worker owns the SQLite connection, because
+    sqlite3 connections are bound to the thread that created them; calls are therefore executed in submission order.
+
+    Example:
+        users = AsyncUserManager('users.db', cache_size=256)
+        if await users.verify_login(name, password) == 0:  # -1: unknown user, -2: wrong password.
+            ...
+
+    Attributes:
+        manager (UserManager): The wrapped manager. Only use it from the worker thread, e.g. via ``run``.
+    """
+
+    def __init__(self, db_name, cache_size=0, cache_ttl=30.0):
+        """Create the worker thread and open the database on it.
+
+        Args:
+            db_name (str): Name of the SQLite database file.
+            cache_size (int): Maximum number of users kept in the lookup cache. Defaults to 0, which disables it.
+            cache_ttl (float): Lifetime of a cached user in seconds. Defaults to 30.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='AsyncUserManager')
+        self.manager = self._executor.submit(UserManager, db_name, cache_size, cache_ttl).result()
+
+    async def run(self, func, *args):
+        """Run a callable on the worker thread.
+
+        Args:
+            func (callable): The callable, e.g. a bound method of ``manager``.
+            *args: The positional arguments.
+
+        Returns:
+            The return value of the callable.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def register(self, username, password, avatar):
+        """Await UserManager.register."""
+        return await self.run(self.manager.register, username, password, avatar)
+
+    async def get_user(self, username):
+        """Await UserManager.get_user."""
+        return await self.run(self.manager.get_user, username)
+
+    async def verify_login(self, username, password):
+        """Await UserManager.verify_login."""
+        return await self.run(self.manager.verify_login, username, password)
+
+    async def change_password(self, username, new_password):
+        """Await UserManager.change_password."""
+        return await self.run(self.manager.change_password, username, new_password)
+
+    async def change_avatar(self, username, password, new_avatar):
+        """Await UserManager.change_avatar."""
+        return await self.run(self.manager.change_avatar, username, password, new_avatar)
+
+    async def get_avatar(self, username):
+        """Await UserManager.get_avatar."""
+        return await self.run(self.manager.get_avatar, username)
+
+    async def delete_user(self, username, password):
+        """Await UserManager.delete_user."""
+        return await self.run(self.manager.delete_user, username, password)
+
+    async def cache_stats(self):
+        """Await UserManager.cache_stats."""
+        return await self.run(self.manager.cache_stats)
+
+    async def clear_cache(self):
+        """Await UserManager.clear_cache."""
+        return await self.run(self.manager.clear_cache)
+
+    def close(self):
+        """Close the database connection and stop the worker thread after the pending calls."""
+        self._executor.submit(self.manager.conn.close).result()
+        self._executor.shutdown()
@@ -0,0 +1,120 @@
+# QtFusion, AGPL-3.0 license
+import threading
+import time
+from collections import OrderedDict
+
+
+class UserCache:
+    """A bounded, time-limited read-through cache for user records.
+
+    The cache maps usernames to the rows returned by ``UserManager.get_user``. Missing users are cached as well,
+    so repeated lookups of a username that is still being typed do not hit the database either. Entries expire
+    after ``ttl`` seconds and the least recently used entry is evicted once ``max_size`` entries are stored.
+
+    Attributes:
+        max_size (int): Maximum number of cached usernames.
+        ttl (float): Lifetime of an entry in seconds. ``None`` or ``0`` disables expiry.
+    """
+
+    MISSING = object()  # Marker returned by lookup() when a username is not cached
+
+    def __init__(self, max_size=256, ttl=30.0):
+        """Initialize an empty cache.
+
+        Args:
+            max_size (int): Maximum number of cached usernames. Defaults to 256.
+            ttl (float): Lifetime of an entry in seconds. Defaults to 30.
+        """
+        if max_size <= 0:
+            raise ValueError(f"max_size must be positive, got {max_size}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.reset_stats()
+
+    def lookup(self, username):
+        """Look up a username.
+
+        Args:
+            username (str): The username to look up.
+
+        Returns:
+            tuple or None: The cached row (``None`` for a cached missing user), or ``UserCache.MISSING`` if the
+            username is not cached or its entry has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                self._misses += 1
+                return self.MISSING
+            row, expires = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[username]
+                self._expirations += 1
+                self._misses += 1
+                return self.MISSING
+            self._entries.move_to_end(username)
+            self._hits += 1
+            return row
+
+    def store(self, username, row):
+        """Store the row of a username, evicting the least recently used entry if the cache is full.
+
+        Args:
+            username (str): The username.
+            row (tuple or None): The database row, or None if the user does not exist.
+        """
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[username] = (row, expires)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, username=None):
+        """Drop one username, or every entry if no username is given.
+
+        Args:
+            username (str, optional): The username to drop. Defaults to None, which clears the cache.
+        """
+        with self._lock:
+            if username is None:
+                if self._entries:
+                    self._entries.clear()
+                    self._invalidations += 1
+            elif self._entries.pop(username, None) is not None:
+                self._invalidations += 1
+
+    def reset_stats(self):
+        """Reset the hit, miss, eviction, expiration and invalidation counters."""
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._expirations = 0
+            self._invalidations = 0
+
+    def stats(self):
+        """Get the cache statistics.
+
+        Returns:
+            dict: Counters together with the current size, the configured bounds and the hit rate.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'invalidations': self._invalidations,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -4,6 +4,8 @@ from PIL import Image
 import sqlite3
 import hashlib
 
+from .UserCache import UserCache
+
 
 class UserManager:
     """A class for managing a database of users.
@@ -11,19 +13,28 @@ class UserManager:
     This class provides methods for registering users, getting user data,
     changing a user's password, changing a user's avatar, and verifying a user's login credentials.
 
+    Lookups can optionally be served from an in-memory ``UserCache``. The cache is invalidated by every write
+    method of this class, and is cleared whenever ``PRAGMA data_version`` reports that another connection
+    (for example another process) has committed changes to the database.
+
     Attributes:
         conn (sqlite3.Connection): Connection to the SQLite database.
         cursor (sqlite3.Cursor): Cursor for database operations.
+        cache (UserCache or None): Read-through cache for user lookups, None if caching is disabled.
     """
 
-    def __init__(self, db_name):
+    def __init__(self, db_name, cache_size=0, cache_ttl=30.0):
         """Initialize the UserManager with a SQLite database.
 
         Args:
             db_name (str): Name of the SQLite database file.
+            cache_size (int): Maximum number of users kept in the lookup cache. Defaults to 0, which disables it.
+            cache_ttl (float): Lifetime of a cached user in seconds. Defaults to 30.
         """
         self.conn = sqlite3.connect(db_name)
         self.cursor = self.conn.cursor()
+        self.cache = UserCache(cache_size, cache_ttl) if cache_size > 0 else None
+        self._data_version = None
 
         # Create the table if it doesn't already exist
         self.cursor.execute('''
@@ -88,11 +99,32 @@ class UserManager:
                     VALUES (?, ?, ?)
                 ''', (username, hashed_password, avatar))
         self.conn.commit()
+        self._invalidate(username)
         return 0
 
     def get_user(self, username):
         """Get data for a user.
 
+        If the lookup cache is enabled, the user is served from it when possible.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            tuple: The user's data, or None if the user does not exist.
+        """
+        if self.cache is None:
+            return self._fetch_user(username)
+        self._check_data_version()
+        user = self.cache.lookup(username)
+        if user is UserCache.MISSING:
+            user = self._fetch_user(username)
+            self.cache.store(username, user)
+        return user
+
+    def _fetch_user(self, username):
+        """Read a user row directly from the database.
+
         Args:
             username (str): The username of the user.
 
@@ -104,6 +136,35 @@ class UserManager:
         ''', (username,))
         return self.cursor.fetchone()
 
+    def _check_data_version(self):
+        """Clear the lookup cache if another connection has modified the database since the last check."""
+        data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        if self._data_version is not None and data_version != self._data_version:
+            self.cache.invalidate()
+        self._data_version = data_version
+
+    def _invalidate(self, username):
+        """Drop a user from the lookup cache after it has been modified through this connection.
+
+        Args:
+            username (str): The username of the modified user.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(username)
+
+    def cache_stats(self):
+        """Get statistics of the lookup cache.
+
+        Returns:
+            dict: The cache statistics (see ``UserCache.stats``), or None if caching is disabled.
+        """
+        return self.cache.stats() if self.cache is not None else None
+
+    def clear_cache(self):
+        """Drop every user from the lookup cache."""
+        if self.cache is not None:
+            self.cache.invalidate()
+
     def change_password(self, username, new_password):
         """Change a user's password.
 
@@ -126,6 +187,7 @@ class UserManager:
             WHERE username = ?
         ''', (hashed_password, username))
         self.conn.commit()
+        self._invalidate(username)
         return 0
 
     def change_avatar(self, username, password, new_avatar):
@@ -152,6 +214,7 @@ class UserManager:
             WHERE username = ?
         ''', (new_avatar, username))
         self.conn.commit()
+        self._invalidate(username)
         return 0
 
     def verify_login(self, username, password):
@@ -205,4 +268,5 @@ class UserManager:
             WHERE username = ?
         ''', (username,))
         self.conn.commit()
+        self._invalidate(username)
         return 0
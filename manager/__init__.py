@@ -1,4 +1,6 @@
 # QtFusion, AGPL-3.0 license
 from .UserManager import UserManager
+from .UserCache import UserCache
+from .AsyncUserManager import AsyncUserManager
 
-__all__ = 'UserManager'
+__all__ = 'UserManager', 'UserCache', 'AsyncUserManager'
@@ -1,6 +1,12 @@
 # QtFusion, AGPL-3.0 license
+import copy
+import time
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+from .ModelRegistry import ModelRegistry, model_registry
+
 """
 The Detector class is an abstract base class, representing a generic detector in an object detection scenario.
 It defines a set of methods that any specific detector should implement: loading a model, preprocessing an image,
@@ -30,6 +36,8 @@ class Detector(ABC):
         self.model_path = model_path  # The file path to the pre-trained model for detection.
         self.device = device  # The computational device ('cpu' or 'cuda') for model inference.
         self.imgsz = imgsz  # The target size of the input images for the model.
+        self.model = None  # The loaded model, set by load_cached() (subclasses may also set it in load_model()).
+        self.result_cache = None  # The optional ResultCache used by detect().
 
     @abstractmethod
     def load_model(self, model_path):
@@ -81,3 +89,151 @@ class Detector(ABC):
         :return: The postprocessed result, which may include bounding boxes, class labels, and confidence scores.
         """
         pass
+
+    def set_imgsz(self, imgsz):
+        """
+        Change the input size, e.g. to trade accuracy for speed under load (see QtFusion.monitor.AdaptiveQuality).
+
+        The default implementation only sets 'self.imgsz'. Subclasses that keep size-dependent state, such as a
+        Preprocessor or a model compiled for a fixed input shape, override it to rebuild that state.
+
+        :param imgsz: The new input size.
+        """
+        self.imgsz = imgsz
+
+    def predict_batch(self, imgs):
+        """
+        Make predictions on a batch of preprocessed images.
+
+        The default implementation calls predict() for every image. Subclasses whose model accepts batched input can
+        override it to run the whole batch at once; MultiMediaHandler uses this method for detectors that override it.
+
+        :param imgs: A list of preprocessed input images.
+        :return: A list with the raw prediction output for every image.
+        """
+        return [self.predict(img) for img in imgs]
+
+    def detect(self, img):
+        """
+        Run the whole chain of preprocess, predict and postprocess on an image.
+
+        With a result cache set (see set_result_cache()), the result of an image that was already processed with the
+        same model file, device, imgsz and cache_params() is returned from the cache without running inference.
+
+        :param img: The original input image.
+        :return: The postprocessed result.
+        """
+        cache = self.result_cache
+        if cache is None:
+            return self.postprocess(self.predict(self.preprocess(img)))
+        key = cache.key(img, self.model_identity(), self.imgsz, self.cache_params())
+        result = cache.get(key, cache)
+        if result is cache:
+            result = self.postprocess(self.predict(self.preprocess(img)))
+            cache.put(key, result)
+        return result
+
+    def set_result_cache(self, cache):
+        """
+        Enable or disable result caching for detect().
+
+        :param cache: A ResultCache, which may be shared by several detectors, or None to disable caching.
+        """
+        self.result_cache = cache
+
+    def model_identity(self):
+        """
+        Identify the loaded weights for the result cache.
+
+        :return: A tuple of the detector class name, the model file path, its modification time and the device.
+        """
+        return (type(self).__name__,) + ModelRegistry.key(self.model_path, self.device)[:3]
+
+    def cache_params(self):
+        """
+        Return the settings that change the result of detect(), e.g. confidence and IoU thresholds or class filters.
+
+        Part of the result cache key. The default implementation returns an empty dictionary; subclasses with such
+        settings override it, e.g. return {'conf': self.conf_thres, 'iou': self.iou_thres}.
+
+        :return: A dictionary of settings with hashable, repr()-stable values.
+        """
+        return {}
+
+    def load_cached(self, model_path=None, warmup=0, registry=None):
+        """
+        Load the model through the process-wide model registry and assign it to 'self.model'.
+
+        Detectors using the same file (unchanged on disk), device and imgsz share one loaded model, so switching back
+        to a model, or creating another detector for it, does not load it again. When the model is loaded, 'warmup'
+        dummy inferences are run so the first real frame is not slow; the load and warm-up times are available from
+        the registry's stats().
+
+        :param model_path: The model file. Default is None, which uses self.model_path.
+        :param warmup: The number of warm-up inferences run after loading. Default is 0.
+        :param registry: The ModelRegistry to use. Default is None, which uses the shared registry.
+        :return: The loaded model.
+        """
+        path = model_path or self.model_path
+        registry = registry or model_registry
+        self.model = registry.get(path, self.device, self.imgsz, lambda: self._loadModel(path),
+                                  (lambda model: self._warmupModel(model, warmup)) if warmup else None)
+        self.model_path = path
+        return self.model
+
+    def preload(self, model_path=None, warmup=0, registry=None):
+        """
+        Load and warm up the model on a background thread, so a later load_cached() returns immediately, e.g. for
+        the model a user is about to switch to.
+
+        Loading and warm-up run on a shallow copy of the detector, so 'self.model' and 'self.model_path' keep
+        serving the current model until load_cached() is called. The copy shares the other attributes, e.g. a
+        Preprocessor, so with 'warmup' the detector should not run inference while the warm-up runs.
+
+        :param model_path: The model file. Default is None, which uses self.model_path.
+        :param warmup: The number of warm-up inferences run after loading. Default is 0.
+        :param registry: The ModelRegistry to use. Default is None, which uses the shared registry.
+        :return: A concurrent.futures.Future resolving to the loaded model.
+        """
+        path = model_path or self.model_path
+        registry = registry or model_registry
+        shadow = copy.copy(self)
+        shadow.model_path = path
+        return registry.preload(path, self.device, self.imgsz, lambda: shadow._loadModel(path),
+                                (lambda model: shadow._warmupModel(model, warmup)) if warmup else None)
+
+    def warmup(self, runs=1):
+        """
+        Run dummy inferences on a black image of the input size, which triggers lazy allocations and compilation in
+        the inference framework.
+
+        :param runs: The number of inferences. Default is 1.
+        :return: A list with the duration of every run in milliseconds.
+        """
+        height, width = (self.imgsz, self.imgsz) if isinstance(self.imgsz, int) else self.imgsz
+        dummy = np.zeros((height, width, 3), dtype=np.uint8)
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            self.predict(self.preprocess(dummy))
+            times.append((time.perf_counter() - start) * 1000)
+        return times
+
+    def _loadModel(self, path):
+        """
+        Call load_model() for the registry. Subclasses may return the model or assign it to 'self.model' and return
+        None; either way the model is returned and 'self.model' is left unchanged.
+        """
+        previous, self.model = self.model, None
+        try:
+            model = self.load_model(path)
+            return self.model if model is None else model
+        finally:
+            self.model = previous
+
+    def _warmupModel(self, model, runs):
+        """
+        Assign a freshly loaded model and warm it up. Used as the warm-up callback of the registry.
+        """
+        self.model = model
+        return self.warmup(runs)
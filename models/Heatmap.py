@@ -15,9 +15,12 @@ class HeatmapGenerator:
         norm_alpha (int): Minimum value for normalization.
         norm_beta (int): Maximum value for normalization.
         hist_eq_threshold (int): Threshold for histogram equalization.
+        update_interval (int): The heatmap is computed from the feature maps on every n-th call only; the calls in
+            between blend the last heatmap onto the new image.
     """
 
-    def __init__(self, heatmap_intensity=0.4, color_map=cv2.COLORMAP_JET, hist_eq_threshold=200, norm_range=(0, 255)):
+    def __init__(self, heatmap_intensity=0.4, color_map=cv2.COLORMAP_JET, hist_eq_threshold=200, norm_range=(0, 255),
+                 update_interval=1):
         """
         Initializes the HeatmapGenerator.
 
@@ -26,6 +29,7 @@ class HeatmapGenerator:
             color_map (int): OpenCV color map for generating the heatmap.
             hist_eq_threshold (int): Threshold for histogram equalization.
             norm_range (tuple): Minimum and maximum values for normalization.
+            update_interval (int): Compute the heatmap on every n-th call only. Default is 1 (every call).
         """
         self.hook = self.SaveFeatures()
         self.heatmap_intensity = heatmap_intensity
@@ -33,6 +37,9 @@ class HeatmapGenerator:
         self.color_map = color_map
         self.norm_alpha, self.norm_beta = norm_range
         self.hist_eq_threshold = hist_eq_threshold
+        self.update_interval = update_interval
+        self._calls = 0
+        self._last_heatmap = None
 
     class SaveFeatures:
         """
@@ -78,6 +85,10 @@ class HeatmapGenerator:
         Returns:
             ndarray: The original image superimposed with the heatmap.
         """
+        self._calls += 1
+        if self._last_heatmap is not None and self.update_interval > 1 and (self._calls - 1) % self.update_interval:
+            return self._blend(img, self._last_heatmap)
+
         feature_maps = self.hook.features
 
         if feature_maps is not None and len(feature_maps) > 0:
@@ -100,12 +111,24 @@ class HeatmapGenerator:
                                                    norm_type=cv2.NORM_MINMAX, dtype=cv2.CV_8U)
 
             # Generate and superimpose the heatmap
-            heatmap = cv2.applyColorMap(normalized_feature_map, self.color_map)
-            heatmap = cv2.resize(heatmap, (img.shape[1], img.shape[0]))
-            superimposed_img = cv2.addWeighted(img, self.original_img_intensity, heatmap, self.heatmap_intensity, 0)
-            return superimposed_img
+            self._last_heatmap = cv2.applyColorMap(normalized_feature_map, self.color_map)
+            return self._blend(img, self._last_heatmap)
         else:
             if feature_maps is None:
                 raise ValueError("No feature maps detected. Check the model layer selection.")
             else:
                 raise ValueError("Feature maps are empty. Check the input to the model.")
+
+    def _blend(self, img, heatmap):
+        """
+        Superimposes a heatmap on an image.
+
+        Args:
+            img (ndarray): The original image in BGR format.
+            heatmap (ndarray): The colour-mapped heatmap at feature map resolution.
+
+        Returns:
+            ndarray: The original image superimposed with the heatmap.
+        """
+        heatmap = cv2.resize(heatmap, (img.shape[1], img.shape[0]))
+        return cv2.addWeighted(img, self.original_img_intensity, heatmap, self.heatmap_intensity, 0)
@@ -0,0 +1,185 @@
+# QtFusion, AGPL-3.0 license
+"""
+Process-wide cache of loaded models.
+
+Loading weights from disk and the first inferences (lazy allocations, kernel selection, JIT compilation) are the slow
+part of switching models. ModelRegistry keeps every loaded model under the key (path, modification time, device,
+imgsz), so Detector instances that use the same weights share one model, a changed file on disk is loaded again, and
+models can be loaded and warmed up on a background thread before the user switches to them.
+
+Detector.load_cached(), Detector.preload() and Detector.warmup() use the shared 'model_registry' instance.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _Entry:
+    """
+    A cached model and its timings.
+    """
+    __slots__ = ('model', 'ready', 'error', 'load_ms', 'warmup_ms', 'hits', 'loaded_at')
+
+    def __init__(self):
+        self.model = None
+        self.ready = threading.Event()
+        self.error = None
+        self.load_ms = 0.0
+        self.warmup_ms = []
+        self.hits = 0
+        self.loaded_at = 0.0
+
+
+class ModelRegistry:
+    """
+    Caches loaded models by (path, mtime, device, imgsz).
+
+    Loads of the same key are never run twice: a thread asking for a model that another thread is loading waits for
+    that load. Load and warm-up failures, and loaders returning None, are not cached.
+    """
+
+    def __init__(self, max_models=None):
+        """
+        Initializes an empty registry.
+
+        :param max_models: The maximum number of cached models; the least recently used ones are dropped first.
+                           Default is None (unlimited).
+        """
+        self.max_models = max_models
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @staticmethod
+    def key(path, device='cpu', imgsz=640):
+        """
+        Builds the cache key of a model.
+
+        :param path: The model file. Paths that do not exist (e.g. names resolved by a model hub) are used as is.
+        :param device: The inference device.
+        :param imgsz: The input size.
+        :return: A tuple of (absolute path, modification time in ns or None, device, imgsz).
+        """
+        try:
+            full_path = os.path.realpath(path)
+            mtime = os.stat(full_path).st_mtime_ns
+        except (OSError, TypeError, ValueError):
+            full_path, mtime = path, None
+        return full_path, mtime, str(device), tuple(imgsz) if isinstance(imgsz, (list, tuple)) else imgsz
+
+    def get(self, path, device, imgsz, loader, warmup=None):
+        """
+        Returns the cached model for a key, loading it first if necessary.
+
+        :param path: The model file.
+        :param device: The inference device.
+        :param imgsz: The input size.
+        :param loader: A callable without arguments that loads and returns the model. Returning None is an error.
+        :param warmup: An optional callable taking the loaded model and running the warm-up inferences. It may return
+                       a list of per-run times in milliseconds. Only called when the model is loaded.
+        :return: The model.
+        """
+        key = self.key(path, device, imgsz)
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._entries[key] = _Entry()
+                self._dropStale(key)
+            else:
+                self._entries.move_to_end(key)
+                entry.hits += 1
+        if not owner:
+            entry.ready.wait()
+            if entry.error is not None:
+                raise entry.error
+            return entry.model
+
+        try:
+            start = time.perf_counter()
+            entry.model = loader()
+            if entry.model is None:
+                raise ValueError('Loading {} returned no model.'.format(path))
+            entry.load_ms = (time.perf_counter() - start) * 1000
+            if warmup is not None:
+                start = time.perf_counter()
+                runs = warmup(entry.model)
+                entry.warmup_ms = list(runs) if runs else [(time.perf_counter() - start) * 1000]
+            entry.loaded_at = time.time()
+        except BaseException as e:
+            entry.error = e
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            raise
+        finally:
+            entry.ready.set()
+        return entry.model
+
+    def preload(self, path, device, imgsz, loader, warmup=None):
+        """
+        Loads (and warms up) a model on a background thread, so a later get() returns immediately.
+
+        :return: A concurrent.futures.Future resolving to the model.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ModelPreload')
+            executor = self._executor
+        return executor.submit(self.get, path, device, imgsz, loader, warmup)
+
+    def contains(self, path, device='cpu', imgsz=640):
+        """
+        Checks whether a model is loaded (or being loaded).
+
+        :return: True if the current version of the file is in the registry.
+        """
+        return self.key(path, device, imgsz) in self._entries
+
+    def evict(self, path=None):
+        """
+        Drops cached models.
+
+        :param path: Drops only the models loaded from this file. Default is None (all models).
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            full_path = self.key(path)[0]
+            for key in [key for key in self._entries if key[0] == full_path]:
+                del self._entries[key]
+
+    def stats(self):
+        """
+        Returns the timings of the cached models.
+
+        :return: A list of dictionaries with 'path', 'device', 'imgsz', 'load_ms', 'warmup_ms' (per run), 'hits' and
+                 'loaded_at' (time.time()), in least recently used order.
+        """
+        with self._lock:
+            items = list(self._entries.items())
+        return [{'path': key[0], 'device': key[2], 'imgsz': key[3], 'load_ms': entry.load_ms,
+                 'warmup_ms': list(entry.warmup_ms), 'hits': entry.hits, 'loaded_at': entry.loaded_at}
+                for key, entry in items if entry.ready.is_set()]
+
+    def _dropStale(self, key):
+        """
+        Drops older versions of the same file and device, and the least recently used models above the limit.
+        Called with the lock held.
+        """
+        for other in [other for other in self._entries if other != key and other[0] == key[0]
+                      and other[2:] == key[2:] and other[1] != key[1]]:
+            del self._entries[other]
+        if self.max_models is not None:
+            while len(self._entries) > self.max_models:
+                oldest = next(iter(self._entries))
+                if oldest == key:
+                    break
+                del self._entries[oldest]
+
+
+model_registry = ModelRegistry()
+
@@ -0,0 +1,210 @@
+# QtFusion, AGPL-3.0 license
+"""
+Vectorized postprocessing for Detector subclasses.
+
+The helpers operate on NumPy arrays of raw detections with shape (N, 4 + C): a box in (center x, center y, width,
+height) followed by C class scores, as produced by YOLOv8-style heads (transpose (4 + C, N) outputs first, or pass
+'channels_first=True'). YOLOv5-style outputs with an objectness column are handled with 'objectness=True'.
+
+    boxes, scores, class_ids = postprocess_detections(output[0], conf_thres=0.25, iou_thres=0.45,
+                                                      info=self.letterbox[0])
+
+All filtering is done with masks, NMS suppresses with one vectorized IoU row per kept box, and class-aware NMS runs
+all classes in a single pass by offsetting the boxes of each class so that boxes of different classes never overlap.
+"""
+import numpy as np
+
+
+def xywh2xyxy(boxes, out=None):
+    """
+    Converts boxes from (center x, center y, width, height) to (x1, y1, x2, y2).
+
+    :param boxes: An array of shape (N, 4).
+    :param out: An optional output array of the same shape. Default is None, which allocates one.
+    :return: The converted boxes.
+    """
+    boxes = np.asarray(boxes)
+    if out is None:
+        out = np.empty_like(boxes, dtype=np.result_type(boxes.dtype, np.float32))
+    half = boxes[:, 2:4] / 2
+    np.subtract(boxes[:, 0:2], half, out=out[:, 0:2])
+    np.add(boxes[:, 0:2], half, out=out[:, 2:4])
+    return out
+
+
+def box_iou(boxes1, boxes2):
+    """
+    Computes the pairwise intersection over union of two sets of (x1, y1, x2, y2) boxes.
+
+    :param boxes1: An array of shape (N, 4).
+    :param boxes2: An array of shape (M, 4).
+    :return: An array of shape (N, M).
+    """
+    boxes1, boxes2 = np.asarray(boxes1), np.asarray(boxes2)
+    area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+    area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+    top_left = np.maximum(boxes1[:, None, :2], boxes2[None, :, :2])
+    bottom_right = np.minimum(boxes1[:, None, 2:], boxes2[None, :, 2:])
+    wh = np.clip(bottom_right - top_left, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+    return inter / (area1[:, None] + area2[None, :] - inter + 1e-9)
+
+
+def topk(scores, k):
+    """
+    Returns the indices of the k highest scores in descending order of score, in O(N + k log k).
+
+    :param scores: A 1-D array of scores.
+    :param k: The number of indices to return.
+    :return: An array of at most k indices.
+    """
+    scores = np.asarray(scores)
+    if k >= len(scores):
+        return np.argsort(-scores, kind='stable')
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    index = np.argpartition(-scores, k - 1)[:k]
+    return index[np.argsort(-scores[index], kind='stable')]
+
+
+def filter_detections(pred, conf_thres=0.25, classes=None, objectness=False, channels_first=False):
+    """
+    Selects the best class of every detection and keeps the detections above the confidence threshold.
+
+    :param pred: Raw detections of shape (N, 4 + C), or (N, 5 + C) with 'objectness'.
+    :param conf_thres: The minimum confidence. Default is 0.25.
+    :param classes: An optional sequence of class ids to keep. Default is None (all classes).
+    :param objectness: Whether column 4 is an objectness score multiplied into the class scores. Default is False.
+    :param channels_first: Whether 'pred' has shape (4 + C, N) instead. Default is False.
+    :return: A tuple of (boxes (M, 4) in xywh, scores (M,), class_ids (M,)).
+    """
+    pred = np.asarray(pred)
+    start = 5 if objectness else 4
+
+    # Cheap prefilter on the maximum score, so the class selection only runs on candidate rows. Reducing along the
+    # contiguous axis of each layout avoids a strided pass over all N x C scores.
+    if channels_first:
+        scores = pred[start:].max(axis=0)
+        if objectness:
+            scores = scores * pred[4]
+        candidates = np.flatnonzero(scores > conf_thres)
+        rows = pred[:, candidates].T
+    else:
+        scores = pred[:, start:].max(axis=1)
+        if objectness:
+            scores = scores * pred[:, 4]
+        candidates = np.flatnonzero(scores > conf_thres)
+        rows = pred[candidates]
+    class_ids = rows[:, start:].argmax(axis=1)
+    scores = scores[candidates]
+
+    if classes is not None:
+        keep = np.isin(class_ids, np.asarray(classes))
+        rows, class_ids, scores = rows[keep], class_ids[keep], scores[keep]
+    return rows[:, :4], scores, class_ids
+
+
+def nms(boxes, scores, iou_thres=0.45, max_det=300):
+    """
+    Greedy non-maximum suppression.
+
+    :param boxes: Boxes of shape (N, 4) in (x1, y1, x2, y2).
+    :param scores: Scores of shape (N,).
+    :param iou_thres: Boxes overlapping a kept box by more than this IoU are suppressed. Default is 0.45.
+    :param max_det: The maximum number of kept boxes. Default is 300.
+    :return: The indices of the kept boxes in descending order of score.
+    """
+    order = np.argsort(-np.asarray(scores), kind='stable')
+    boxes = np.asarray(boxes, dtype=np.float32)[order]
+    x1, y1, x2, y2 = (np.ascontiguousarray(boxes[:, k]) for k in range(4))
+    # IoU <= t  <=>  inter <= t / (1 + t) * (area_i + area_j), which saves the division in the loop.
+    areas = (x2 - x1) * (y2 - y1)
+    areas *= np.float32(iou_thres / (1 + iou_thres))
+    keep = []
+    while order.size and len(keep) < max_det:
+        keep.append(order[0])
+        w = np.minimum(x2[0], x2[1:])
+        w -= np.maximum(x1[0], x1[1:])
+        np.maximum(w, 0, out=w)
+        h = np.minimum(y2[0], y2[1:])
+        h -= np.maximum(y1[0], y1[1:])
+        np.maximum(h, 0, out=h)
+        w *= h
+        mask = w <= areas[1:] + areas[0]
+        order, x1, y1, x2, y2, areas = (a[1:][mask] for a in (order, x1, y1, x2, y2, areas))
+    return np.asarray(keep, dtype=np.intp)
+
+
+def batched_nms(boxes, scores, class_ids, iou_thres=0.45, max_det=300):
+    """
+    Class-aware non-maximum suppression in a single pass: the boxes of every class are shifted by a class-dependent
+    offset larger than any coordinate, so boxes only suppress boxes of their own class.
+
+    :param boxes: Boxes of shape (N, 4) in (x1, y1, x2, y2).
+    :param scores: Scores of shape (N,).
+    :param class_ids: Integer class ids of shape (N,).
+    :param iou_thres: The IoU threshold. Default is 0.45.
+    :param max_det: The maximum number of kept boxes. Default is 300.
+    :return: The indices of the kept boxes in descending order of score.
+    """
+    boxes = np.asarray(boxes, dtype=np.float32)
+    if not len(boxes):
+        return np.empty(0, dtype=np.intp)
+    offset = float(np.abs(boxes).max()) + 1
+    shifted = boxes + (np.asarray(class_ids, dtype=np.float32) * offset)[:, None]
+    return nms(shifted, scores, iou_thres, max_det)
+
+
+def scale_boxes(boxes, info, clip=True, out=None):
+    """
+    Maps (x1, y1, x2, y2) boxes from the letterboxed model input back to the original image.
+
+    :param boxes: Boxes of shape (N, 4) in model input pixels.
+    :param info: The LetterboxInfo of the image (see QtFusion.models.Preprocess), or any (ratio, (left, top), (height,
+                 width)) tuple.
+    :param clip: Whether to clip the boxes to the original image. Default is True.
+    :param out: An optional output array, which may be 'boxes' itself. Default is None, which allocates one.
+    :return: The rescaled boxes.
+    """
+    ratio, (left, top), (height, width) = info
+    boxes = np.asarray(boxes)
+    if out is None:
+        out = np.empty_like(boxes, dtype=np.result_type(boxes.dtype, np.float32))
+    np.subtract(boxes, (left, top, left, top), out=out)
+    out /= ratio
+    if clip:
+        np.clip(out[:, 0::2], 0, width, out=out[:, 0::2])
+        np.clip(out[:, 1::2], 0, height, out=out[:, 1::2])
+    return out
+
+
+def postprocess_detections(pred, conf_thres=0.25, iou_thres=0.45, classes=None, agnostic=False, max_det=300,
+                           max_nms=30000, info=None, objectness=False, channels_first=False):
+    """
+    The complete postprocessing of one image: confidence filtering, NMS and rescaling to the original image.
+
+    :param pred: Raw detections of shape (N, 4 + C) (see filter_detections for other layouts).
+    :param conf_thres: The minimum confidence. Default is 0.25.
+    :param iou_thres: The NMS IoU threshold. Default is 0.45.
+    :param classes: An optional sequence of class ids to keep. Default is None (all classes).
+    :param agnostic: Whether boxes of different classes suppress each other. Default is False.
+    :param max_det: The maximum number of detections. Default is 300.
+    :param max_nms: The maximum number of candidates passed to NMS, chosen by score. Default is 30000.
+    :param info: The LetterboxInfo to map boxes back to the original image. Default is None (model input pixels).
+    :param objectness: Whether column 4 is an objectness score. Default is False.
+    :param channels_first: Whether 'pred' has shape (4 + C, N). Default is False.
+    :return: A tuple of (boxes (K, 4) in xyxy, scores (K,), class_ids (K,)), sorted by descending score.
+    """
+    boxes, scores, class_ids = filter_detections(pred, conf_thres, classes, objectness, channels_first)
+    if len(scores) > max_nms:
+        index = topk(scores, max_nms)
+        boxes, scores, class_ids = boxes[index], scores[index], class_ids[index]
+    boxes = xywh2xyxy(boxes)
+    if agnostic:
+        keep = nms(boxes, scores, iou_thres, max_det)
+    else:
+        keep = batched_nms(boxes, scores, class_ids, iou_thres, max_det)
+    boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+    if info is not None:
+        scale_boxes(boxes, info, out=boxes)
+    return boxes, scores, class_ids
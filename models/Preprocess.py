@@ -0,0 +1,209 @@
+# QtFusion, AGPL-3.0 license
+"""
+Letterbox preprocessing for Detector subclasses.
+
+Preprocessor turns BGR frames into the NCHW float batch most detection models expect: letterbox resize to 'imgsz'
+(aspect ratio kept, borders padded), BGR to RGB, HWC to CHW and normalisation. All of it is written into a
+preallocated batch array, so no per-frame arrays are allocated apart from OpenCV internals:
+
+- the resize goes into a cached buffer through cv2.resize(dst=...);
+- cv2.split() separates the channels into cached planes, which are scaled plane by plane straight into the channel
+  order of the batch slot (contiguous reads and writes, faster than one strided transposing pass);
+- the padding is only rewritten when the letterbox geometry of a slot changes.
+
+A typical Detector subclass creates one Preprocessor and uses the returned metadata in postprocess:
+
+    def __init__(self, model_path, device='cpu', imgsz=640):
+        super().__init__(model_path, device, imgsz)
+        self.preprocessor = Preprocessor(imgsz)
+
+    def preprocess(self, img):
+        batch, self.letterbox = self.preprocessor(img)
+        return batch
+"""
+import weakref
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+LetterboxInfo = namedtuple('LetterboxInfo', ('ratio', 'pad', 'shape'))
+LetterboxInfo.__doc__ = """
+Letterbox metadata of one image, needed to map boxes back to the original image.
+
+ratio: The resize factor applied to the original image.
+pad: The (left, top) padding in pixels of the model input.
+shape: The (height, width) of the original image.
+"""
+
+
+def _geometry(shape, size, stride=None, scaleup=True):
+    """
+    Computes the letterbox geometry of an image.
+
+    :param shape: The (height, width) of the image.
+    :param size: The (height, width) of the model input.
+    :param stride: If set, the padded size is the smallest multiple of the stride (minimum rectangle); otherwise the
+                   image is padded to 'size'.
+    :param scaleup: Whether images smaller than 'size' are enlarged.
+    :return: A tuple of (ratio, (resized height, resized width), (left, top), (padded height, padded width)).
+    """
+    h, w = shape
+    ratio = min(size[0] / h, size[1] / w)
+    if not scaleup:
+        ratio = min(ratio, 1.0)
+    nh, nw = int(round(h * ratio)), int(round(w * ratio))
+    if stride:
+        out_h, out_w = nh + (-nh) % stride, nw + (-nw) % stride
+    else:
+        out_h, out_w = size
+    top, left = (out_h - nh) // 2, (out_w - nw) // 2
+    return ratio, (nh, nw), (left, top), (out_h, out_w)
+
+
+def letterbox(image, imgsz=640, color=(114, 114, 114), stride=None, scaleup=True, interpolation=cv2.INTER_LINEAR):
+    """
+    Resizes an image with unchanged aspect ratio and pads it to the target size.
+
+    :param image: The BGR image.
+    :param imgsz: The target size as an int or (height, width).
+    :param color: The padding colour. Default is (114, 114, 114).
+    :param stride: If set, pads only to the next multiple of the stride instead of the full size. Default is None.
+    :param scaleup: Whether images smaller than the target are enlarged. Default is True.
+    :param interpolation: The cv2 interpolation flag. Default is cv2.INTER_LINEAR.
+    :return: A tuple of (letterboxed image, LetterboxInfo).
+    """
+    size = (imgsz, imgsz) if isinstance(imgsz, int) else tuple(imgsz)
+    shape = image.shape[:2]
+    ratio, (nh, nw), (left, top), (out_h, out_w) = _geometry(shape, size, stride, scaleup)
+    if (nh, nw) != shape:
+        image = cv2.resize(image, (nw, nh), interpolation=interpolation)
+    image = cv2.copyMakeBorder(image, top, out_h - nh - top, left, out_w - nw - left, cv2.BORDER_CONSTANT,
+                               value=color)
+    return image, LetterboxInfo(ratio, (left, top), shape)
+
+
+def _forget(layouts, key):
+    """
+    Returns a weak reference callback that removes the entry of a freed batch array.
+    """
+    def callback(ref):
+        if layouts.get(key, (None,))[0] is ref:
+            del layouts[key]
+    return callback
+
+
+class Preprocessor:
+    """
+    Letterbox preprocessing into a preallocated NCHW batch.
+
+    The Preprocessor owns a batch array of 'batch_size' slots, which is reused by every call. Callers that keep a
+    batch beyond the next call, or want to manage the memory themselves (e.g. pinned or shared memory), pass their
+    own array through 'out'; allocate() creates one of the right shape.
+    """
+
+    def __init__(self, imgsz=640, batch_size=1, rgb=True, scale=1 / 255.0, mean=None, std=None, pad_value=114,
+                 dtype=np.float32, interpolation=cv2.INTER_LINEAR, scaleup=True):
+        """
+        Initializes the Preprocessor and allocates its batch array.
+
+        :param imgsz: The model input size as an int or (height, width). Default is 640.
+        :param batch_size: The number of slots of the internal batch array. Default is 1.
+        :param rgb: Whether to reverse BGR frames to RGB. Default is True.
+        :param scale: The factor applied to the pixel values. Default is 1/255.
+        :param mean: Optional per-channel mean subtracted after scaling, in output channel order.
+        :param std: Optional per-channel standard deviation divided by after subtracting the mean.
+        :param pad_value: The padding grey value in pixel units (before scaling). Default is 114.
+        :param dtype: The dtype of the batch array. Default is np.float32.
+        :param interpolation: The cv2 interpolation flag. Default is cv2.INTER_LINEAR.
+        :param scaleup: Whether images smaller than 'imgsz' are enlarged. Default is True.
+        """
+        self.size = (imgsz, imgsz) if isinstance(imgsz, int) else tuple(imgsz)
+        self.rgb = rgb
+        self.scale = scale
+        self.mean = None if mean is None else np.asarray(mean, dtype).reshape(3, 1, 1)
+        self.std = None if std is None else np.asarray(std, dtype).reshape(3, 1, 1)
+        self.dtype = np.dtype(dtype)
+        self.interpolation = interpolation
+        self.scaleup = scaleup
+        self.fill = self._normalize(np.full((3, 1, 1), pad_value * scale, self.dtype))
+        self.buffer = self.allocate(batch_size)
+        self._buffers = {}  # (height, width) -> (uint8 resize buffer, list of three uint8 channel planes)
+        self._layouts = {}  # id of batch array -> (weak reference to the array, {slot: geometry written to the slot})
+
+    def allocate(self, batch_size):
+        """
+        Allocates a batch array for this preprocessor.
+
+        :param batch_size: The number of slots.
+        :return: An uninitialised array of shape (batch_size, 3, height, width).
+        """
+        return np.empty((batch_size, 3) + self.size, self.dtype)
+
+    def __call__(self, images, out=None):
+        """
+        Preprocesses one image or a list of images.
+
+        :param images: A BGR uint8 image or a list of them.
+        :param out: A batch array from allocate() to write into. Default is None, which uses (and grows if needed)
+                    the internal array.
+        :return: A tuple of (batch, infos): the view of the first len(images) slots of the batch array, and one
+                 LetterboxInfo per image.
+        """
+        if isinstance(images, np.ndarray):
+            images = (images,)
+        if out is None:
+            if len(images) > len(self.buffer):
+                self.buffer = self.allocate(len(images))
+            out = self.buffer
+        elif len(images) > len(out):
+            raise ValueError('Batch array has {} slots for {} images.'.format(len(out), len(images)))
+        infos = [self._fill(image, out, i) for i, image in enumerate(images)]
+        return out[:len(images)], infos
+
+    def _normalize(self, array):
+        """
+        Applies mean and std in place to an already scaled array.
+        """
+        if self.mean is not None:
+            array -= self.mean
+        if self.std is not None:
+            array /= self.std
+        return array
+
+    def _fill(self, image, out, index):
+        """
+        Letterboxes one image into a slot of the batch array.
+        """
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        shape = image.shape[:2]
+        ratio, (nh, nw), (left, top), _ = _geometry(shape, self.size, None, self.scaleup)
+        slot = out[index]
+
+        # Padding only has to be written when the geometry of this slot changes, e.g. for the first frame. The entry
+        # of a batch array is dropped when the array is freed, so arrays passed once do not accumulate.
+        entry = self._layouts.get(id(out))
+        if entry is None or entry[0]() is not out:
+            entry = self._layouts[id(out)] = (weakref.ref(out, _forget(self._layouts, id(out))), {})
+        geometry = (nh, nw, left, top)
+        if entry[1].get(index) != geometry:
+            slot[...] = self.fill
+            entry[1][index] = geometry
+
+        buffers = self._buffers.get((nh, nw))
+        if buffers is None:
+            buffers = self._buffers[(nh, nw)] = (np.empty((nh, nw, 3), np.uint8),
+                                                 [np.empty((nh, nw), np.uint8) for _ in range(3)])
+        resized, planes = buffers
+        if (nh, nw) != shape:
+            cv2.resize(image, (nw, nh), dst=resized, interpolation=self.interpolation)
+        else:
+            resized = image
+        cv2.split(resized, planes)
+
+        roi = slot[:, top:top + nh, left:left + nw]
+        for channel, plane in enumerate(reversed(planes) if self.rgb else planes):
+            np.multiply(plane, self.scale, out=roi[channel], dtype=self.dtype, casting='unsafe')
+        self._normalize(roi)
+        return LetterboxInfo(ratio, (left, top), shape)
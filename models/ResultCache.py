@@ -0,0 +1,219 @@
+# QtFusion, AGPL-3.0 license
+"""
+Inference result cache for still images.
+
+Re-opening an image in ImageHandler, or re-running a directory after changing only display options, runs the whole
+preprocess -> predict -> postprocess chain again for identical input. ResultCache stores the postprocessed results
+under a key built from:
+
+- a fast non-cryptographic digest of the decoded pixel buffer, its shape and dtype (xxHash when the 'xxhash' package
+  is installed, zlib CRC-32 and Adler-32 otherwise), so renamed or re-encoded files with the same pixels still hit;
+- the model identity: the model file with its modification time and the device, as used by the ModelRegistry;
+- the input size and the settings that change the result, e.g. the confidence and IoU thresholds.
+
+Results are kept in an in-memory LRU and, optionally, in an SQLite file that survives restarts. The disk store holds
+results made of NumPy arrays (an array, a tuple or list of arrays, or a dict of arrays), serialised in the npz format
+without pickling; other results are only cached in memory.
+
+The cache is opt-in. Detector.set_result_cache() enables it for Detector.detect(), e.g. in an ImageHandler frame
+processor:
+
+    detector.set_result_cache(ResultCache(max_items=512, path='results.sqlite'))
+    boxes, scores, class_ids = detector.detect(image)
+"""
+import io
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+_MISSING = object()
+
+
+def image_digest(image):
+    """
+    Computes a content digest of a decoded image.
+
+    :param image: A NumPy array.
+    :return: A string made of the hexadecimal digest of the pixel buffer, the shape and the dtype.
+    """
+    buffer = np.ascontiguousarray(image)
+    if xxhash is not None:
+        digest = xxhash.xxh3_64_hexdigest(buffer)
+    else:
+        digest = '{:08x}{:08x}'.format(zlib.crc32(buffer), zlib.adler32(buffer))
+    return '{}:{}:{}'.format(digest, 'x'.join(map(str, buffer.shape)), buffer.dtype.str)
+
+
+def _pack(result):
+    """
+    Serialises a result of NumPy arrays to npz bytes.
+
+    :return: The bytes, or None if the result is not made of arrays.
+    """
+    if isinstance(result, np.ndarray):
+        kind, arrays = 'array', {'0': result}
+    elif isinstance(result, (tuple, list)) and all(isinstance(a, np.ndarray) for a in result):
+        kind, arrays = type(result).__name__, {str(i): a for i, a in enumerate(result)}
+    elif isinstance(result, dict) and all(isinstance(k, str) and isinstance(a, np.ndarray) for k, a in
+                                          result.items()):
+        kind, arrays = 'dict', dict(result)
+    else:
+        return None
+    if any(a.dtype.hasobject for a in arrays.values()):
+        return None
+    stream = io.BytesIO()
+    np.savez(stream, __kind__=np.array(kind), __keys__=np.array(list(arrays), dtype=str),
+             **{'a{}'.format(i): a for i, a in enumerate(arrays.values())})
+    return stream.getvalue()
+
+
+def _unpack(data):
+    """
+    Restores a result serialised by _pack().
+    """
+    with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+        kind = str(npz['__kind__'])
+        keys = [str(k) for k in npz['__keys__']]
+        arrays = [npz['a{}'.format(i)] for i in range(len(keys))]
+    if kind == 'array':
+        return arrays[0]
+    if kind == 'dict':
+        return dict(zip(keys, arrays))
+    return tuple(arrays) if kind == 'tuple' else arrays
+
+
+class ResultCache:
+    """
+    Caches inference results by (image content, model identity, imgsz, settings).
+
+    Results are returned as stored, so callers must not modify them in place. The cache is thread-safe.
+    """
+
+    def __init__(self, max_items=256, path=None):
+        """
+        Initializes the cache.
+
+        :param max_items: The maximum number of results kept in memory; the least recently used ones are dropped
+                          first. Default is 256.
+        :param path: An optional SQLite file for a persistent store. Default is None (memory only).
+        """
+        self.max_items = max_items
+        self.path = path
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, data BLOB, created REAL)')
+            self._db.commit()
+
+    @staticmethod
+    def key(image, model=None, imgsz=None, params=None):
+        """
+        Builds the cache key of an inference.
+
+        :param image: The decoded image, or a digest from image_digest().
+        :param model: The model identity, e.g. ModelRegistry.key() of the model file. Default is None.
+        :param imgsz: The model input size. Default is None.
+        :param params: A dictionary of the settings that change the result, e.g. {'conf': 0.25, 'iou': 0.45}.
+                       Default is None.
+        :return: The key string.
+        """
+        digest = image if isinstance(image, str) else image_digest(image)
+        settings = sorted((params or {}).items())
+        return '|'.join((digest, repr(model), repr(imgsz), repr(settings)))
+
+    def get(self, key, default=None):
+        """
+        Looks up a result, in memory first, then in the disk store.
+
+        :param key: The key from key().
+        :param default: The value returned on a miss. Default is None.
+        :return: The cached result, or 'default'.
+        """
+        with self._lock:
+            result = self._items.get(key, _MISSING)
+            if result is not _MISSING:
+                self._items.move_to_end(key)
+                self._hits += 1
+                return result
+            row = None
+            if self._db is not None:
+                row = self._db.execute('SELECT data FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self._misses += 1
+                return default
+            result = _unpack(row[0])
+            self._disk_hits += 1
+            self._store(key, result)
+            return result
+
+    def put(self, key, result):
+        """
+        Stores a result in memory and, if it is made of arrays, in the disk store.
+
+        :param key: The key from key().
+        :param result: The result.
+        """
+        data = _pack(result) if self._db is not None else None
+        with self._lock:
+            self._store(key, result)
+            if data is not None and self._db is not None:
+                self._db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?)', (key, data, time.time()))
+                self._db.commit()
+
+    def clear(self, disk=True):
+        """
+        Removes all results.
+
+        :param disk: Whether to empty the disk store too. Default is True.
+        """
+        with self._lock:
+            self._items.clear()
+            if disk and self._db is not None:
+                self._db.execute('DELETE FROM results')
+                self._db.commit()
+
+    def stats(self):
+        """
+        Returns the cache statistics.
+
+        :return: A dictionary with the number of 'items' in memory, the 'hits' served from memory, the 'disk_hits',
+                 the 'misses' and the 'disk_items' (None without a disk store).
+        """
+        with self._lock:
+            disk_items = None
+            if self._db is not None:
+                disk_items = self._db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            return {'items': len(self._items), 'hits': self._hits, 'disk_hits': self._disk_hits,
+                    'misses': self._misses, 'disk_items': disk_items}
+
+    def close(self):
+        """
+        Closes the disk store. The in-memory results stay available.
+        """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _store(self, key, result):
+        """
+        Inserts a result into the memory LRU. Called with the lock held.
+        """
+        self._items[key] = result
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
@@ -0,0 +1,379 @@
+# QtFusion, AGPL-3.0 license
+"""
+Multi-object tracking for detection pipelines.
+
+MultiObjectTracker carries boxes between detections with a constant-velocity Kalman filter per track and assigns
+detections to tracks by IoU, then by normalised centroid distance for fast objects whose prediction no longer
+overlaps. All tracks are predicted and corrected at once with batched NumPy operations. Every track keeps its id for
+its whole life, so colours picked by id (e.g. paletteArray(64)[tracks.ids % 64] from QtFusion.utils.Palette) do not
+flicker from frame to frame the way colours picked by detection order do.
+
+TrackingStage puts a detector and a tracker into the MediaHandler processor chain. Detection runs only on every K-th
+frame, or earlier when the tracker is uncertain; the frames in between are served by the tracker alone:
+
+    stage = TrackingStage(detector, detect_interval=5, draw=draw_tracks)
+    handler.addFrameProcessor(stage)
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .Postprocess import box_iou
+
+Tracks = namedtuple('Tracks', ('boxes', 'ids', 'scores', 'class_ids'))
+Tracks.__doc__ = """
+The confirmed tracks of a frame, as parallel arrays.
+
+boxes: The (N, 4) boxes in (x1, y1, x2, y2).
+ids: The (N,) track ids, unique for the lifetime of the tracker.
+scores: The (N,) scores of the last detection of every track.
+class_ids: The (N,) class ids of the last detection of every track.
+"""
+
+# Constant-velocity model over (center x, center y, width, height) and their velocities, one frame per step.
+_F = np.eye(8)
+_F[:4, 4:] = np.eye(4)
+
+
+def _xyxy2cxcywh(boxes):
+    """
+    Converts (x1, y1, x2, y2) boxes to (center x, center y, width, height).
+    """
+    wh = boxes[:, 2:4] - boxes[:, 0:2]
+    return np.concatenate((boxes[:, 0:2] + wh / 2, wh), axis=1)
+
+
+def _cxcywh2xyxy(boxes):
+    """
+    Converts (center x, center y, width, height) boxes to (x1, y1, x2, y2).
+    """
+    half = np.maximum(boxes[:, 2:4], 0) / 2
+    return np.concatenate((boxes[:, 0:2] - half, boxes[:, 0:2] + half), axis=1)
+
+
+def _greedyMatch(score, threshold):
+    """
+    Matches rows to columns greedily by descending score.
+
+    :param score: An (N, M) score matrix.
+    :param threshold: Pairs with a score at or below the threshold are never matched.
+    :return: A tuple of (row indices, column indices) of the matched pairs.
+    """
+    rows, cols = np.nonzero(score > threshold)
+    order = np.argsort(-score[rows, cols], kind='stable')
+    used_rows, used_cols = set(), set()
+    matched_rows, matched_cols = [], []
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row not in used_rows and col not in used_cols:
+            used_rows.add(row)
+            used_cols.add(col)
+            matched_rows.append(row)
+            matched_cols.append(col)
+    return np.asarray(matched_rows, dtype=np.intp), np.asarray(matched_cols, dtype=np.intp)
+
+
+class MultiObjectTracker:
+    """
+    Tracks detections across frames with one constant-velocity Kalman filter per track.
+
+    Call update() once per frame: with the detections of the frame when the detector ran, without them otherwise.
+    A track is confirmed after 'min_hits' matched detections and removed after 'max_misses' consecutive detection
+    rounds without a match. Frames without detections do not count as misses.
+    """
+
+    def __init__(self, iou_thres=0.3, centroid_thres=1.0, min_hits=2, max_misses=2, class_aware=True,
+                 std_position=1 / 20, std_velocity=1 / 160):
+        """
+        Initializes an empty tracker.
+
+        :param iou_thres: The minimum IoU between a predicted track and a detection to match them. Default is 0.3.
+        :param centroid_thres: The maximum centre distance, in units of the track size (the square root of its area),
+                               for matching the tracks and detections left over by the IoU stage. 0 disables the
+                               centroid stage. Default is 1.0.
+        :param min_hits: The number of matched detections after which a track is reported. Default is 2.
+        :param max_misses: The number of consecutive detection rounds a track may go unmatched before it is removed.
+                           Default is 2.
+        :param class_aware: Whether detections only match tracks of the same class. Default is True.
+        :param std_position: The position noise, relative to the box size. Default is 1/20.
+        :param std_velocity: The velocity noise per frame, relative to the box size. Default is 1/160.
+        """
+        self.iou_thres = iou_thres
+        self.centroid_thres = centroid_thres
+        self.min_hits = min_hits
+        self.max_misses = max_misses
+        self.class_aware = class_aware
+        self.std_position = std_position
+        self.std_velocity = std_velocity
+        self._next_id = 1
+        self.reset()
+
+    def reset(self):
+        """
+        Removes all tracks. Track ids are not reused.
+        """
+        self._mean = np.empty((0, 8))
+        self._cov = np.empty((0, 8, 8))
+        self._ids = np.empty(0, dtype=np.int64)
+        self._scores = np.empty(0, dtype=np.float32)
+        self._classes = np.empty(0, dtype=np.int64)
+        self._hits = np.empty(0, dtype=np.int64)
+        self._misses = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        """
+        Returns the number of tracks, confirmed or not.
+        """
+        return len(self._ids)
+
+    def update(self, boxes=None, scores=None, class_ids=None):
+        """
+        Advances all tracks by one frame and, if detections are given, corrects them with the detections.
+
+        :param boxes: The (M, 4) detected boxes in (x1, y1, x2, y2), or None for a frame without detection.
+        :param scores: The (M,) detection scores. Default is None (all 1).
+        :param class_ids: The (M,) detection class ids. Default is None (all 0).
+        :return: The Tracks of the confirmed tracks matched in the last detection round.
+        """
+        self._predict()
+        if boxes is not None:
+            boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+            count = len(boxes)
+            scores = np.ones(count, np.float32) if scores is None else np.asarray(scores, np.float32).reshape(-1)
+            class_ids = np.zeros(count, np.int64) if class_ids is None else np.asarray(class_ids).reshape(-1)
+            self._correct(boxes, scores, class_ids.astype(np.int64, copy=False))
+        return self.tracks()
+
+    def tracks(self):
+        """
+        Returns the current confirmed tracks, i.e. the tracks with at least 'min_hits' matched detections that were
+        matched in the last detection round.
+
+        :return: A Tracks tuple.
+        """
+        keep = (self._hits >= self.min_hits) & (self._misses == 0)
+        return Tracks(_cxcywh2xyxy(self._mean[keep, :4]).astype(np.float32), self._ids[keep].copy(),
+                      self._scores[keep].copy(), self._classes[keep].copy())
+
+    def uncertainty(self):
+        """
+        Estimates how far the predictions may be off, to decide whether the detector should run.
+
+        :return: The largest standard deviation of a confirmed track position, relative to the track size, or 0.0
+                 without confirmed tracks.
+        """
+        keep = (self._hits >= self.min_hits) & (self._misses == 0)
+        if not keep.any():
+            return 0.0
+        variance = self._cov[keep, 0, 0] + self._cov[keep, 1, 1]
+        size = np.sqrt(np.maximum(self._mean[keep, 2] * self._mean[keep, 3], 1.0))
+        return float((np.sqrt(variance) / size).max())
+
+    def hasTentative(self):
+        """
+        Checks for tracks that are not confirmed yet.
+
+        :return: True if a track still needs more detections to be confirmed.
+        """
+        return bool((self._hits < self.min_hits).any())
+
+    def _noise(self, wh, position, velocity):
+        """
+        Builds diagonal covariance matrices scaled by the box sizes.
+
+        :param wh: The (N, 2) widths and heights.
+        :return: An (N, 8, 8) array, or (N, 4, 4) if 'velocity' is None.
+        """
+        scale = np.concatenate((wh, wh), axis=1)
+        std = position * scale if velocity is None else np.concatenate((position * scale, velocity * scale), axis=1)
+        eye = np.eye(std.shape[1])
+        return (std ** 2)[:, :, None] * eye
+
+    def _predict(self):
+        """
+        Advances the state of all tracks by one frame.
+        """
+        if not len(self._mean):
+            return
+        self._mean = self._mean @ _F.T
+        wh = np.maximum(self._mean[:, 2:4], 1.0)
+        self._cov = _F @ self._cov @ _F.T + self._noise(wh, self.std_position, self.std_velocity)
+
+    def _correct(self, boxes, scores, class_ids):
+        """
+        Matches the detections of a frame to the tracks, corrects the matched tracks, starts tracks for the
+        unmatched detections and removes tracks that were missed too often.
+        """
+        measurements = _xyxy2cxcywh(boxes)
+        track_rows, det_cols = np.empty(0, np.intp), np.empty(0, np.intp)
+        if len(self._ids) and len(boxes):
+            same_class = class_ids[None, :] == self._classes[:, None] if self.class_aware else None
+            iou = box_iou(_cxcywh2xyxy(self._mean[:, :4]), boxes)
+            if same_class is not None:
+                iou[~same_class] = 0
+            track_rows, det_cols = _greedyMatch(iou, self.iou_thres)
+
+            if self.centroid_thres:
+                free_tracks = np.setdiff1d(np.arange(len(self._ids)), track_rows)
+                free_dets = np.setdiff1d(np.arange(len(boxes)), det_cols)
+                if len(free_tracks) and len(free_dets):
+                    centers = self._mean[free_tracks, :2]
+                    size = np.sqrt(np.maximum(self._mean[free_tracks, 2] * self._mean[free_tracks, 3], 1.0))
+                    distance = np.linalg.norm(centers[:, None] - measurements[None, free_dets, :2], axis=2)
+                    closeness = self.centroid_thres - distance / size[:, None]
+                    if same_class is not None:
+                        closeness[~same_class[np.ix_(free_tracks, free_dets)]] = -1
+                    rows, cols = _greedyMatch(closeness, 0)
+                    track_rows = np.concatenate((track_rows, free_tracks[rows]))
+                    det_cols = np.concatenate((det_cols, free_dets[cols]))
+
+        if len(track_rows):
+            self._update(track_rows, measurements[det_cols])
+            self._scores[track_rows] = scores[det_cols]
+            self._classes[track_rows] = class_ids[det_cols]
+        matched = np.zeros(len(self._ids), dtype=bool)
+        matched[track_rows] = True
+        self._hits[matched] += 1
+        self._misses[matched] = 0
+        self._misses[~matched] += 1
+
+        alive = self._misses <= self.max_misses
+        if not alive.all():
+            self._mean, self._cov = self._mean[alive], self._cov[alive]
+            self._ids, self._scores, self._classes = self._ids[alive], self._scores[alive], self._classes[alive]
+            self._hits, self._misses = self._hits[alive], self._misses[alive]
+
+        new = np.setdiff1d(np.arange(len(boxes)), det_cols)
+        if len(new):
+            self._start(measurements[new], scores[new], class_ids[new])
+
+    def _update(self, rows, measurements):
+        """
+        Kalman update of the tracks 'rows' with their (K, 4) measurements.
+        """
+        mean, cov = self._mean[rows], self._cov[rows]
+        innovation_cov = cov[:, :4, :4] + self._noise(np.maximum(mean[:, 2:4], 1.0), self.std_position, None)
+        cross = cov[:, :, :4]  # P H^T
+        gain = np.linalg.solve(innovation_cov, cross.transpose(0, 2, 1)).transpose(0, 2, 1)
+        residual = measurements - mean[:, :4]
+        self._mean[rows] = mean + (gain @ residual[:, :, None])[:, :, 0]
+        self._cov[rows] = cov - gain @ cross.transpose(0, 2, 1)
+
+    def _start(self, measurements, scores, class_ids):
+        """
+        Starts new tracks at the given (K, 4) measurements.
+        """
+        count = len(measurements)
+        wh = np.maximum(measurements[:, 2:4], 1.0)
+        mean = np.concatenate((measurements, np.zeros((count, 4))), axis=1)
+        cov = self._noise(wh, 2 * self.std_position, 10 * self.std_velocity)
+        ids = np.arange(self._next_id, self._next_id + count, dtype=np.int64)
+        self._next_id += count
+        self._mean = np.concatenate((self._mean, mean))
+        self._cov = np.concatenate((self._cov, cov))
+        self._ids = np.concatenate((self._ids, ids))
+        self._scores = np.concatenate((self._scores, scores))
+        self._classes = np.concatenate((self._classes, class_ids))
+        self._hits = np.concatenate((self._hits, np.ones(count, dtype=np.int64)))
+        self._misses = np.concatenate((self._misses, np.zeros(count, dtype=np.int64)))
+
+
+class TrackingStage:
+    """
+    A frame processor that runs a detector on a subset of frames and a tracker on all of them.
+
+    The detector runs on the first frame, then every 'detect_interval' frames, and earlier when the tracker holds
+    unconfirmed tracks or its predictions have become too uncertain. The tracks of every frame are stored in
+    'latest_tracks', passed to 'on_tracks' and, if 'draw' is given, drawn onto the frame.
+
+    Attributes:
+        latest_tracks (Tracks): The tracks of the most recent frame.
+        detected (bool): Whether the detector ran on the most recent frame.
+    """
+
+    def __init__(self, detector, detect_interval=5, tracker=None, max_uncertainty=0.5, on_tracks=None, draw=None):
+        """
+        Initializes the stage.
+
+        :param detector: A Detector, whose detect() must return (boxes, scores, class_ids) with (x1, y1, x2, y2)
+                         boxes in frame pixels, or a callable taking a frame and returning the same.
+        :param detect_interval: Run the detector at least every n-th frame. 1 detects on every frame. Default is 5.
+        :param tracker: The MultiObjectTracker. Default is None, which creates one with default settings.
+        :param max_uncertainty: Run the detector early once tracker.uncertainty() exceeds this value. Default is 0.5.
+        :param on_tracks: A callable receiving the Tracks of every frame. Default is None.
+        :param draw: A callable taking (frame, tracks) and returning the frame to pass on, e.g. with boxes coloured by
+                     track id. Default is None (the frame is passed on unchanged).
+        """
+        self.detect = getattr(detector, 'detect', detector)
+        self.detect_interval = detect_interval
+        self.tracker = tracker if tracker is not None else MultiObjectTracker()
+        self.max_uncertainty = max_uncertainty
+        self.on_tracks = on_tracks
+        self.draw = draw
+        self.latest_tracks = None
+        self.detected = False
+        self._since_detection = None
+        self._frames = 0
+        self._detections = 0
+        self._detect_ms = 0.0
+        self._track_ms = 0.0
+
+    def __call__(self, image):
+        """
+        Processes a frame.
+
+        :param image: The BGR frame.
+        :return: The frame, with the tracks drawn if 'draw' is set.
+        """
+        self._frames += 1
+        self.detected = self._needsDetection()
+        start = time.perf_counter()
+        if self.detected:
+            boxes, scores, class_ids = self.detect(image)
+            detected = time.perf_counter()
+            self._detect_ms += (detected - start) * 1000
+            tracks = self.tracker.update(boxes, scores, class_ids)
+            self._detections += 1
+            self._since_detection = 0
+        else:
+            detected = start
+            tracks = self.tracker.update()
+            self._since_detection += 1
+        self._track_ms += (time.perf_counter() - detected) * 1000
+
+        self.latest_tracks = tracks
+        if self.on_tracks is not None:
+            self.on_tracks(tracks)
+        if self.draw is not None:
+            image = self.draw(image, tracks)
+        return image
+
+    def reset(self):
+        """
+        Removes all tracks, e.g. when the media source changes, so the next frame runs the detector.
+        """
+        self.tracker.reset()
+        self.latest_tracks = None
+        self._since_detection = None
+
+    def stats(self):
+        """
+        Returns the counts and average costs of the stage.
+
+        :return: A dictionary with the number of 'frames', of 'detections', the 'detection_ratio', the average
+                 'detect_ms' per detection and 'track_ms' per frame, and the number of 'tracks'.
+        """
+        frames, detections = self._frames, self._detections
+        return {'frames': frames, 'detections': detections,
+                'detection_ratio': detections / frames if frames else 0.0,
+                'detect_ms': self._detect_ms / detections if detections else 0.0,
+                'track_ms': self._track_ms / frames if frames else 0.0, 'tracks': len(self.tracker)}
+
+    def _needsDetection(self):
+        """
+        Decides whether the detector runs on the current frame.
+        """
+        if self._since_detection is None or self._since_detection + 1 >= self.detect_interval:
+            return True
+        tracker = self.tracker
+        return tracker.hasTentative() or tracker.uncertainty() > self.max_uncertainty
@@ -1,5 +1,14 @@
 # QtFusion, AGPL-3.0 license
 from .AbstractModel import Detector
+from .ModelRegistry import ModelRegistry, model_registry
+from .ResultCache import ResultCache, image_digest
 from .Heatmap import HeatmapGenerator
+from .Preprocess import Preprocessor, LetterboxInfo, letterbox
+from .Tracker import MultiObjectTracker, TrackingStage, Tracks
+from .Postprocess import (postprocess_detections, filter_detections, nms, batched_nms, scale_boxes, topk, box_iou,
+                          xywh2xyxy)
 
-__all__ = 'Detector', 'HeatmapGenerator'
+__all__ = ('Detector', 'ModelRegistry', 'model_registry', 'ResultCache', 'image_digest', 'HeatmapGenerator',
+           'Preprocessor', 'LetterboxInfo', 'letterbox', 'MultiObjectTracker', 'TrackingStage', 'Tracks',
+           'postprocess_detections', 'filter_detections', 'nms', 'batched_nms', 'scale_boxes', 'topk', 'box_iou',
+           'xywh2xyxy')
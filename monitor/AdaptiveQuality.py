@@ -0,0 +1,291 @@
+# QtFusion, AGPL-3.0 license
+"""
+Adaptive quality control for detection pipelines.
+
+On slow machines a MediaHandler with a detector falls behind: every frame takes longer than the frame period and the
+latency grows. AdaptiveQualityController watches the latency of every processed frame and walks a ladder of
+operating points, each one cheaper than the previous, to keep the latency under a target:
+
+1. optionally, fast instead of smooth display scaling (see QtFusion.utils.Pixmap.setSmoothScaling);
+2. longer heatmap update intervals (HeatmapGenerator.update_interval);
+3. smaller detector input sizes from the configured imgsz ladder (Detector.set_imgsz);
+4. processing only every n-th frame (MediaHandler.setProcessInterval).
+
+The controller steps down after the smoothed latency has exceeded the target by a margin for several frames, and
+steps back up only after it has stayed well below the target of the better operating point for a longer time. The
+gap between both thresholds, the different dwell times, a cooldown after every change and a doubling of the dwell time
+after an upgrade that had to be undone keep it from oscillating between two operating points.
+
+    controller = AdaptiveQualityController(target_latency_ms=60, imgsz_ladder=(640, 512, 416, 320),
+                                           heatmap_intervals=(1, 2, 4))
+    controller.bind(handler=media_handler, detector=detector, heatmap=heatmap)
+    controller.operatingPointChanged.connect(lambda point: print(point))
+"""
+import time
+
+from PySide6.QtCore import QObject, Signal
+
+
+class AdaptiveQualityController(QObject):
+    """
+    Trades resolution and frame rate for latency, with hysteresis.
+
+    Latency samples come from a bound MediaHandler (the time from the start of the frame processors to the end of the
+    slots connected to 'frameReady' before the controller, which includes the display) or from observe() for other
+    pipelines. With a bound handler, the target is also limited to the time available per processed frame, so the
+    handler timer does not fall behind.
+    """
+
+    operatingPointChanged = Signal(dict)  # Emitted with operatingPoint() after every change of the operating point.
+
+    def __init__(self, target_latency_ms=50.0, imgsz_ladder=None, max_process_interval=3, heatmap_intervals=(1,),
+                 adjust_scaling=False, upper=1.1, lower=0.7, degrade_after=5, upgrade_after=30, cooldown=10,
+                 smoothing=0.2, parent=None):
+        """
+        Initializes the controller at the best operating point.
+
+        :param target_latency_ms: The latency objective per frame in milliseconds. Default is 50.
+        :param imgsz_ladder: The detector input sizes from best to cheapest, e.g. (640, 512, 416, 320). Default is
+                             None (the input size is not changed).
+        :param max_process_interval: The largest process interval; 1 never skips frames. Default is 3.
+        :param heatmap_intervals: The heatmap update intervals from best to cheapest. Default is (1,) (unchanged).
+        :param adjust_scaling: Whether switching to fast display scaling is the first step. It only affects images
+                               scaled with QtFusion.utils.Pixmap.scalePixmap, i.e. plain QLabels shown through
+                               FBaseWindow.dispImage; QImageLabel scales its images in IMcore. Default is False.
+        :param upper: Steps down while the latency is above 'upper' times the target. Default is 1.1.
+        :param lower: Steps up while the latency is below 'lower' times the target of the better point. Default is 0.7.
+        :param degrade_after: The number of consecutive frames above the target before stepping down. Default is 5.
+        :param upgrade_after: The number of consecutive frames below the target before stepping up. Default is 30.
+        :param cooldown: The number of frames ignored after a change, e.g. while a new input size warms up.
+                         Default is 10.
+        :param smoothing: The weight of a new sample in the exponential moving averages. Default is 0.2.
+        :param parent: The parent QObject. Default is None.
+        """
+        super().__init__(parent)
+        self.target_latency_ms = target_latency_ms
+        self.upper = upper
+        self.lower = lower
+        self.degrade_after = degrade_after
+        self.upgrade_after = upgrade_after
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self._adjust_scaling = adjust_scaling
+        self._points = self._buildLadder(imgsz_ladder, max_process_interval, heatmap_intervals, adjust_scaling)
+        self._handler = None
+        self._detector = None
+        self._heatmap = None
+        self._frame_start = None
+        self._level = 0
+        self._changes = 0
+        self._upgrade_wait = upgrade_after
+        self._resetWindow()
+        self._latency = None
+        self._interval = None
+        self._last_frame = None
+
+    @staticmethod
+    def _buildLadder(imgsz_ladder, max_process_interval, heatmap_intervals, adjust_scaling):
+        """
+        Builds the list of operating points from best to cheapest; every point differs from the previous one in a
+        single knob.
+        """
+        ladder = list(imgsz_ladder) if imgsz_ladder else [None]
+        heatmap_intervals = list(heatmap_intervals) or [1]
+        point = {'imgsz': ladder[0], 'process_interval': 1, 'smooth_scaling': True,
+                 'heatmap_interval': heatmap_intervals[0]}
+        points = [dict(point)]
+        if adjust_scaling:
+            point['smooth_scaling'] = False
+            points.append(dict(point))
+        for interval in heatmap_intervals[1:]:
+            point['heatmap_interval'] = interval
+            points.append(dict(point))
+        for imgsz in ladder[1:]:
+            point['imgsz'] = imgsz
+            points.append(dict(point))
+        for interval in range(2, max_process_interval + 1):
+            point['process_interval'] = interval
+            points.append(dict(point))
+        return points
+
+    def bind(self, handler=None, detector=None, heatmap=None):
+        """
+        Connects the controller to the components it adjusts and applies the current operating point to them.
+
+        :param handler: A MediaHandler. Its frames provide the latency samples and its process interval is adjusted.
+        :param detector: A Detector whose input size follows the imgsz ladder.
+        :param heatmap: A HeatmapGenerator whose update interval is adjusted.
+        """
+        self.unbind()
+        self._handler, self._detector, self._heatmap = handler, detector, heatmap
+        if handler is not None:
+            # The start mark runs before all other frame processors, the end mark after the slots connected so far.
+            handler.frame_processors.insert(0, self._markStart)
+            handler.frameReady.connect(self._markEnd)
+        self._apply()
+
+    def unbind(self):
+        """
+        Disconnects the controller from the bound components. Their current settings are kept.
+        """
+        handler = self._handler
+        if handler is not None:
+            if self._markStart in handler.frame_processors:
+                handler.frame_processors.remove(self._markStart)
+            handler.frameReady.disconnect(self._markEnd)
+        self._handler = self._detector = self._heatmap = None
+        self._frame_start = None
+
+    def observe(self, latency_ms, now=None):
+        """
+        Adds the latency of a processed frame and changes the operating point if needed.
+
+        :param latency_ms: The end-to-end latency of the frame in milliseconds.
+        :param now: The time.perf_counter() value at the end of the frame. Default is None (now).
+        """
+        now = time.perf_counter() if now is None else now
+        a = self.smoothing
+        if self._last_frame is not None:
+            interval = (now - self._last_frame) * 1000
+            self._interval = interval if self._interval is None else (1 - a) * self._interval + a * interval
+        self._last_frame = now
+
+        if self._skip > 0:
+            self._skip -= 1
+            return
+        self._latency = latency_ms if self._latency is None else (1 - a) * self._latency + a * latency_ms
+        self._held += 1
+
+        level = self._level
+        if self._latency > self.upper * self._target(level):
+            self._over += 1
+            self._under = 0
+        elif level > 0 and self._latency < self.lower * self._target(level - 1):
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+
+        if self._over >= self.degrade_after and level < len(self._points) - 1:
+            if self._moved_up and self._held < self._upgrade_wait:
+                # The upgrade could not be held: wait longer before trying again.
+                self._upgrade_wait = min(self._upgrade_wait * 2, self.upgrade_after * 8)
+            self._change(level + 1, False)
+        elif self._under >= self._upgrade_wait:
+            self._change(level - 1, True)
+        elif self._moved_up and self._held >= self._upgrade_wait:
+            self._upgrade_wait = self.upgrade_after
+            self._moved_up = False
+
+    def setLevel(self, level):
+        """
+        Moves to an operating point, e.g. to start at a cheaper one on a known slow machine.
+
+        :param level: The index into levels(), 0 being the best quality.
+        """
+        if not 0 <= level < len(self._points):
+            raise ValueError('Level must be between 0 and {}, got {}.'.format(len(self._points) - 1, level))
+        self._change(level, level < self._level)
+
+    def level(self):
+        """
+        Gets the index of the current operating point.
+
+        :return: The level, 0 being the best quality.
+        """
+        return self._level
+
+    def levels(self):
+        """
+        Gets the operating points from best quality to cheapest.
+
+        :return: A list of dictionaries with 'imgsz', 'process_interval', 'smooth_scaling' and 'heatmap_interval'.
+        """
+        return [dict(point) for point in self._points]
+
+    def operatingPoint(self):
+        """
+        Reports the current operating point and the measurements behind it.
+
+        :return: A dictionary with the knob values (see levels()), the 'level', the 'target_ms' of the current point,
+                 the smoothed 'latency_ms' and 'fps' of the processed frames (None before enough samples) and the
+                 number of 'changes' so far.
+        """
+        point = dict(self._points[self._level])
+        point.update({'level': self._level, 'target_ms': self._target(self._level), 'latency_ms': self._latency,
+                      'fps': 1000 / self._interval if self._interval else None, 'changes': self._changes})
+        return point
+
+    def reset(self):
+        """
+        Returns to the best operating point and discards the measurements.
+        """
+        self._upgrade_wait = self.upgrade_after
+        self._change(0, False)
+        self._interval = None
+        self._last_frame = None
+
+    def _target(self, level):
+        """
+        Gets the latency target of an operating point: the configured target, limited to the time available per
+        processed frame at the frame rate of the bound handler.
+        """
+        target = self.target_latency_ms
+        fps = getattr(self._handler, 'fps', None)
+        if fps:
+            target = min(target, 1000 / fps * self._points[level]['process_interval'])
+        return target
+
+    def _resetWindow(self):
+        """
+        Starts a new measurement window after a change.
+        """
+        self._over = self._under = self._held = 0
+        self._skip = self.cooldown
+        self._moved_up = False
+
+    def _change(self, level, up):
+        """
+        Moves to an operating point and applies it.
+        """
+        changed = level != self._level
+        self._level = level
+        self._resetWindow()
+        self._moved_up = up
+        self._latency = None
+        if changed:
+            self._changes += 1
+            self._apply()
+            self.operatingPointChanged.emit(self.operatingPoint())
+
+    def _apply(self):
+        """
+        Applies the current operating point to the bound components.
+        """
+        point = self._points[self._level]
+        if self._adjust_scaling:
+            # Imported here, so importing the monitor package (e.g. for the startup timeline) stays light.
+            from ..utils.Pixmap import setSmoothScaling
+            setSmoothScaling(point['smooth_scaling'])
+        if self._handler is not None:
+            self._handler.setProcessInterval(point['process_interval'])
+        if self._detector is not None and point['imgsz'] is not None and self._detector.imgsz != point['imgsz']:
+            self._detector.set_imgsz(point['imgsz'])
+        if self._heatmap is not None:
+            self._heatmap.update_interval = point['heatmap_interval']
+
+    def _markStart(self, image):
+        """
+        Frame processor that marks the start of a frame.
+        """
+        self._frame_start = time.perf_counter()
+        return image
+
+    def _markEnd(self, image):
+        """
+        Slot that ends the frame started by _markStart and records its latency.
+        """
+        start, self._frame_start = self._frame_start, None
+        if start is not None:
+            now = time.perf_counter()
+            self.observe((now - start) * 1000, now)
@@ -0,0 +1,250 @@
+# QtFusion, AGPL-3.0 license
+"""
+Hot-path metrics for media and image handlers.
+
+HandlerMetrics collects per-stage latency histograms (capture, each frame processor, signal emission, display),
+counters such as processed and dropped frames, and gauges such as queue depths. Histograms use fixed, logarithmically
+spaced buckets, so recording a sample is a binary search and an increment regardless of how long the handler runs.
+
+Handlers that mix in MetricsSource only pay for a single attribute check per frame while metrics are disabled.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+
+# Bucket upper bounds in milliseconds: 20 buckets per decade from 10 microseconds to 100 seconds.
+_BOUNDS = [10 ** (exponent / 20) for exponent in range(-40, 101)]
+
+
+class LatencyHistogram:
+    """
+    A latency histogram with logarithmic buckets and exact count, sum, minimum and maximum.
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float('inf')
+        self.maximum = 0.0
+
+    def record(self, ms):
+        """
+        Adds a sample.
+
+        :param ms: The latency in milliseconds.
+        """
+        self.counts[bisect_left(_BOUNDS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms < self.minimum:
+            self.minimum = ms
+        if ms > self.maximum:
+            self.maximum = ms
+
+    def percentile(self, q):
+        """
+        Estimates a percentile from the buckets.
+
+        :param q: The percentile, between 0 and 100.
+        :return: The estimated latency in milliseconds (the upper bound of the bucket holding the percentile, limited
+                 to the observed maximum), or 0.0 if there are no samples.
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank and bucket:
+                return min(_BOUNDS[i] if i < len(_BOUNDS) else self.maximum, self.maximum)
+        return self.maximum
+
+    def snapshot(self):
+        """
+        Summarizes the histogram.
+
+        :return: A dictionary with the count, mean, min, p50, p90, p99 and max latency in milliseconds.
+        """
+        if not self.count:
+            return {'count': 0}
+        return {'count': self.count, 'mean': self.total / self.count, 'min': self.minimum,
+                'p50': self.percentile(50), 'p90': self.percentile(90), 'p99': self.percentile(99),
+                'max': self.maximum}
+
+
+class HandlerMetrics:
+    """
+    Latency histograms, counters and gauges of one handler.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all recorded values.
+        """
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+            self.gauges = {}
+            self.started = time.perf_counter()
+
+    def record(self, stage, ms):
+        """
+        Adds a latency sample to a stage.
+
+        :param stage: The stage name, e.g. 'capture', 'processor:detect', 'emit' or 'display'.
+        :param ms: The latency in milliseconds.
+        """
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = LatencyHistogram()
+            histogram.record(ms)
+
+    def count(self, name, n=1):
+        """
+        Increments a counter.
+
+        :param name: The counter name, e.g. 'frames' or 'dropped'.
+        :param n: The increment.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        """
+        Sets a gauge, such as a queue depth, and tracks its maximum.
+
+        :param name: The gauge name.
+        :param value: The current value.
+        """
+        with self._lock:
+            current = self.gauges.get(name)
+            self.gauges[name] = {'value': value, 'max': value if current is None else max(current['max'], value)}
+
+    def snapshot(self):
+        """
+        Gets a copy of all values.
+
+        :return: A dictionary with the elapsed seconds, the throughput in frames per second, and the 'stages',
+                 'counters' and 'gauges' dictionaries.
+        """
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            return {'elapsed_s': elapsed,
+                    'fps': self.counters.get('frames', 0) / elapsed if elapsed > 0 else 0.0,
+                    'stages': {name: histogram.snapshot() for name, histogram in self.stages.items()},
+                    'counters': dict(self.counters),
+                    'gauges': {name: dict(gauge) for name, gauge in self.gauges.items()}}
+
+
+def processorName(func):
+    """
+    Gets the stage name used for a frame processor.
+
+    :param func: The frame processing callable.
+    :return: 'processor:' followed by the qualified name of the function or the class name of the callable.
+    """
+    name = getattr(func, '__qualname__', None) or type(func).__name__
+    return f"processor:{name}"
+
+
+@contextmanager
+def _timed(metrics, stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.record(stage, (time.perf_counter() - start) * 1000)
+
+
+class MetricsSource:
+    """
+    Mixin that adds opt-in metrics to a handler. The host class must define a 'metricsUpdated' signal.
+    """
+
+    _metrics = None
+    _metrics_interval = 1.0
+    _metrics_published = 0.0
+
+    def enableMetrics(self, enabled=True, interval=1.0):
+        """
+        Enables or disables metrics collection. Enabling starts from empty metrics.
+
+        :param enabled: True to collect metrics, False to stop collecting them.
+        :param interval: The minimum number of seconds between two metricsUpdated signals.
+        """
+        self._metrics = HandlerMetrics() if enabled else None
+        self._metrics_interval = interval
+        self._metrics_published = time.perf_counter()
+
+    def metricsEnabled(self):
+        """
+        Checks whether metrics are collected.
+
+        :return: True if metrics are enabled.
+        """
+        return self._metrics is not None
+
+    @property
+    def metrics(self):
+        """
+        The HandlerMetrics of the handler, or None while metrics are disabled.
+        """
+        return self._metrics
+
+    def get_metrics(self):
+        """
+        Gets a snapshot of the metrics.
+
+        :return: The snapshot (see HandlerMetrics.snapshot), or an empty dictionary while metrics are disabled.
+        """
+        return self._metrics.snapshot() if self._metrics is not None else {}
+
+    def timeStage(self, stage):
+        """
+        Times a block of code as a stage of this handler, e.g. the display of a frame in a slot:
+
+            with handler.timeStage('display'):
+                window.dispImage(label, image)
+
+        :param stage: The stage name.
+        :return: A context manager; it does nothing while metrics are disabled.
+        """
+        if self._metrics is None:
+            return nullcontext()
+        return _timed(self._metrics, stage)
+
+    def resetMetrics(self):
+        """
+        Clears the collected metrics.
+        """
+        if self._metrics is not None:
+            self._metrics.reset()
+
+    @staticmethod
+    def _lap(metrics, stage, last):
+        """
+        Records the time since 'last' as the latency of a stage and returns the current time. While metrics are
+        disabled ('metrics' is None) nothing is measured and None is returned.
+        """
+        if metrics is None:
+            return None
+        now = time.perf_counter()
+        metrics.record(stage, (now - last) * 1000)
+        return now
+
+    def _publishMetrics(self, now):
+        """
+        Emits metricsUpdated if the publishing interval has elapsed.
+        """
+        if now - self._metrics_published >= self._metrics_interval:
+            self._metrics_published = now
+            self.metricsUpdated.emit(self._metrics.snapshot())
@@ -0,0 +1,223 @@
+# QtFusion, AGPL-3.0 license
+"""
+Startup timeline for QtFusion applications.
+
+When QF_Config.PROFILE_STARTUP is enabled (or the QTFUSION_PROFILE_STARTUP environment variable is set before QtFusion
+is imported), QtFusion records how long each startup phase takes: package imports, font loading, QSS loading, YAML
+settings, widget construction and the first paint of each window. Applications can add their own phases with
+startupPhase. The timeline can be written as plain JSON or in the Chrome trace event format, which opens in
+chrome://tracing and Perfetto.
+
+This module only depends on QtCore and the configuration package, so it can be imported before the rest of QtFusion.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from PySide6.QtCore import QEvent, QObject
+
+from ..config.QfConfig import QF_Config
+
+_ORIGIN = time.perf_counter()
+
+
+class StartupTimeline:
+    """
+    Records named, timed phases relative to the moment QtFusion was first imported. A phase that started earlier,
+    such as the package imports, moves the origin back to its start, so no phase has a negative start time.
+    """
+
+    def __init__(self, origin=None):
+        """
+        Initializes an empty timeline.
+
+        :param origin: The perf_counter value all timestamps are relative to. Defaults to the import time of this
+                       module.
+        """
+        self.origin = _ORIGIN if origin is None else origin
+        self._events = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def enabled():
+        """
+        Check whether startup profiling is enabled.
+        """
+        return QF_Config.PROFILE_STARTUP
+
+    def record(self, name, start, end=None, category='startup', **args):
+        """
+        Add a finished phase.
+
+        :param name: The phase name.
+        :param start: The perf_counter value at the start of the phase.
+        :param end: The perf_counter value at the end of the phase. Defaults to now.
+        :param category: The category, e.g. 'import', 'style' or 'widget'.
+        :param args: Additional values stored with the phase.
+        """
+        end = time.perf_counter() if end is None else end
+        event = {'name': name, 'cat': category, 'start_ms': 0.0, 'duration_ms': (end - start) * 1000,
+                 'thread': threading.get_ident()}
+        if args:
+            event['args'] = args
+        with self._lock:
+            if start < self.origin:
+                shift = (self.origin - start) * 1000
+                for recorded in self._events:
+                    recorded['start_ms'] += shift
+                self.origin = start
+            event['start_ms'] = (start - self.origin) * 1000
+            self._events.append(event)
+
+    @contextmanager
+    def _phase(self, name, category, args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, category=category, **args)
+
+    def phase(self, name, category='startup', **args):
+        """
+        Time a block of code as a phase. Does nothing when profiling is disabled.
+
+        Usage:
+            with timeline.phase('load model', 'app'):
+                ...
+
+        :param name: The phase name.
+        :param category: The category of the phase.
+        :param args: Additional values stored with the phase.
+        :return: A context manager.
+        """
+        if not QF_Config.PROFILE_STARTUP:
+            return _NULL_PHASE
+        return self._phase(name, category, args)
+
+    def trace(self, name=None, category='startup'):
+        """
+        Decorator that times every call of a function as a phase.
+
+        :param name: The phase name. Defaults to the qualified name of the function.
+        :param category: The category of the phase.
+        """
+        def decorator(func):
+            phase_name = name or func.__qualname__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not QF_Config.PROFILE_STARTUP:
+                    return func(*args, **kwargs)
+                with self._phase(phase_name, category, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def watchFirstPaint(self, widget, name=None):
+        """
+        Record the time from now until the first paint event of a widget. Does nothing when profiling is disabled.
+
+        :param widget: The widget, usually a top-level window.
+        :param name: The phase name. Defaults to 'first paint <class name>'.
+        """
+        if QF_Config.PROFILE_STARTUP:
+            _FirstPaintWatcher(self, widget, name or f"first paint {type(widget).__name__}")
+
+    def events(self):
+        """
+        Get the recorded phases, ordered by start time.
+
+        :return: A list of dictionaries with the name, category, start and duration (in ms) of every phase.
+        """
+        with self._lock:
+            return sorted(self._events, key=lambda event: event['start_ms'])
+
+    def summary(self):
+        """
+        Get the total duration of every phase name.
+
+        :return: A dictionary mapping phase names to total milliseconds, slowest first.
+        """
+        totals = {}
+        for event in self.events():
+            totals[event['name']] = totals.get(event['name'], 0.0) + event['duration_ms']
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def toChromeTrace(self):
+        """
+        Convert the timeline to the Chrome trace event format.
+
+        :return: A dictionary that can be serialized with json.
+        """
+        trace_events = []
+        for event in self.events():
+            trace_event = {'name': event['name'], 'cat': event['cat'], 'ph': 'X', 'pid': 1, 'tid': event['thread'],
+                           'ts': event['start_ms'] * 1000, 'dur': event['duration_ms'] * 1000}
+            if 'args' in event:
+                trace_event['args'] = event['args']
+            trace_events.append(trace_event)
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, file_path, fmt='json'):
+        """
+        Write the timeline to a file.
+
+        :param file_path: The output file.
+        :param fmt: 'json' for a list of phases with a summary, or 'chrome' for the Chrome trace event format.
+        """
+        if fmt == 'chrome':
+            data = self.toChromeTrace()
+        elif fmt == 'json':
+            data = {'phases': self.events(), 'summary': self.summary()}
+        else:
+            raise ValueError(f"Unknown timeline format '{fmt}', expected 'json' or 'chrome'.")
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=1)
+
+    def clear(self):
+        """
+        Remove all recorded phases.
+        """
+        with self._lock:
+            self._events.clear()
+
+
+class _NullPhase:
+    """
+    A reusable context manager that does nothing, returned by phase() when profiling is disabled.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _FirstPaintWatcher(QObject):
+    """
+    Records the first paint event of a widget and then removes itself.
+    """
+
+    def __init__(self, timeline, widget, name):
+        super().__init__(widget)
+        self.timeline, self.name = timeline, name
+        self.start = time.perf_counter()
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            self.timeline.record(self.name, self.start, category='paint')
+            obj.removeEventFilter(self)
+            self.deleteLater()
+        return False
+
+
+timeline = StartupTimeline()
+startupPhase = timeline.phase
+traceStartup = timeline.trace
@@ -0,0 +1,7 @@
+# QtFusion, AGPL-3.0 license
+from .Metrics import LatencyHistogram, HandlerMetrics, MetricsSource
+from .AdaptiveQuality import AdaptiveQualityController
+from .Timeline import StartupTimeline, timeline, startupPhase, traceStartup
+
+__all__ = ("LatencyHistogram", "HandlerMetrics", "MetricsSource", "AdaptiveQualityController", "StartupTimeline",
+           "timeline", "startupPhase", "traceStartup")
@@ -1,14 +1,143 @@
 import logging
 import os
+import threading
 import yaml
-from PySide6.QtGui import QIcon, QPixmap
+from PySide6 import QtWidgets
 from PySide6.QtWidgets import *
 from PySide6.QtWidgets import QMainWindow, QWidget
 from IMcore.IMsets import loadSettings
 
+from ..monitor.Timeline import startupPhase
 from ..path import abs_path, path_exists
+from ..utils.Resources import cachedIcon, preloadIcons
 logger = logging.getLogger(__name__)
 
+# The C implementation of the YAML loader is several times faster; fall back to the pure Python one if unavailable.
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+_yaml_cache = {}  # absolute path -> (mtime, size, parsed data)
+_yaml_lock = threading.Lock()
+_widget_types = {}  # type name used in YAML files -> widget class
+
+
+def registerWidgetType(widget_class, name=None):
+    """
+    Register a widget class so it can be referenced by name in the 'type' key of YAML settings.
+
+    Args:
+        widget_class (type): The widget class.
+        name (str, optional): The name used in YAML files. Defaults to the class name.
+    """
+    if not _widget_types:
+        _registerDefaultWidgetTypes()
+    _widget_types[name or widget_class.__name__] = widget_class
+
+
+def resolveWidgetType(type_name):
+    """
+    Resolve the 'type' key of a YAML setting to a widget class.
+
+    Names are looked up in a registry holding every QWidget subclass of PySide6.QtWidgets, QImageLabel and any class
+    added with registerWidgetType. Unlike eval(), no expression from the settings file is ever executed.
+
+    Args:
+        type_name (str): The name of the widget type.
+
+    Returns:
+        type: The widget class.
+
+    Raises:
+        NameError: If the name is not registered.
+    """
+    if not _widget_types:
+        _registerDefaultWidgetTypes()
+    try:
+        return _widget_types[type_name]
+    except KeyError:
+        raise NameError(f"name '{type_name}' is not a registered widget type")
+
+
+def _registerDefaultWidgetTypes():
+    """
+    Fill the widget type registry with the PySide6 widget classes and QImageLabel.
+    """
+    from ..widgets.Widgets import QImageLabel
+    for name in dir(QtWidgets):
+        obj = getattr(QtWidgets, name)
+        if isinstance(obj, type) and issubclass(obj, QWidget):
+            _widget_types.setdefault(name, obj)
+    _widget_types.setdefault('QImageLabel', QImageLabel)
+
+
+def loadYamlFile(yaml_file):
+    """
+    Parse a YAML settings file, reusing the previous result while the file is unchanged.
+
+    The parsed data is cached by absolute path and reparsed when the modification time or size of the file changes.
+    The returned object is shared between callers and must not be modified.
+
+    Args:
+        yaml_file (str): The file path of the YAML file.
+
+    Returns:
+        dict: The parsed settings.
+    """
+    path = os.path.abspath(yaml_file)
+    stat = os.stat(path)
+    with _yaml_lock:
+        entry = _yaml_cache.get(path)
+        if entry is not None and entry[0] == stat.st_mtime and entry[1] == stat.st_size:
+            return entry[2]
+    with open(path, 'r', encoding='utf-8') as file:
+        data = yaml.load(file, Loader=YamlLoader) or {}
+    with _yaml_lock:
+        _yaml_cache[path] = (stat.st_mtime, stat.st_size, data)
+    return data
+
+
+def clearYamlCache():
+    """
+    Drop every cached YAML settings file.
+    """
+    with _yaml_lock:
+        _yaml_cache.clear()
+
+
+def buildWidgetIndex(window):
+    """
+    Map the object names of all descendants of a window to the widgets, in a single traversal.
+
+    Args:
+        window (QWidget): The window to index.
+
+    Returns:
+        dict: A mapping of object names to lists of widgets, in the order returned by findChildren.
+    """
+    index = {}
+    for widget in window.findChildren(QWidget):
+        name = widget.objectName()
+        if name:
+            index.setdefault(name, []).append(widget)
+    return index
+
+
+def findIndexedChild(index, widget_type, widget_name):
+    """
+    Look up a widget in an index built by buildWidgetIndex.
+
+    Args:
+        index (dict): The widget index.
+        widget_type (type): The required widget class.
+        widget_name (str): The object name of the widget.
+
+    Returns:
+        QWidget: The first widget with the given name that is an instance of the given type, or None.
+    """
+    for widget in index.get(widget_name, ()):
+        if isinstance(widget, widget_type):
+            return widget
+    return None
+
 
 def applyText(widget, text):
     """
@@ -29,9 +158,7 @@ def applyIcon(widget, icon_path):
         widget (QWidget or ): Widget to apply the icon to.
         icon_path (str): Path to the icon file.
     """
-    icon = QIcon()
-    icon.addPixmap(QPixmap(icon_path), QIcon.Mode.Normal, QIcon.State.Off)
-    widget.setIcon(icon)
+    widget.setIcon(cachedIcon(icon_path))
 
 
 def applyBackground(widget, background_path):
@@ -57,27 +184,53 @@ def loadYamlSettings(window, yaml_file, base_path="./"):
     The function iterates over each setting in the YAML file, finds the corresponding widget in the window,
     and applies the settings like text, icon, background, and window icon. It uses the 'abs_path' function
     to resolve the absolute path of the resources and 'path_exists' to check the existence of these paths.
-    """
-    from ..widgets.Widgets import QImageLabel
-    try:
-        with open(yaml_file, 'r', encoding='utf-8') as file:
-            yaml_data = yaml.safe_load(file)
-    except Exception as e:
-        raise RuntimeError(f"Error loading YAML file '{yaml_file}': {e}")
 
-    for widget_name, settings in yaml_data.items():
+    Parsed files are cached until they change on disk (see loadYamlFile), widget types are resolved through
+    resolveWidgetType instead of eval(), and widgets are looked up in an index built with one traversal of the window.
+    """
+    with startupPhase('yaml parse', 'yaml', file=os.path.basename(yaml_file)):
         try:
-            widget_type = eval(settings['type'])
-            widget = window.findChild(widget_type, widget_name)
-            loadSettings(window, widget, widget_name, settings, base_path)
-        except KeyError as e:
-            print(f"Key error in yaml data '{yaml_file}': {widget_name} has no key {e}")
-        except NameError as e:
-            print(f"Name error in '{yaml_file}': {e}")
-        except AttributeError as e:
-            print(f"Attribute error in finding widget for '{yaml_file}': {e}")
+            yaml_data = loadYamlFile(yaml_file)
         except Exception as e:
-            print(f"Unexpected error in '{yaml_file}': {e}")
+            raise RuntimeError(f"Error loading YAML file '{yaml_file}': {e}")
+
+    with startupPhase('yaml apply', 'yaml', file=os.path.basename(yaml_file), widgets=len(yaml_data)):
+        index = buildWidgetIndex(window)
+        for widget_name, settings in yaml_data.items():
+            try:
+                widget_type = resolveWidgetType(settings['type'])
+                widget = findIndexedChild(index, widget_type, widget_name)
+                loadSettings(window, widget, widget_name, dict(settings), base_path)
+            except KeyError as e:
+                print(f"Key error in yaml data '{yaml_file}': {widget_name} has no key {e}")
+            except NameError as e:
+                print(f"Name error in '{yaml_file}': {e}")
+            except AttributeError as e:
+                print(f"Attribute error in finding widget for '{yaml_file}': {e}")
+            except Exception as e:
+                print(f"Unexpected error in '{yaml_file}': {e}")
+
+
+def preloadYamlIcons(yaml_file, base_path="./", finished=None):
+    """
+    Decode the icons referenced by a YAML settings file in the background, before the window is first shown.
+
+    Args:
+        yaml_file (str): The file path of the YAML file containing the settings.
+        base_path (str, optional): The base path used for resolving relative paths. Default is "./".
+        finished (callable, optional): Called on the GUI thread once every icon has been loaded.
+
+    Returns:
+        int: The number of icons scheduled for loading.
+    """
+    paths = []
+    for settings in loadYamlFile(yaml_file).values():
+        for key in ('icon', 'windowIcon'):
+            if isinstance(settings, dict) and key in settings:
+                icon_path = abs_path(base_path=base_path, relative_path=settings[key])
+                if path_exists(icon_path):
+                    paths.append(icon_path)
+    return preloadIcons(paths, finished=finished)
 
 
 def apply_WindowIcon(window, settings, base_path):
@@ -91,9 +244,7 @@ def apply_WindowIcon(window, settings, base_path):
     """
     window_icon_path = abs_path(base_path=base_path, relative_path=settings['windowIcon'])
     if path_exists(window_icon_path):
-        icon = QIcon()
-        icon.addPixmap(QPixmap(window_icon_path), QIcon.Mode.Normal, QIcon.State.Off)
-        window.setWindowIcon(icon)
+        window.setWindowIcon(cachedIcon(window_icon_path))
     else:
         logging.warning(f"Window icon file not found at '{window_icon_path}'")
 
@@ -106,9 +257,7 @@ def applyWindowIcon(window, icon_path):
         window (QMainWindow or QWidget): Window to apply the icon to.
         icon_path (str): Path to the window icon file.
     """
-    icon = QIcon()
-    icon.addPixmap(QPixmap(icon_path), QIcon.Mode.Normal, QIcon.State.Off)
-    window.setWindowIcon(icon)
+    window.setWindowIcon(cachedIcon(icon_path))
 
 
 def applyQssStyles(window, qss_data):
@@ -0,0 +1,366 @@
+# QtFusion, AGPL-3.0 license
+"""
+QSS minification and precompiled theme bundles.
+
+The functions in this module shrink Qt style sheets before they reach Qt's parser, and pack the bundled themes into a
+single compressed file. Themes that differ only in their colours (such as DarkGreen, DarkOrange and DarkPink) are
+stored once as a template plus one small palette per theme.
+
+Bundle layout:
+- 4 bytes magic (b'QSSB') followed by a 4 byte big-endian length of the index.
+- The index, a UTF-8 JSON document mapping theme names to their blob and palette and to the size, modification time
+  and CRC-32 of their source file, which is looked up in the source directory stored relative to the bundle.
+- A sequence of zlib-compressed blobs (templates or plain style sheets) addressed by offset and length.
+
+The bundle is rebuilt from the qss/ directory with:
+    python -m QtFusion.styles.QssBundle [qss_dir] [output_file]
+"""
+import json
+import os
+import re
+import struct
+import sys
+import threading
+import zlib
+
+BUNDLE_MAGIC = b'QSSB'
+BUNDLE_VERSION = 2
+BUNDLE_NAME = "themes.qssb"
+
+# Placeholders in templates look like @3@; '@' never occurs in the bundled style sheets.
+_SLOT_PATTERN = re.compile(r"@(\d+)@")
+_COLOR_PATTERN = re.compile(r"#[0-9A-Fa-f]{3,8}\b|rgba?\([^)]*\)")
+_TOKEN_PATTERN = re.compile(r"""/\*.*?\*/|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[{};]|[^{};"'/]+|/""", re.S)
+
+
+def _tokens(qss_text):
+    """
+    Split a style sheet into comments, strings, structural characters and plain text.
+    """
+    return _TOKEN_PATTERN.findall(qss_text)
+
+
+def _squeeze(text, separators=''):
+    """
+    Collapse whitespace to single spaces and remove it around the given separators and inside parentheses.
+    """
+    text = re.sub(r"\s+", " ", text).strip()
+    if separators:
+        text = re.sub(r"\s*([" + re.escape(separators) + r"])\s*", r"\1", text)
+    return text.replace('( ', '(').replace(' )', ')')
+
+
+def parseQssRules(qss_text):
+    """
+    Parse a style sheet into a list of rules.
+
+    Args:
+        qss_text (str): The style sheet text.
+
+    Returns:
+        list: A list of (selector, declarations) tuples, where declarations is a list of (property, value) tuples.
+    """
+    rules = []
+    selector, declaration, declarations = [], [], None
+    for token in _tokens(qss_text):
+        if token.startswith('/*'):
+            continue
+        if declarations is None:
+            if token == '{':
+                declarations = []
+            elif token not in ';}':
+                selector.append(token)
+            continue
+        if token in ';}':
+            text = ''.join(declaration).strip()
+            if ':' in text:
+                name, value = text.split(':', 1)
+                declarations.append((_squeeze(name), _squeeze(value, ',')))
+            declaration = []
+            if token == '}':
+                rules.append((_squeeze(''.join(selector), ',>'), declarations))
+                selector, declarations = [], None
+        else:
+            declaration.append(token)
+    return rules
+
+
+def minifyQss(qss_text):
+    """
+    Minify a style sheet.
+
+    Comments and redundant whitespace are removed, repeated identical declarations inside a rule are collapsed, empty
+    rules are dropped, and of several identical rules only the last one is kept (which leaves the cascade unchanged).
+
+    Args:
+        qss_text (str): The style sheet text.
+
+    Returns:
+        str: The minified style sheet.
+    """
+    blocks = []
+    for selector, declarations in parseQssRules(qss_text):
+        unique = []
+        for declaration in declarations:
+            if declaration in unique:
+                unique.remove(declaration)
+            unique.append(declaration)
+        if selector and unique:
+            blocks.append(selector + '{' + ';'.join(f"{name}:{value}" for name, value in unique) + '}')
+
+    seen, kept = set(), []
+    for block in reversed(blocks):
+        if block not in seen:
+            seen.add(block)
+            kept.append(block)
+    return ''.join(reversed(kept))
+
+
+def extractTemplates(themes):
+    """
+    Group themes that differ only in colour values and express each group as one template plus palettes.
+
+    Args:
+        themes (dict): A mapping of theme names to minified style sheets.
+
+    Returns:
+        tuple: (templates, entries), where templates is a list of template strings and entries maps each theme name
+        to either {'template': index, 'palette': [...]} or {'text': minified style sheet}.
+    """
+    groups = {}
+    for name, text in themes.items():
+        skeleton = _COLOR_PATTERN.sub('\x00', text)
+        groups.setdefault(skeleton, []).append(name)
+
+    templates, entries = [], {}
+    for skeleton, names in groups.items():
+        if len(names) < 2 or '@' in skeleton:
+            for name in names:
+                entries[name] = {'text': themes[name]}
+            continue
+
+        # One column per colour occurrence; occurrences with identical values in every theme share a slot, and
+        # occurrences that never vary stay literal in the template.
+        columns = list(zip(*(_COLOR_PATTERN.findall(themes[name]) for name in names)))
+        slots, slot_of_column = [], []
+        for column in columns:
+            if len(set(column)) == 1:
+                slot_of_column.append(None)
+                continue
+            if column not in slots:
+                slots.append(column)
+            slot_of_column.append(slots.index(column))
+
+        pieces = skeleton.split('\x00')
+        template = [pieces[0]]
+        for column, slot, piece in zip(columns, slot_of_column, pieces[1:]):
+            template.append(column[0] if slot is None else f"@{slot}@")
+            template.append(piece)
+        templates.append(''.join(template))
+        for i, name in enumerate(names):
+            entries[name] = {'template': len(templates) - 1, 'palette': [slot[i] for slot in slots]}
+    return templates, entries
+
+
+def renderTemplate(template, palette):
+    """
+    Fill the colour slots of a template.
+
+    Args:
+        template (str): The template text.
+        palette (list): The colour values, indexed by slot number.
+
+    Returns:
+        str: The style sheet text.
+    """
+    return _SLOT_PATTERN.sub(lambda match: palette[int(match.group(1))], template)
+
+
+def buildQssBundle(qss_dir, output_file=None, encoding='utf-8'):
+    """
+    Minify every QSS file in a directory and write them into a single compressed bundle.
+
+    Args:
+        qss_dir (str): The directory containing the QSS files.
+        output_file (str, optional): The bundle file to write. Defaults to 'themes.qssb' inside qss_dir.
+        encoding (str): The encoding of the QSS files. Defaults to 'utf-8'.
+
+    Returns:
+        dict: A summary with the number of themes and templates and the source and bundle sizes in bytes.
+    """
+    output_file = output_file or os.path.join(qss_dir, BUNDLE_NAME)
+    themes, sources = {}, {}
+    for file_name in sorted(os.listdir(qss_dir)):
+        if file_name.endswith('.qss'):
+            source_file = os.path.join(qss_dir, file_name)
+            with open(source_file, 'rb') as file:
+                data = file.read()
+            themes[file_name] = minifyQss(data.decode(encoding))
+            stat = os.stat(source_file)
+            sources[file_name] = {'source_size': stat.st_size, 'source_mtime_ns': stat.st_mtime_ns,
+                                  'source_crc': zlib.crc32(data)}
+    try:
+        source_dir = os.path.relpath(os.path.abspath(qss_dir), os.path.dirname(os.path.abspath(output_file)))
+    except ValueError:  # On another drive than the bundle
+        source_dir = os.path.abspath(qss_dir)
+
+    templates, entries = extractTemplates(themes)
+
+    blobs, offset = [], 0
+    index = {'version': BUNDLE_VERSION, 'source_dir': source_dir.replace(os.sep, '/'), 'templates': [], 'themes': {}}
+    for template in templates:
+        blob = zlib.compress(template.encode('utf-8'), 9)
+        index['templates'].append([offset, len(blob)])
+        blobs.append(blob)
+        offset += len(blob)
+    for name, entry in entries.items():
+        if 'text' in entry:
+            blob = zlib.compress(entry['text'].encode('utf-8'), 9)
+            index['themes'][name] = {'blob': [offset, len(blob)]}
+            blobs.append(blob)
+            offset += len(blob)
+        else:
+            index['themes'][name] = {'template': entry['template'], 'palette': entry['palette']}
+        index['themes'][name].update(sources[name])
+
+    header = json.dumps(index, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    with open(output_file, 'wb') as file:
+        file.write(BUNDLE_MAGIC + struct.pack('>I', len(header)) + header)
+        for blob in blobs:
+            file.write(blob)
+
+    return {'themes': len(themes), 'templates': len(templates),
+            'source_bytes': sum(source['source_size'] for source in sources.values()),
+            'minified_bytes': sum(len(text.encode('utf-8')) for text in themes.values()),
+            'bundle_bytes': os.path.getsize(output_file)}
+
+
+class QssBundle:
+    """
+    Read access to a theme bundle written by buildQssBundle.
+
+    Only the index is read when the bundle is opened. Blobs are decompressed on first use and rendered themes are
+    cached for the lifetime of the object.
+    """
+
+    def __init__(self, bundle_file):
+        """
+        Open a bundle and read its index.
+
+        Args:
+            bundle_file (str): The path of the bundle file.
+
+        Raises:
+            ValueError: If the file is not a theme bundle or was written by an unsupported version.
+        """
+        self.bundle_file = bundle_file
+        self.mtime = os.path.getmtime(bundle_file)
+        with open(bundle_file, 'rb') as file:
+            magic, length = file.read(4), file.read(4)
+            if magic != BUNDLE_MAGIC or len(length) != 4:
+                raise ValueError(f"Not a QSS bundle: {bundle_file}")
+            self._index = json.loads(file.read(struct.unpack('>I', length)[0]).decode('utf-8'))
+            self._data_offset = file.tell()
+        if self._index.get('version') != BUNDLE_VERSION:
+            raise ValueError(f"Unsupported QSS bundle version {self._index.get('version')} in {bundle_file}")
+        self.source_dir = os.path.normcase(os.path.normpath(os.path.join(
+            os.path.dirname(os.path.abspath(bundle_file)), self._index.get('source_dir', '.'))))
+        self._templates = {}
+        self._texts = {}
+        self._checked = {}  # theme name -> ((mtime_ns, size) of the checked source file, result)
+        self._lock = threading.Lock()
+
+    def names(self):
+        """
+        Get the names of all themes in the bundle (the file names of the source style sheets).
+
+        Returns:
+            list: The theme names.
+        """
+        return list(self._index['themes'])
+
+    def __contains__(self, name):
+        return name in self._index['themes']
+
+    def is_current(self, source_file):
+        """
+        Check whether the bundled copy of a source style sheet is still up to date.
+
+        Only files in the directory the bundle was built from are matched. When the modification time and size on
+        disk equal the ones recorded at build time the check costs a single stat call; otherwise (e.g. after a fresh
+        checkout, which resets modification times) the file content is compared with the recorded CRC-32 once per
+        modification time. A source file that no longer exists is served from the bundle.
+
+        Args:
+            source_file (str): The path of the source QSS file.
+
+        Returns:
+            bool: True if the bundle holds the theme and it matches the source file.
+        """
+        source_file = os.path.abspath(source_file)
+        name = os.path.basename(source_file)
+        entry = self._index['themes'].get(name)
+        if entry is None or os.path.normcase(os.path.dirname(source_file)) != self.source_dir:
+            return False
+        try:
+            stat = os.stat(source_file)
+        except OSError:
+            return True
+        if stat.st_size != entry['source_size']:
+            return False
+        if stat.st_mtime_ns == entry['source_mtime_ns']:
+            return True
+        signature = (stat.st_mtime_ns, stat.st_size)
+        checked = self._checked.get(name)
+        if checked is None or checked[0] != signature:
+            try:
+                with open(source_file, 'rb') as file:
+                    current = zlib.crc32(file.read()) == entry['source_crc']
+            except OSError:
+                return True
+            checked = self._checked[name] = (signature, current)
+        return checked[1]
+
+    def _read_blob(self, offset, length):
+        with open(self.bundle_file, 'rb') as file:
+            file.seek(self._data_offset + offset)
+            return zlib.decompress(file.read(length)).decode('utf-8')
+
+    def get_text(self, name):
+        """
+        Get the minified style sheet of a theme.
+
+        Args:
+            name (str): The theme name, e.g. 'DarkGreen.qss'.
+
+        Returns:
+            str: The minified style sheet.
+
+        Raises:
+            KeyError: If the theme is not in the bundle.
+        """
+        with self._lock:
+            text = self._texts.get(name)
+            if text is not None:
+                return text
+            entry = self._index['themes'][name]
+            if 'blob' in entry:
+                text = self._read_blob(*entry['blob'])
+            else:
+                template_id = entry['template']
+                template = self._templates.get(template_id)
+                if template is None:
+                    template = self._read_blob(*self._index['templates'][template_id])
+                    self._templates[template_id] = template
+                text = renderTemplate(template, entry['palette'])
+            self._texts[name] = text
+            return text
+
+
+if __name__ == '__main__':
+    source_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))), 'qss')
+    summary = buildQssBundle(source_dir, sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Bundled {summary['themes']} themes ({summary['templates']} templates): "
+          f"{summary['source_bytes']} -> {summary['minified_bytes']} bytes minified, "
+          f"{summary['bundle_bytes']} bytes compressed")
@@ -0,0 +1,226 @@
+# QtFusion, AGPL-3.0 license
+"""
+Style registry for QtFusion.
+
+The StyleRegistry maps style names to QSS files and keeps the processed text of every style sheet it has loaded.
+Files are read lazily on first use, relative url() references are rewritten once at load time, and the cached text
+is reused until the file's modification time changes. When a theme bundle (see QssBundle) is attached, bundled themes
+are served from it in minified form without opening their source files. Styles can be applied to a single widget or,
+with a single QApplication.setStyleSheet call, to the whole application.
+"""
+import logging
+import os
+import re
+import threading
+
+from PySide6.QtWidgets import QApplication
+
+from .QssBundle import QssBundle, minifyQss
+from ..monitor.Timeline import startupPhase
+from ..utils.FileUtils import readQssFile
+
+logger = logging.getLogger(__name__)
+
+# Matches url(...) references, with or without quotes around the target
+_URL_PATTERN = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def rewriteQssUrls(qss_text, base_path):
+    """
+    Rewrite the relative url() references of a style sheet to absolute paths.
+
+    Qt resource paths (':/...'), absolute paths and URLs with a scheme are left unchanged.
+
+    Args:
+        qss_text (str): The style sheet text.
+        base_path (str): The directory relative references are resolved against.
+
+    Returns:
+        str: The style sheet text with rewritten references.
+    """
+
+    def _rewrite(match):
+        quote, target = match.group(1), match.group(2).strip()
+        if target.startswith(':') or os.path.isabs(target) or re.match(r'^[A-Za-z][A-Za-z0-9+.-]+:', target):
+            return match.group(0)
+        resolved = os.path.normpath(os.path.join(base_path, target)).replace('\\', '/')
+        return f"url({quote}{resolved}{quote})"
+
+    return _URL_PATTERN.sub(_rewrite, qss_text)
+
+
+class StyleRegistry:
+    """
+    A registry of named QSS styles with a lazily filled text cache.
+
+    Each cache entry is keyed by the absolute file path and remembers the modification time of the file, so edited
+    style sheets are picked up automatically while unchanged ones are never read twice.
+    """
+
+    def __init__(self, styles=None, encoding='utf-8', bundle=None, minify=False):
+        """
+        Initialize the registry.
+
+        Args:
+            styles (dict, optional): A mapping of style names to QSS file paths. Defaults to None.
+            encoding (str): The encoding of the QSS files. Defaults to 'utf-8'.
+            bundle (str, optional): The path of a theme bundle to serve bundled themes from. Defaults to None.
+            minify (bool): Whether style sheets read from disk are minified before being cached. Defaults to False.
+        """
+        self._styles = dict(styles or {})
+        self.encoding = encoding
+        self.minify = minify
+        self._bundle = None
+        if bundle and os.path.isfile(bundle):
+            try:
+                self._bundle = QssBundle(bundle)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring theme bundle '{bundle}': {e}")
+        self._cache = {}  # (abs path, base path, encoding) -> (mtime, processed text)
+        self._lock = threading.Lock()
+        self._loads = 0
+        self._hits = 0
+
+    def register(self, style_name, qss_file):
+        """
+        Register a QSS file under a style name, replacing any previous registration.
+
+        Args:
+            style_name (str): The name of the style.
+            qss_file (str): The path of the QSS file.
+        """
+        self._styles[style_name] = qss_file
+
+    def names(self):
+        """
+        Get the names of all registered styles.
+
+        Returns:
+            list: The registered style names.
+        """
+        return list(self._styles)
+
+    def resolve(self, style_name):
+        """
+        Resolve a style name or QSS file path to an existing file path.
+
+        Args:
+            style_name (str): A registered style name or the path of a QSS file.
+
+        Returns:
+            str: The absolute path of the QSS file.
+
+        Raises:
+            TypeError: If the style name is not a string.
+            ValueError: If the style name is not registered and is not a valid file path.
+        """
+        if not isinstance(style_name, str):
+            raise TypeError(f"Style name must be a string, not {type(style_name).__name__}")
+
+        file_name = self._styles.get(style_name)
+        if not file_name and os.path.isfile(style_name):
+            file_name = style_name
+
+        bundled = self._bundle is not None and self._bundle.is_current(file_name) if file_name else False
+        if file_name and (os.path.isfile(file_name) or bundled):
+            return os.path.abspath(file_name)
+        raise ValueError(f"Style '{style_name}' not found in predefined styles, and is not a valid file path.")
+
+    def get_text(self, style_name, base_path=None, encoding=None):
+        """
+        Get the processed text of a style, reading the file only if it is not cached or has changed on disk.
+
+        Args:
+            style_name (str): A registered style name or the path of a QSS file.
+            base_path (str, optional): The directory relative url() references are resolved against. Defaults to
+                the directory of the QSS file.
+            encoding (str, optional): The encoding of the QSS file. Defaults to the registry encoding.
+
+        Returns:
+            str: The style sheet text.
+        """
+        file_name = self.resolve(style_name)
+        base_path = os.path.abspath(base_path) if base_path else os.path.dirname(file_name)
+        encoding = encoding or self.encoding
+        key = (file_name, base_path, encoding)
+        bundled = self._bundle is not None and self._bundle.is_current(file_name)
+        mtime = self._bundle.mtime if bundled else os.path.getmtime(file_name)
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == mtime:
+                self._hits += 1
+                return entry[1]
+
+        with startupPhase('qss load', 'style', style=os.path.basename(file_name), bundled=bundled):
+            if bundled:
+                text = self._bundle.get_text(os.path.basename(file_name))
+            else:
+                text = readQssFile(file_name, encoding=encoding)
+                if self.minify:
+                    text = minifyQss(text)
+            text = rewriteQssUrls(text, base_path)
+        with self._lock:
+            self._cache[key] = (mtime, text)
+            self._loads += 1
+        logger.debug(f"Loaded style sheet '{file_name}' ({len(text)} characters)")
+        return text
+
+    def apply(self, widget, style_name, base_path=None, encoding=None):
+        """
+        Apply a style to a widget.
+
+        Args:
+            widget: The widget to apply the style to. Must have a 'setStyleSheet' method.
+            style_name (str): A registered style name or the path of a QSS file.
+            base_path (str, optional): The directory relative url() references are resolved against.
+            encoding (str, optional): The encoding of the QSS file.
+        """
+        if not hasattr(widget, 'setStyleSheet'):
+            raise TypeError("The provided object does not support the setStyleSheet method.")
+        widget.setStyleSheet(self.get_text(style_name, base_path, encoding))
+
+    def apply_app(self, style_name, base_path=None, encoding=None):
+        """
+        Apply a style to the whole application with a single QApplication.setStyleSheet call.
+
+        Args:
+            style_name (str): A registered style name or the path of a QSS file.
+            base_path (str, optional): The directory relative url() references are resolved against.
+            encoding (str, optional): The encoding of the QSS file.
+
+        Returns:
+            bool: True if the style was applied, False if no QApplication instance exists yet.
+        """
+        app = QApplication.instance()
+        if app is None:
+            return False
+        app.setStyleSheet(self.get_text(style_name, base_path, encoding))
+        return True
+
+    def preload(self, style_names=None):
+        """
+        Load styles into the cache ahead of time.
+
+        Args:
+            style_names (list, optional): The styles to load. Defaults to all registered styles.
+        """
+        for style_name in style_names or self.names():
+            self.get_text(style_name)
+
+    def clear(self):
+        """
+        Drop every cached style sheet.
+        """
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        """
+        Get the cache statistics.
+
+        Returns:
+            dict: The number of cached entries, file loads and cache hits.
+        """
+        with self._lock:
+            return {'entries': len(self._cache), 'loads': self._loads, 'hits': self._hits}
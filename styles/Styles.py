@@ -3,8 +3,10 @@ import logging
 import os
 from IMcore.IMsets import loadStyles
 
+from ..monitor.Timeline import startupPhase
 from ..path import get_script_dir, abs_path
-from ..utils.FileUtils import readQssFile
+from .Registry import StyleRegistry
+from .Themes import ThemeApplier
 
 logger = logging.getLogger(__name__)
 
@@ -17,32 +19,36 @@ class BaseStyle:
     # Define a dictionary that maps style names to their style constants.
     _script_parent_dir = os.path.dirname(get_script_dir())
     _styles = {
-        'STYLE_TRANS': abs_path("/qss/style_trans_black.qss", _script_parent_dir),
-        'STYLE_LOGIN': abs_path("/qss/style_login_white.qss", _script_parent_dir),
-        'STYLE_NORM': abs_path("/qss/style_norm_black.qss", _script_parent_dir),
-        'NORM_WHITE': abs_path("/qss/style_norm_white.qss", _script_parent_dir),
-        "NORM_GREEN": abs_path("/qss/style_main_green.qss", _script_parent_dir),
-        "NormDark": abs_path("/qss/NormDark.qss", _script_parent_dir),
-        "MacOS": abs_path("/qss/MacOS.qss", _script_parent_dir),
-        "Ubuntu": abs_path("/qss/Ubuntu.qss", _script_parent_dir),
-        "ElegantDark": abs_path("/qss/ElegantDark.qss", _script_parent_dir),
-        "Aqua": abs_path("/qss/Aqua.qss", _script_parent_dir),
-        "NeonButtons": abs_path("/qss/NeonButtons.qss", _script_parent_dir),
-        "NeonBlack": abs_path("/qss/NeonBlack.qss", _script_parent_dir),
-        "BlueGlass": abs_path("/qss/BlueGlass.qss", _script_parent_dir),
-        "Dracula": abs_path("/qss/DarkDracula.qss", _script_parent_dir),
-        "NightEyes": abs_path("/qss/NightEyes.qss", _script_parent_dir),
-        "Parchment": abs_path("/qss/Parchment.qss", _script_parent_dir),
-        "DarkVs15": abs_path("/qss/DarkVs15.qss", _script_parent_dir),
-        "DarkGreen": abs_path("/qss/DarkGreen.qss", _script_parent_dir),
-        "DarkOrange": abs_path("/qss/DarkOrange.qss", _script_parent_dir),
-        "DarkPink": abs_path("/qss/DarkPink.qss", _script_parent_dir),
-        "DarkPurple": abs_path("/qss/DarkPurple.qss", _script_parent_dir),
-        "DarkRed": abs_path("/qss/DarkRed.qss", _script_parent_dir),
-        "DarkYellow": abs_path("/qss/DarkYellow.qss", _script_parent_dir),
-        "Skyrim": abs_path("/qss/Skyrim.qss", _script_parent_dir),
-        "LightStyle": abs_path("/qss/LightStyle.qss", _script_parent_dir),
+        'STYLE_TRANS': abs_path("qss/style_trans_black.qss", _script_parent_dir),
+        'STYLE_LOGIN': abs_path("qss/style_login_white.qss", _script_parent_dir),
+        'STYLE_NORM': abs_path("qss/style_norm_black.qss", _script_parent_dir),
+        'NORM_WHITE': abs_path("qss/style_norm_white.qss", _script_parent_dir),
+        "NORM_GREEN": abs_path("qss/style_main_green.qss", _script_parent_dir),
+        "NormDark": abs_path("qss/NormDark.qss", _script_parent_dir),
+        "MacOS": abs_path("qss/MacOS.qss", _script_parent_dir),
+        "Ubuntu": abs_path("qss/Ubuntu.qss", _script_parent_dir),
+        "ElegantDark": abs_path("qss/ElegantDark.qss", _script_parent_dir),
+        "Aqua": abs_path("qss/Aqua.qss", _script_parent_dir),
+        "NeonButtons": abs_path("qss/NeonButtons.qss", _script_parent_dir),
+        "NeonBlack": abs_path("qss/NeonBlack.qss", _script_parent_dir),
+        "BlueGlass": abs_path("qss/BlueGlass.qss", _script_parent_dir),
+        "Dracula": abs_path("qss/DarkDracula.qss", _script_parent_dir),
+        "NightEyes": abs_path("qss/NightEyes.qss", _script_parent_dir),
+        "Parchment": abs_path("qss/Parchment.qss", _script_parent_dir),
+        "DarkVs15": abs_path("qss/DarkVs15.qss", _script_parent_dir),
+        "DarkGreen": abs_path("qss/DarkGreen.qss", _script_parent_dir),
+        "DarkOrange": abs_path("qss/DarkOrange.qss", _script_parent_dir),
+        "DarkPink": abs_path("qss/DarkPink.qss", _script_parent_dir),
+        "DarkPurple": abs_path("qss/DarkPurple.qss", _script_parent_dir),
+        "DarkRed": abs_path("qss/DarkRed.qss", _script_parent_dir),
+        "DarkYellow": abs_path("qss/DarkYellow.qss", _script_parent_dir),
+        "Skyrim": abs_path("qss/Skyrim.qss", _script_parent_dir),
+        "LightStyle": abs_path("qss/LightStyle.qss", _script_parent_dir),
     }
+    # Shared registry caching the text of every style sheet loaded through BaseStyle.
+    # Bundled themes are served minified from qss/themes.qssb; edited source files take precedence over the bundle.
+    _registry = StyleRegistry(_styles, bundle=abs_path("qss/themes.qssb", _script_parent_dir))
+    _applier = None
 
     def __init__(self, style_name_or_const='STYLE_TRANS'):
         """
@@ -121,7 +127,7 @@ class BaseStyle:
             # If the style is a predefined style name, apply the corresponding style.
             if isinstance(self.style_name_or_const, str):
                 if self.style_name_or_const in self._styles:
-                    widget.setStyleSheet(self._styles[self.style_name_or_const])
+                    self._registry.apply(widget, self.style_name_or_const)
                 # If the style is a QSS file, load and apply the QSS file.
                 elif os.path.isfile(self.style_name_or_const):
                     loadQssStyles(widget, self.style_name_or_const)
@@ -175,18 +181,66 @@ class BaseStyle:
             ValueError: If the style name is not found in predefined styles and is not a valid file path.
         """
 
-        if not isinstance(style_name, str):
-            raise TypeError(f"Style name must be a string, not {type(style_name).__name__}")
+        widget.setStyleSheet(self._registry.get_text(style_name, encoding=encoding))
 
-        file_name = self._styles.get(style_name)
+    def set_app_style(self, style_name, encoding="utf-8"):
+        """
+        Apply a predefined style to the whole application with a single QApplication.setStyleSheet call.
 
-        if not file_name and os.path.isfile(style_name):
-            file_name = style_name
+        This is cheaper than styling every top-level window separately, since Qt parses the style sheet once.
 
-        if file_name and os.path.isfile(file_name):
-            widget.setStyleSheet(readQssFile(file_name, encoding=encoding))
-        else:
-            raise ValueError(f"Style '{style_name}' not found in predefined styles, and is not a valid file path.")
+        Args:
+            style_name (str): The name of the predefined style to apply, or the path of a QSS file.
+            encoding (str): The encoding format of the QSS file. Defaults to 'utf-8'.
+
+        Returns:
+            bool: True if the style was applied, False if no QApplication instance exists yet.
+
+        Raises:
+            TypeError: If the style name is not a string.
+            ValueError: If the style name is not found in predefined styles and is not a valid file path.
+        """
+        return self._registry.apply_app(style_name, encoding=encoding)
+
+    def apply_theme(self, widget, style_name, detach_hidden=False):
+        """
+        Apply a predefined style to a widget sub-tree.
+
+        The style is set on 'widget' inside a single setUpdatesEnabled(False) batch, and the elapsed time of every
+        application is logged (see ThemeApplier). With detach_hidden, hidden QStackedWidget and QTabWidget pages are
+        first taken out of the widget tree and put back, and restyled, when they are first shown.
+
+        Args:
+            widget: The root of the sub-tree to style.
+            style_name (str): The name of the predefined style to apply, or the path of a QSS file.
+            detach_hidden (bool): Whether hidden pages are detached and restyled on first show. Defaults to False.
+
+        Returns:
+            dict: The style name, scope, number of styled widgets and deferred pages, and elapsed milliseconds.
+        """
+        return self.theme_applier().apply(widget, style_name, detach_hidden)
+
+    @classmethod
+    def theme_applier(cls):
+        """
+        Get the ThemeApplier shared by all BaseStyle instances, creating it on first use.
+
+        Returns:
+            ThemeApplier: The shared applier.
+        """
+        if cls._applier is None:
+            cls._applier = ThemeApplier(cls._registry)
+        return cls._applier
+
+    @classmethod
+    def registry(cls):
+        """
+        Get the shared style registry used by all BaseStyle instances.
+
+        Returns:
+            StyleRegistry: The shared registry.
+        """
+        return cls._registry
 
     def set_style_text(self, widget, style_text):
         """
@@ -220,4 +274,5 @@ def loadQssStyles(window, qss_file, base_path="./"):
     # Ensure the widget has a setStyleSheet method.
     if not hasattr(window, 'setStyleSheet'):
         raise TypeError("The provided object does not support the setStyleSheet method.")
-    loadStyles(window, qss_file, base_path)
+    with startupPhase('qss apply', 'style', file=os.path.basename(qss_file)):
+        loadStyles(window, qss_file, base_path)
@@ -0,0 +1,220 @@
+# QtFusion, AGPL-3.0 license
+"""
+Scoped, deferred theme application for QtFusion.
+
+The ThemeApplier sets a style sheet on the target widget in a single batch between setUpdatesEnabled(False) and
+setUpdatesEnabled(True) on the top-level window, and logs the time spent and emits it through the themeApplied signal.
+By default the widget tree is left untouched, so Qt restyles every descendant, including pages of QStackedWidget and
+QTabWidget that are not visible.
+
+With detach_hidden=True the hidden pages are taken out of the widget tree first: each one is swapped for an empty
+placeholder at the same index (tab titles and icons are kept), so the restyle only walks the visible part of the tree.
+When a placeholder is shown or becomes the current page, its page is put back in its place and inherits the current
+style from its new ancestors, so the polish work is done on first show. This changes what the application sees while
+a page is detached: its stacked or tab widget returns the placeholder from widget(), the page has no parent and is
+not found by findChild() on the window. flush() puts every page back at once, and so does applying a style to the
+sub-tree again with detach_hidden=False.
+"""
+import logging
+import time
+
+from PySide6.QtCore import QEvent, QObject, Qt, Signal, Slot
+from PySide6.QtWidgets import QStackedWidget, QWidget
+
+logger = logging.getLogger(__name__)
+
+
+class ThemeApplier(QObject):
+    """
+    Applies style sheets to widget sub-trees, optionally deferring the restyle of hidden stacked and tab pages until
+    they are first shown.
+
+    Signals:
+        themeApplied (dict): Emitted after every application with the style name, the scope ('immediate', or
+            'deferred' when a page is put back), the number of styled widgets, the number of pages taken out of the
+            tree and the elapsed milliseconds.
+    """
+
+    themeApplied = Signal(dict)
+
+    def __init__(self, registry=None, parent=None):
+        """
+        Initialize the applier.
+
+        :param registry: The StyleRegistry used to resolve style names. Defaults to the registry shared by BaseStyle.
+        :param parent: The parent QObject. Default is None.
+        """
+        super().__init__(parent)
+        if registry is None:
+            from .Styles import BaseStyle
+            registry = BaseStyle.registry()
+        self.registry = registry
+        self._pending = {}  # placeholder -> (hidden page, style name)
+
+    def apply(self, widget, style_name, detach_hidden=False):
+        """
+        Apply a registered style (or a QSS file) to a widget sub-tree.
+
+        :param widget: The root of the sub-tree to style.
+        :param style_name: A registered style name or the path of a QSS file.
+        :param detach_hidden: If True, hidden stacked and tab pages are taken out of the widget tree and restyled when
+                              they are first shown (see the module documentation). Default is False.
+        :return: A dictionary describing the application, see the themeApplied signal.
+        """
+        return self.applyText(widget, self.registry.get_text(style_name), detach_hidden, style_name)
+
+    def applyText(self, widget, qss_text, detach_hidden=False, style_name="<text>"):
+        """
+        Apply style sheet text to a widget sub-tree.
+
+        :param widget: The root of the sub-tree to style.
+        :param qss_text: The style sheet text.
+        :param detach_hidden: If True, hidden stacked and tab pages are taken out of the widget tree and restyled when
+                              they are first shown (see the module documentation). Default is False.
+        :param style_name: The name reported in logs and in the themeApplied signal.
+        :return: A dictionary describing the application, see the themeApplied signal.
+        """
+        if not isinstance(widget, QWidget):
+            raise TypeError(f"Expected a QWidget, got {type(widget).__name__} instead.")
+
+        start = time.perf_counter()
+        if detach_hidden:
+            hidden_pages = [page for page in self._hiddenPages(widget) if page not in self._pending]
+        else:
+            hidden_pages = []
+            self.flush(widget)
+
+        window = widget.window()
+        updates_enabled = window.updatesEnabled()
+        window.setUpdatesEnabled(False)
+        try:
+            for page in hidden_pages:
+                self._defer(page, style_name)
+            widget.setStyleSheet(qss_text)
+        finally:
+            window.setUpdatesEnabled(updates_enabled)
+
+        return self._report(style_name, 'immediate', 1, len(hidden_pages), start)
+
+    def pendingCount(self):
+        """
+        Get the number of hidden pages still out of the widget tree.
+
+        :return: The number of pending pages.
+        """
+        return len(self._pending)
+
+    def flush(self, widget=None):
+        """
+        Put pending pages back into the widget tree immediately, regardless of their visibility.
+
+        :param widget: Only put back the pages whose placeholders are inside this sub-tree. Default is None (all).
+        """
+        for placeholder in list(self._pending):
+            if widget is None or placeholder is widget or widget.isAncestorOf(placeholder):
+                self._restore(placeholder)
+
+    def eventFilter(self, obj, event):
+        """
+        Put a pending page back when its placeholder is shown.
+
+        :param obj: The watched placeholder.
+        :param event: The event delivered to the placeholder.
+        :return: False, so the event is always processed further.
+        """
+        if event.type() == QEvent.Show and obj in self._pending:
+            self._restore(obj)
+        return super().eventFilter(obj, event)
+
+    @Slot(int)
+    def _currentChanged(self, index):
+        """
+        Put a pending page back when its placeholder becomes the current page, even if the stack itself is hidden.
+        """
+        stack = self.sender()
+        if isinstance(stack, QStackedWidget) and stack.widget(index) in self._pending:
+            self._restore(stack.widget(index))
+
+    @staticmethod
+    def _hiddenPages(widget):
+        """
+        Collect the outermost hidden pages of all stacked widgets (including those inside tab widgets) in a sub-tree.
+        """
+        stacks = widget.findChildren(QStackedWidget)
+        if isinstance(widget, QStackedWidget):
+            stacks.insert(0, widget)
+        pages = []
+        for stack in stacks:
+            for i in range(stack.count()):
+                page = stack.widget(i)
+                if page is not stack.currentWidget() and not page.isVisible():
+                    pages.append(page)
+
+        hidden = set(pages)
+        outermost = []
+        for page in pages:
+            parent = page.parentWidget()
+            while parent is not None and parent is not widget and parent not in hidden:
+                parent = parent.parentWidget()
+            if parent is None or parent is widget:
+                outermost.append(page)
+        return outermost
+
+    def _defer(self, page, style_name):
+        """
+        Take a hidden page out of the widget tree and leave an empty placeholder at its index.
+
+        The stacked widget's signals are blocked during the swap, so a QTabWidget keeps the tab of the page.
+        """
+        stack = page.parentWidget()
+        index = stack.indexOf(page)
+        placeholder = QWidget()
+        blocked = stack.blockSignals(True)
+        try:
+            stack.removeWidget(page)
+            stack.insertWidget(index, placeholder)
+        finally:
+            stack.blockSignals(blocked)
+        page.setParent(None)
+        stack.currentChanged.connect(self._currentChanged, Qt.UniqueConnection)
+        placeholder.installEventFilter(self)
+        placeholder.destroyed.connect(lambda *args, key=placeholder: self._discard(key))
+        self._pending[placeholder] = (page, style_name)
+
+    def _restore(self, placeholder):
+        """
+        Put a pending page back in place of its placeholder, where it inherits the current style.
+        """
+        page, style_name = self._pending.pop(placeholder)
+        placeholder.removeEventFilter(self)
+        start = time.perf_counter()
+        stack = placeholder.parentWidget()
+        blocked = stack.blockSignals(True)
+        try:
+            stack.insertWidget(stack.indexOf(placeholder), page)
+            if stack.currentWidget() is placeholder:
+                stack.setCurrentWidget(page)
+            stack.removeWidget(placeholder)
+        finally:
+            stack.blockSignals(blocked)
+        placeholder.deleteLater()
+        self._report(style_name, 'deferred', 1, 0, start)
+
+    def _discard(self, placeholder):
+        """
+        Delete a pending page whose placeholder was destroyed together with its window.
+        """
+        pending = self._pending.pop(placeholder, None)
+        if pending is not None:
+            pending[0].deleteLater()
+
+    def _report(self, style_name, scope, styled, deferred, start):
+        """
+        Log and emit the timing of one application.
+        """
+        report = {'style': style_name, 'scope': scope, 'styled': styled, 'deferred': deferred,
+                  'elapsed_ms': (time.perf_counter() - start) * 1000}
+        logger.info(f"Applied style '{style_name}' ({scope}) to {styled} widget(s), deferred {deferred} page(s) "
+                    f"in {report['elapsed_ms']:.2f} ms")
+        self.themeApplied.emit(report)
+        return report
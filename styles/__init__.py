@@ -1,5 +1,10 @@
 # QtFusion, AGPL-3.0 license
 from .Styles import BaseStyle, loadQssStyles
-from .Formers import loadYamlSettings
+from .Formers import loadYamlSettings, loadYamlFile, clearYamlCache, registerWidgetType, preloadYamlIcons
+from .Registry import StyleRegistry, rewriteQssUrls
+from .QssBundle import QssBundle, buildQssBundle, minifyQss
+from .Themes import ThemeApplier
 
-__all__ = "BaseStyle", "loadQssStyles", "loadYamlSettings"
+__all__ = ("BaseStyle", "loadQssStyles", "loadYamlSettings", "loadYamlFile", "clearYamlCache", "registerWidgetType",
+           "preloadYamlIcons", "StyleRegistry", "rewriteQssUrls", "QssBundle", "buildQssBundle", "minifyQss",
+           "ThemeApplier")
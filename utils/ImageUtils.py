@@ -5,23 +5,23 @@ import numpy as np
 from PIL import Image, ImageDraw, ImageQt
 from IMcore.IMplots import imHBar, imVBar, imRectBox, imVBarPer, imRectEdge
 from .. import fontC, fontB
+from .Palette import BASE_COLORS, nameColor, paletteColors
 
 
-def get_cls_color(cls_name):
+def get_cls_color(cls_name, by_name=False):
     """
     Returns a list of color codes based on the class name.
 
+    The palette is deterministic and computed once per class count (see utils.Palette), so repeated calls return the
+    same colours. Every call returns a new list.
+
     :param cls_name: Class name string.
+    :param by_name: If True, derive each colour from the class name instead of its position.
     :return: List of RGB color codes.
     """
-    pre_colors = [[132, 56, 255], [82, 0, 133], [203, 56, 255], [255, 149, 200], [255, 55, 199],
-                  [72, 249, 10], [146, 204, 23], [61, 219, 134], [26, 147, 52], [0, 212, 187],
-                  [255, 56, 56], [255, 157, 151], [255, 112, 31], [255, 178, 29], [207, 210, 49],
-                  [44, 153, 168], [0, 194, 255], [52, 69, 147], [100, 115, 255], [0, 24, 236]]
-    generated_colors = pre_colors if len(cls_name) <= len(pre_colors) \
-        else [[random.randint(0, 255) for _ in range(3)] for _ in
-              range(len(cls_name))]  # Assign a unique color for each class
-    return generated_colors
+    if by_name:
+        return [list(nameColor(name)) for name in cls_name]
+    return paletteColors(max(len(cls_name), len(BASE_COLORS)))
 
 
 def horizontal_bar(label_name, value, colors, width, height, color_text='#000000', alpha=0.8, margin=20):
@@ -0,0 +1,89 @@
+# QtFusion, AGPL-3.0 license
+"""
+Deterministic class colour palettes.
+
+The first colours of every palette are the 20 QtFusion default colours; further colours are spread around the hue
+circle with the golden ratio, which keeps consecutive colours far apart. Palettes are computed once per class count
+and returned as read-only NumPy arrays of shape (N, 3), so 'palette[class_ids]' colours a whole batch of detections at
+once. Alternatively, colours can be derived from the class names, which keeps them stable when the class list changes.
+"""
+import colorsys
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+BASE_COLORS = [[132, 56, 255], [82, 0, 133], [203, 56, 255], [255, 149, 200], [255, 55, 199],
+               [72, 249, 10], [146, 204, 23], [61, 219, 134], [26, 147, 52], [0, 212, 187],
+               [255, 56, 56], [255, 157, 151], [255, 112, 31], [255, 178, 29], [207, 210, 49],
+               [44, 153, 168], [0, 194, 255], [52, 69, 147], [100, 115, 255], [0, 24, 236]]
+
+GOLDEN_RATIO = 0.618033988749895
+_SATURATIONS = (0.85, 0.6, 0.95)
+_VALUES = (0.95, 0.8, 0.65)
+
+
+def _hsvColor(hue, step):
+    """
+    Convert a hue to an RGB colour, cycling saturation and brightness with the step so close hues stay apart.
+    """
+    r, g, b = colorsys.hsv_to_rgb(hue % 1.0, _SATURATIONS[step % 3], _VALUES[(step // 3) % 3])
+    return [int(round(r * 255)), int(round(g * 255)), int(round(b * 255))]
+
+
+@lru_cache(maxsize=64)
+def _palette(count, base):
+    colors = [list(color) for color in base[:count]]
+    for i in range(count - len(colors)):
+        colors.append(_hsvColor(0.11 + i * GOLDEN_RATIO, i))
+    array = np.array(colors, dtype=np.uint8).reshape(-1, 3)
+    array.setflags(write=False)
+    return array, colors
+
+
+def _baseKey(base):
+    return tuple(tuple(int(c) for c in color[:3]) for color in (BASE_COLORS if base is None else base))
+
+
+def paletteArray(count, base=None):
+    """
+    Get a palette as a NumPy lookup array indexable by class id.
+
+    :param count: The number of colours.
+    :param base: The colours placed first, as a list of RGB triples. Defaults to BASE_COLORS.
+    :return: A read-only uint8 array of shape (count, 3). Equal arguments return the same array.
+    """
+    return _palette(count, _baseKey(base))[0]
+
+
+def paletteColors(count, base=None):
+    """
+    Get a palette as a list of RGB lists.
+
+    :param count: The number of colours.
+    :param base: The colours placed first, as a list of RGB triples. Defaults to BASE_COLORS.
+    :return: A new list of [R, G, B] colours, which the caller may modify.
+    """
+    return [list(color) for color in _palette(count, _baseKey(base))[1]]
+
+
+@lru_cache(maxsize=4096)
+def nameColor(name):
+    """
+    Get a colour derived from a class name. The colour depends only on the name, not on the order of the classes.
+
+    :param name: The class name.
+    :return: An (R, G, B) tuple.
+    """
+    digest = zlib.crc32(str(name).encode('utf-8'))
+    return tuple(_hsvColor((digest & 0xFFFF) / 0x10000, digest >> 16))
+
+
+def namePalette(names):
+    """
+    Get the name-derived colours of a list of classes as a NumPy lookup array.
+
+    :param names: The class names, in class id order.
+    :return: A uint8 array of shape (len(names), 3).
+    """
+    return np.array([nameColor(name) for name in names], dtype=np.uint8).reshape(-1, 3)
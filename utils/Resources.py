@@ -0,0 +1,228 @@
+# QtFusion, AGPL-3.0 license
+"""
+Shared icon and pixmap cache.
+
+Pixmaps are kept in Qt's global QPixmapCache (bounded by setPixmapCacheLimit) under a key made of the resolved path,
+the modification time of the file and the requested size, and QIcon objects built from them are kept in a small LRU
+cache (bounded by setIconCacheLimit), so an icon used on many buttons is decoded once and an edited file is loaded
+again. Images that cannot be read are not cached. preloadIcons decodes images on the global QThreadPool and inserts
+them into the cache on the GUI thread, which lets a window warm its icons before it is first shown.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, Signal
+from PySide6.QtGui import QIcon, QImage, QPixmap, QPixmapCache
+
+_icons = OrderedDict()  # (resolved path, width, height) -> (modification time, QIcon), least recently used first
+_icons_limit = 256
+_icons_lock = threading.Lock()
+_bridge = None
+
+
+def resolveResource(path):
+    """
+    Resolve a resource path to the key used by the cache.
+
+    :param path: A file path or a Qt resource path (':/...').
+    :return: The absolute file path, or the resource path unchanged.
+    """
+    return path if path.startswith(':') else os.path.abspath(path)
+
+
+def _sizeOf(size):
+    if size is None:
+        return 0, 0
+    if isinstance(size, QSize):
+        return size.width(), size.height()
+    if isinstance(size, int):
+        return size, size
+    return int(size[0]), int(size[1])
+
+
+def _stamp(path):
+    """
+    Get the modification time of a resolved path in nanoseconds, or 0 for Qt resources and unreadable files.
+    """
+    if path.startswith(':'):
+        return 0
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _pixmapKey(path, stamp, width, height):
+    return f"qf:{path}:{stamp}:{width}x{height}"
+
+
+def _scaled(image, width, height):
+    """
+    Scale a QImage or QPixmap to fit the given size, keeping its aspect ratio. A size of 0x0 leaves it unchanged.
+    """
+    if not width or not height or image.isNull():
+        return image
+    return image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+def setPixmapCacheLimit(limit_kb):
+    """
+    Set the size limit of the global pixmap cache.
+
+    :param limit_kb: The limit in kilobytes.
+    """
+    QPixmapCache.setCacheLimit(limit_kb)
+
+
+def setIconCacheLimit(count):
+    """
+    Set the maximum number of cached icons. The least recently used icons are dropped first.
+
+    :param count: The number of icons. Default is 256.
+    """
+    global _icons_limit
+    with _icons_lock:
+        _icons_limit = count
+        while len(_icons) > _icons_limit:
+            _icons.popitem(last=False)
+
+
+def cachedPixmap(path, size=None):
+    """
+    Get a pixmap from the cache, loading and (optionally) scaling it on first use.
+
+    :param path: A file path or a Qt resource path.
+    :param size: The size to fit the pixmap into, as a QSize, an int or a (width, height) tuple. Defaults to None,
+                 which keeps the original size.
+    :return: The pixmap. A null pixmap is returned (and not cached) if the file cannot be read.
+    """
+    path = resolveResource(path)
+    width, height = _sizeOf(size)
+    key = _pixmapKey(path, _stamp(path), width, height)
+    pixmap = QPixmap()
+    if QPixmapCache.find(key, pixmap):
+        return pixmap
+    pixmap = _scaled(QPixmap(path), width, height)
+    if not pixmap.isNull():
+        QPixmapCache.insert(key, pixmap)
+    return pixmap
+
+
+def cachedIcon(path, size=None):
+    """
+    Get an icon from the cache, building it from a cached pixmap on first use.
+
+    :param path: A file path or a Qt resource path.
+    :param size: The size to fit the icon pixmap into. Defaults to None, which keeps the original size.
+    :return: The shared QIcon. A null icon is returned (and not cached) if the file cannot be read.
+    """
+    resolved = resolveResource(path)
+    key = (resolved,) + _sizeOf(size)
+    stamp = _stamp(resolved)
+    with _icons_lock:
+        entry = _icons.get(key)
+        if entry is not None and entry[0] == stamp:
+            _icons.move_to_end(key)
+            return entry[1]
+    pixmap = cachedPixmap(resolved, size)
+    icon = QIcon()
+    if pixmap.isNull():
+        return icon
+    icon.addPixmap(pixmap, QIcon.Mode.Normal, QIcon.State.Off)
+    with _icons_lock:
+        _icons[key] = (stamp, icon)
+        _icons.move_to_end(key)
+        while len(_icons) > _icons_limit:
+            _icons.popitem(last=False)
+    return icon
+
+
+def clearResourceCache():
+    """
+    Drop every cached icon and every pixmap in the global pixmap cache.
+    """
+    with _icons_lock:
+        _icons.clear()
+    QPixmapCache.clear()
+
+
+class _PreloadBridge(QObject):
+    """
+    Receives images decoded on worker threads and inserts them into the cache on the thread it lives in.
+    """
+    imageLoaded = Signal(str, QImage, object)
+
+    def __init__(self):
+        super().__init__()
+        self.imageLoaded.connect(self._insert)
+
+    @staticmethod
+    def _insert(key, image, batch):
+        if not image.isNull():
+            QPixmapCache.insert(key, QPixmap.fromImage(image))
+        batch.done()
+
+
+class _PreloadBatch:
+    """
+    Counts the outstanding images of one preloadIcons call and calls its callback once all are loaded.
+    """
+
+    def __init__(self, count, finished):
+        self.remaining = count
+        self.finished = finished
+
+    def done(self):
+        self.remaining -= 1
+        if self.remaining == 0 and self.finished is not None:
+            self.finished()
+
+
+class _ImageLoader(QRunnable):
+    """
+    Decodes one image on a worker thread. QImage, unlike QPixmap, may be used outside the GUI thread.
+    """
+
+    def __init__(self, bridge, path, key, width, height, batch):
+        super().__init__()
+        self.bridge, self.path, self.key, self.width, self.height, self.batch = bridge, path, key, width, height, batch
+
+    def run(self):
+        image = _scaled(QImage(self.path), self.width, self.height)
+        self.bridge.imageLoaded.emit(self.key, image, self.batch)
+
+
+def preloadIcons(paths, size=None, finished=None):
+    """
+    Decode icons in the background so later cachedPixmap and cachedIcon calls are served from the cache.
+
+    Must be called from the GUI thread. Images are decoded on the global QThreadPool and converted to pixmaps on the
+    GUI thread as they arrive.
+
+    :param paths: The file or resource paths to preload.
+    :param size: The size the icons will be requested with. Defaults to None, which keeps the original size.
+    :param finished: An optional callable invoked on the GUI thread once every image has been loaded.
+    :return: The number of images scheduled for loading (already cached images are skipped).
+    """
+    global _bridge
+    if _bridge is None:
+        _bridge = _PreloadBridge()
+
+    width, height = _sizeOf(size)
+    pending, probe = [], QPixmap()
+    for path in dict.fromkeys(resolveResource(p) for p in paths):
+        key = _pixmapKey(path, _stamp(path), width, height)
+        if not QPixmapCache.find(key, probe):
+            pending.append((path, key))
+
+    if not pending:
+        if finished is not None:
+            finished()
+        return 0
+
+    batch = _PreloadBatch(len(pending), finished)
+    pool = QThreadPool.globalInstance()
+    for path, key in pending:
+        pool.start(_ImageLoader(_bridge, path, key, width, height, batch))
+    return len(pending)
@@ -1,4 +1,9 @@
 # QtFusion, AGPL-3.0 license
 from .ImageUtils import get_cls_color, horizontal_bar, vertical_bar, verticalBar, cv_imread, drawRectEdge, drawRectBox
+from .Palette import paletteArray, paletteColors, nameColor, namePalette
+from .Resources import (cachedIcon, cachedPixmap, preloadIcons, setPixmapCacheLimit, setIconCacheLimit,
+                        clearResourceCache)
 
-__all__ = "get_cls_color", "horizontal_bar", "vertical_bar", "verticalBar", "cv_imread", "drawRectEdge", "drawRectBox"
+__all__ = ("get_cls_color", "horizontal_bar", "vertical_bar", "verticalBar", "cv_imread", "drawRectEdge", "drawRectBox",
+           "paletteArray", "paletteColors", "nameColor", "namePalette", "cachedIcon", "cachedPixmap", "preloadIcons",
+           "setPixmapCacheLimit", "setIconCacheLimit", "clearResourceCache")
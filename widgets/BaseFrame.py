@@ -1,19 +1,24 @@
 # QtFusion, AGPL-3.0 license
 import platform
-import random
 import sys
 
-from PySide6.QtCore import QPropertyAnimation
+from PySide6.QtCore import QPropertyAnimation, Qt
 from PySide6.QtWidgets import *
 from IMcore.IMencode import imRandCode
-from IMcore.IMtrans import ToQtPixmap, scalePixmap, setPixmap
+from IMcore.IMtrans import ToQtPixmap, setPixmap
 from IMcore.IMwidget import IMDialog, IMainWindow
 
+from .Deferred import DeferredInit
 from .ExtWidgets import *
+from .TableModels import DetectionTableModel, formatCell
+from .WidgetIndex import widgetIndex
 from .. import __package_name__, __version__, __author__
 from ..config.QfConfig import QF_Config
+from ..monitor.Timeline import timeline, traceStartup
 from ..styles import loadYamlSettings
 from ..utils.ImageUtils import vertical_bar, horizontal_bar, verticalBar
+from ..utils.Palette import paletteColors
+from ..utils.Pixmap import scalePixmap
 
 
 """
@@ -59,13 +64,16 @@ def findContainLayout(widget, layout=None):
     """
     Find the layout containing the given widget.
 
+    Without an explicit layout, the lookup is answered by the WidgetIndex of the widget's window, which is built once
+    and kept current as widgets are added and removed.
+
     :param widget: The widget for which the containing layout is to be found.
-    :param layout: The layout to search in. If not provided, it uses the layout of the parent widget of 'widget'.
+    :param layout: The layout to search in. If not provided, the whole window of 'widget' is searched.
     :return: The layout containing the 'widget'. If not found, return None.
     """
 
     if layout is None:
-        layout = widget.parentWidget().layout()
+        return widgetIndex(widget).layoutOf(widget)
 
     for i in range(layout.count()):
         item = layout.itemAt(i)
@@ -87,45 +95,24 @@ def replaceWidget(original, DerivedClass, properties=["minimumSize", "maximumSiz
     :param properties: List of properties to be copied from the original widget to the derived widget.
     :return: The new widget replacing the original one.
     """
+    return replaceWidgets([(original, DerivedClass)], properties)[0]
 
-    # Create an instance of the derived widget
-    derived = DerivedClass()
-
-    # Get the meta object of the original widget
-    meta = original.metaObject()
-
-    # Copy the specified properties from the original widget to the derived widget
-    for property_name in properties:
-        # Get the index of the property
-        index = meta.indexOfProperty(property_name)
-        if index == -1:
-            raise Exception(f"Original widget does not have property '{property_name}'.")
-
-        # Get the QMetaProperty for the property
-        prop = meta.property(index)
 
-        # Read the value of the property from the original widget
-        value = prop.read(original)
-
-        # Write the value of the property to the derived widget
-        if not prop.write(derived, value):
-            raise Exception(f"Failed to set property '{property_name}' on derived widget.")
+def replaceWidgets(replacements, properties=["minimumSize", "maximumSize", "objectName", "styleSheet"]):
+    """
+    Replace many widgets with instances of derived classes in one pass, preserving certain properties.
 
-    # Get the layout containing the original widget
-    layout = findContainLayout(original)
-    if layout:
-        # If the original widget is in a layout, replace it in the layout
-        for i in range(layout.count()):
-            if layout.itemAt(i).widget() == original:
-                layout.removeWidget(original)
-                layout.insertWidget(i, derived)
-    else:
-        # If the original widget is not in a layout, we cannot replace it, raise an exception
-        raise Exception("Original widget is not in a layout, cannot replace widget.")
+    All widgets must belong to the same window. The containing layouts are looked up in the window's WidgetIndex and
+    repaints are suspended until every widget has been swapped.
 
-    # Delete the original widget
-    original.deleteLater()
-    return derived
+    :param replacements: An iterable of (original widget, derived class) pairs.
+    :param properties: List of properties to be copied from each original widget to its replacement.
+    :return: The list of new widgets, in the order of 'replacements'.
+    """
+    replacements = list(replacements)
+    if not replacements:
+        return []
+    return widgetIndex(replacements[0][0]).replaceWidgets(replacements, properties)
 
 
 def moveCenter(main_window, msg_box):
@@ -163,27 +150,37 @@ def updateTable(table_widget, row_number, *row_data):
     """
     Update a specific row in a QTableWidget with new data.
 
-    :param table_widget: The QTableWidget to be updated.
+    If 'table_widget' is a view whose model is a DetectionTableModel, the row is handed to the model, which batches
+    insertions and refreshes the view at a fixed rate. Otherwise the cells are written as QTableWidgetItems.
+
+    :param table_widget: The QTableWidget (or QTableView with a DetectionTableModel) to be updated.
     :param row_number: The row number to be updated.
     :param row_data: The new data for the row. Should match the number of columns in the table.
     :return: The row number after the update.
     """
-    column_count = table_widget.columnCount()
+    model = table_widget.model()
+    column_count = model.columnCount()
 
     if len(row_data) != column_count - 1:
         raise ValueError(f"Number of arguments does not match the number of columns in the table. "
                          f"Got {len(row_data)} arguments, expected {column_count}.")
 
+    row_data = (row_number,) + row_data
+    if isinstance(model, DetectionTableModel):
+        model.setRow(row_number, row_data)
+        return row_number + 1
+
     if row_number >= table_widget.rowCount():
         table_widget.setRowCount(row_number + 1)
 
-    row_data = (row_number,) + row_data
+    item = None
     for i, data in enumerate(row_data):
-        if isinstance(data, (list, tuple)):
-            text = ",".join(map(str, data))
-        else:
-            text = str(data)
-        addTableItem(table_widget, row_number, i, text)
+        item = QTableWidgetItem(formatCell(data))
+        item.setTextAlignment(Qt.AlignCenter)
+        table_widget.setItem(row_number, i, item)
+    # Select (and scroll to) the last cell once instead of once per cell.
+    if item is not None:
+        table_widget.setCurrentItem(item)
 
     return row_number + 1
 
@@ -228,6 +225,7 @@ class FBaseWindow(IMainWindow):
     in the application.
     """
 
+    @traceStartup(category='widget')
     def __init__(self, parent=None, *args, **kwargs):
         """
         Initializes the FBaseWindow instance.
@@ -239,10 +237,22 @@ class FBaseWindow(IMainWindow):
         self.user_name = __author__
         self.user_avatar = AVATAR
         self.pre_colors = COLORS
+        self.deferred = DeferredInit(self)
+        timeline.watchFirstPaint(self)
 
     def init_login_info(self, *args, **kwargs):
         pass
 
+    def deferPage(self, page, builder, name=None):
+        """
+        Build the contents of an off-screen page only when it is shown for the first time.
+
+        :param page: The page widget, e.g. a page of a QStackedWidget or QTabWidget.
+        :param builder: A callable taking the page and creating its contents.
+        :param name: The name used in the startup timeline. Defaults to the object name of the page.
+        """
+        self.deferred.defer(page, builder, name)
+
     def init_reg_info(self, *args, **kwargs):
         pass
 
@@ -253,10 +263,9 @@ class FBaseWindow(IMainWindow):
         :param cls_name: Class name string.
         :return: List of RGB color codes.
         """
-        generated_colors = self.pre_colors if len(cls_name) <= len(self.pre_colors) \
-            else [[random.randint(0, 255) for _ in range(3)] for _ in
-                  range(len(cls_name))]  # Assign a unique color for each class
-        return generated_colors
+        if len(cls_name) <= len(self.pre_colors):
+            return self.pre_colors
+        return paletteColors(len(cls_name), base=self.pre_colors)  # Extend the palette deterministically
 
     def loadStyleSheet(self, qssFilePath, base_path="./"):
         """
@@ -274,7 +283,7 @@ class FBaseWindow(IMainWindow):
 
         :param enabled: Boolean value indicating whether to enable or disable the buttons.
         """
-        for child in self.findChildren(QToolButton):
+        for child in widgetIndex(self).children(QToolButton):
             child.setEnabled(enabled)
 
     def loadYamlSettings(self, yaml_file, base_path="./"):
@@ -301,6 +310,7 @@ class FBaseWindow(IMainWindow):
         """
         pass
 
+    @traceStartup(category='style')
     def setUiStyle(self, windowFlag=False, transBackFlag=False):
         """
         Sets UI styles and widget states based on the provided flags.
@@ -387,7 +397,7 @@ class FBaseWindow(IMainWindow):
         """
         Plots a vertical bar on a QLabel.
 
-        :param label: The QLabel to plot the bar on.
+        :param label: The QLabel to plot the bar on, or an FBarChart, which is updated in place.
         :param label_name: The label name.
         :param value: The value for the bar.
         :param colors: The colors for the bar. Defaults to None.
@@ -397,7 +407,10 @@ class FBaseWindow(IMainWindow):
         :param height: The height of the bar. Defaults to None.
         :param margin: The margin for the bar. Defaults to 20.
         """
-        if isinstance(label, QLabel):
+        if hasattr(label, 'setBars'):
+            label.setBars(label_name, value, colors, orientation=Qt.Vertical, percent=False, color_text=color_text,
+                          alpha=alpha, margin=margin)
+        elif isinstance(label, QLabel):
             width = label.width() if width is None else width  # width
             height = label.height() if height is None else height
 
@@ -412,7 +425,7 @@ class FBaseWindow(IMainWindow):
         """
         Plots a horizontal bar on a QLabel.
 
-        :param label: The QLabel to plot the bar on.
+        :param label: The QLabel to plot the bar on, or an FBarChart, which is updated in place.
         :param label_name: The label name.
         :param value: The value for the bar.
         :param colors: The colors for the bar. Defaults to None.
@@ -422,7 +435,10 @@ class FBaseWindow(IMainWindow):
         :param height: The height of the bar. Defaults to None.
         :param margin: The margin for the bar. Defaults to 20.
         """
-        if isinstance(label, QLabel):
+        if hasattr(label, 'setBars'):
+            label.setBars(label_name, value, colors, orientation=Qt.Horizontal, percent=False, color_text=color_text,
+                          alpha=alpha, margin=margin)
+        elif isinstance(label, QLabel):
             width = label.width() if width is None else width  # width
             height = label.height() if height is None else height
             pixmap = horizontal_bar(label_name, value, colors, width, height,
@@ -436,7 +452,7 @@ class FBaseWindow(IMainWindow):
         """
         Plots a vertical bar on a QLabel. Seems similar to the 'plot_vertical_bar' method.
 
-        :param label: The QLabel to plot the bar on.
+        :param label: The QLabel to plot the bar on, or an FBarChart, which is updated in place.
         :param label_name: The label name.
         :param value: The value for the bar.
         :param colors: The colors for the bar. Defaults to None.
@@ -446,7 +462,10 @@ class FBaseWindow(IMainWindow):
         :param height: The height of the bar. Defaults to None.
         :param margin: The margin for the bar. Defaults to 20.
         """
-        if isinstance(label, QLabel):
+        if hasattr(label, 'setBars'):
+            label.setBars(label_name, value, colors, orientation=Qt.Vertical, percent=True, color_text=color_text,
+                          alpha=alpha, margin=margin)
+        elif isinstance(label, QLabel):
             width = label.width() if width is None else width  # width
             height = label.height() if height is None else height
 
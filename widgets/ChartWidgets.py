@@ -0,0 +1,304 @@
+# QtFusion, AGPL-3.0 license
+"""
+Incrementally updated chart widgets.
+
+FBarChart draws the same bar charts as vertical_bar, horizontal_bar and verticalBar, but it keeps the static part of
+the chart (axes and category labels, rendered with fontB) in a cached pixmap and only repaints the bars whose values
+changed. Value changes are animated at a capped frame rate. The background is rendered again only when the widget is
+resized or the labels, orientation or text colour change, so a per-frame update costs a few rectangle fills instead of
+a full PIL render.
+"""
+import math
+
+from PIL import Image, ImageDraw, ImageQt
+from PySide6.QtCore import QRect, QRectF, Qt, QTimer
+from PySide6.QtGui import QColor, QPainter, QPixmap
+from PySide6.QtWidgets import QSizePolicy, QWidget
+
+from .. import fontB
+from ..utils.ImageUtils import get_cls_color
+
+
+def _niceCeil(value):
+    """
+    Round a positive value up to 1, 2 or 5 times a power of ten, so the chart scale changes rarely.
+    """
+    if value <= 0:
+        return 1.0
+    exponent = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if value <= step * exponent:
+            return step * exponent
+    return 10 * exponent
+
+
+class FBarChart(QWidget):
+    """
+    A bar chart widget with a cached background and per-bar repaints.
+
+    The widget can replace a QLabel that is passed to FBaseWindow.plot_vertical_bar, plot_horizontal_bar or
+    plot_verticalBar; those methods call setBars on it instead of rendering a new pixmap.
+    """
+
+    def __init__(self, parent=None, orientation=Qt.Vertical, percent=False, color_text="#FFFFFF", alpha=0.7,
+                 margin=20, fps=30):
+        """
+        Initializes the chart.
+
+        :param parent: The parent widget. Default is None.
+        :param orientation: Qt.Vertical for bars growing upwards, Qt.Horizontal for bars growing to the right.
+        :param percent: If True, bars show each value as a share of the total.
+        :param color_text: The colour of the labels and values.
+        :param alpha: The opacity of the bars.
+        :param margin: The margin around the plot area in pixels.
+        :param fps: The maximum animation frame rate. 0 disables animation.
+        """
+        super(FBarChart, self).__init__(parent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setAttribute(Qt.WA_OpaquePaintEvent, False)
+        self._orientation = orientation
+        self._percent = percent
+        self._color_text = color_text
+        self._alpha = alpha
+        self._margin = margin
+        self._labels = []
+        self._colors = []
+        self._targets = []
+        self._shown = []
+        self._scale = 1.0
+        self._background = None
+        self._plot = QRect()
+        self._slots = []
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._step)
+        self.setFrameRate(fps)
+
+    def setFrameRate(self, fps):
+        """
+        Sets the maximum animation frame rate.
+
+        :param fps: Frames per second. 0 disables animation, so new values are shown immediately.
+        """
+        self._fps = fps
+        if fps:
+            self._timer.setInterval(int(1000 / fps))
+        else:
+            self._timer.stop()
+            self._settle()
+
+    def setBars(self, label_name, value, colors=None, orientation=None, percent=None, color_text=None, alpha=None,
+                margin=None):
+        """
+        Sets the labels and values of the chart.
+
+        Only the bars whose values changed are repainted. The background is rendered again if the labels or any of the
+        layout parameters differ from the previous call.
+
+        :param label_name: The labels of the bars.
+        :param value: The values of the bars.
+        :param colors: The RGB colours of the bars. Defaults to get_cls_color(label_name).
+        :param orientation: Qt.Vertical or Qt.Horizontal. Defaults to the current orientation.
+        :param percent: If True, bars show each value as a share of the total. Defaults to the current mode.
+        :param color_text: The colour of the labels and values. Defaults to the current colour.
+        :param alpha: The opacity of the bars. Defaults to the current opacity.
+        :param margin: The margin around the plot area. Defaults to the current margin.
+        """
+        labels = [str(name) for name in label_name]
+        values = [float(v) for v in value]
+        if len(values) != len(labels):
+            raise ValueError(f"Expected {len(labels)} values, got {len(values)}.")
+
+        layout = (labels, self._orientation if orientation is None else orientation,
+                  self._percent if percent is None else percent,
+                  self._color_text if color_text is None else color_text,
+                  self._margin if margin is None else margin)
+        if layout != (self._labels, self._orientation, self._percent, self._color_text, self._margin):
+            self._labels, self._orientation, self._percent, self._color_text, self._margin = layout
+            self._shown = [0.0] * len(labels)
+            self._invalidate()
+
+        colors = [list(color) for color in (colors if colors is not None else get_cls_color(labels))][:len(labels)]
+        alpha = self._alpha if alpha is None else alpha
+        if colors != self._colors or alpha != self._alpha:
+            self._colors, self._alpha = colors, alpha
+            self.update(self._plot)
+
+        self._targets = values
+        if self._fps and self.isVisible():
+            if not self._timer.isActive():
+                self._timer.start()
+        else:
+            self._settle()
+
+    def values(self):
+        """
+        Gets the values last passed to setBars.
+
+        :return: The list of values.
+        """
+        return list(self._targets)
+
+    # Painting
+
+    def resizeEvent(self, event):
+        self._invalidate()
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        if self._background is None:
+            self._renderBackground()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._background)
+        if self._shown:
+            self._paintBars(painter, event.rect())
+        painter.end()
+
+    def _paintBars(self, painter, clip):
+        """
+        Fills the bars and draws the values of all slots intersecting the repainted area.
+        """
+        total = sum(self._shown) if self._percent else 0.0
+        painter.setPen(QColor(self._color_text))
+        for i, slot in enumerate(self._slots):
+            if not slot.intersects(clip):
+                continue
+            value = self._shown[i]
+            if self._percent:
+                ratio = value / total if total else 0.0
+                text = f"{ratio * 100:.1f}%"
+            else:
+                ratio = value / self._scale
+                text = f"{value:.0f}" if value == int(value) else f"{value:.1f}"
+            ratio = min(max(ratio, 0.0), 1.0)
+
+            r, g, b = (self._colors[i] if i < len(self._colors) else (128, 128, 128))[:3]
+            bar, text_rect, flags = self._barGeometry(slot, ratio)
+            painter.fillRect(bar, QColor(r, g, b, int(255 * self._alpha)))
+            painter.drawText(text_rect, flags, text)
+
+    def _barGeometry(self, slot, ratio):
+        """
+        Computes the bar rectangle and the value text rectangle of a slot.
+        """
+        text_size = 16
+        if self._orientation == Qt.Vertical:
+            length = (slot.height() - text_size) * ratio
+            bar = QRectF(slot.left(), slot.bottom() + 1 - length, slot.width(), length)
+            text_rect = QRectF(slot.left() - 10, bar.top() - text_size, slot.width() + 20, text_size)
+            return bar, text_rect, Qt.AlignHCenter | Qt.AlignBottom
+        length = (slot.width() - 4 * text_size) * ratio
+        bar = QRectF(slot.left(), slot.top(), length, slot.height())
+        text_rect = QRectF(bar.right() + 4, slot.top(), 4 * text_size, slot.height())
+        return bar, text_rect, Qt.AlignLeft | Qt.AlignVCenter
+
+    def _invalidate(self):
+        """
+        Drops the cached background and bar layout; both are rebuilt on the next paint.
+        """
+        self._background = None
+        self.update()
+
+    def _renderBackground(self):
+        """
+        Renders the axes and labels with fontB and lays out one slot per bar.
+        """
+        ratio = self.devicePixelRatioF()
+        width, height = max(self.width(), 1), max(self.height(), 1)
+        image = Image.new('RGBA', (int(width * ratio), int(height * ratio)), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        margin, count = self._margin, len(self._labels)
+        text_heights = [fontB.getbbox(name)[3] for name in self._labels] or [0]
+        text_widths = [fontB.getbbox(name)[2] for name in self._labels] or [0]
+        axis = tuple(QColor(self._color_text).getRgb())
+
+        self._slots = []
+        if self._orientation == Qt.Vertical:
+            label_space = max(text_heights) + 6
+            self._plot = QRect(margin, margin, width - 2 * margin, height - 2 * margin - label_space)
+            step = self._plot.width() / max(count, 1)
+            for i, name in enumerate(self._labels):
+                left = self._plot.left() + i * step
+                self._slots.append(QRect(int(left + step * 0.15), self._plot.top(), max(int(step * 0.7), 1),
+                                         self._plot.height()))
+                center = (left + step / 2) * ratio
+                draw.text((center - text_widths[i] * ratio / 2, (self._plot.bottom() + 4) * ratio), name,
+                          font=fontB, fill=axis)
+            baseline = (self._plot.bottom() + 1) * ratio
+            draw.line([(self._plot.left() * ratio, baseline), ((self._plot.right() + 1) * ratio, baseline)],
+                      fill=axis, width=max(int(ratio), 1))
+        else:
+            label_space = max(text_widths) + 8
+            self._plot = QRect(margin + label_space, margin, width - 2 * margin - label_space, height - 2 * margin)
+            step = self._plot.height() / max(count, 1)
+            for i, name in enumerate(self._labels):
+                top = self._plot.top() + i * step
+                self._slots.append(QRect(self._plot.left() + 1, int(top + step * 0.15), self._plot.width() - 1,
+                                         max(int(step * 0.7), 1)))
+                draw.text(((self._plot.left() - 4 - text_widths[i]) * ratio,
+                           (top + step / 2) * ratio - text_heights[i] * ratio / 2), name, font=fontB, fill=axis)
+            x = self._plot.left() * ratio
+            draw.line([(x, self._plot.top() * ratio), (x, (self._plot.bottom() + 1) * ratio)],
+                      fill=axis, width=max(int(ratio), 1))
+
+        self._background = QPixmap.fromImage(ImageQt.ImageQt(image))
+        self._background.setDevicePixelRatio(ratio)
+
+    # Animation
+
+    def _updateScale(self):
+        """
+        Adjusts the value scale to the largest target. The scale only shrinks when the values fall well below it, so
+        small fluctuations do not force every bar to be repainted.
+        """
+        peak = max(self._targets, default=0.0)
+        scale = self._scale
+        if peak > scale or peak < scale / 4:
+            scale = _niceCeil(peak)
+        if scale != self._scale:
+            self._scale = scale
+            self.update(self._plot)
+
+    def _changed(self, shown):
+        """
+        Repaints the slots whose shown values differ from the given previous values.
+        """
+        if self._percent and shown != self._shown:
+            # Every share depends on the total.
+            self.update(self._plot.adjusted(-10, -20, 70, 0))
+            return
+        for i, (old, new) in enumerate(zip(shown, self._shown)):
+            if old != new and i < len(self._slots):
+                self.update(self._slots[i].adjusted(-10, -20, 70, 0))
+
+    def _settle(self):
+        """
+        Shows the target values without animation.
+        """
+        if len(self._shown) != len(self._targets):
+            self._shown = [0.0] * len(self._targets)
+        previous, self._shown = self._shown, list(self._targets)
+        self._updateScale()
+        self._changed(previous)
+
+    def _step(self):
+        """
+        Moves the shown values one animation frame towards the targets and stops the timer once they are reached.
+        """
+        if len(self._shown) != len(self._targets):
+            self._shown = [0.0] * len(self._targets)
+        self._updateScale()
+        previous = self._shown
+        shown, done = [], True
+        tolerance = max(self._scale, 1.0) * 0.002
+        for old, target in zip(previous, self._targets):
+            new = old + (target - old) * 0.35
+            if abs(target - new) <= tolerance:
+                new = target
+            else:
+                done = False
+            shown.append(new)
+        self._shown = shown
+        self._changed(previous)
+        if done:
+            self._timer.stop()
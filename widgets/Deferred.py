@@ -0,0 +1,99 @@
+# QtFusion, AGPL-3.0 license
+"""
+Deferred construction of off-screen pages.
+
+Pages of a QStackedWidget or QTabWidget that are not visible at startup do not need their contents yet. DeferredInit
+keeps a builder function per page and calls it when the page receives its first Show event, so the cost of building
+settings pages, result tables or help screens moves from startup to the moment the user opens them.
+"""
+from PySide6.QtCore import QEvent, QObject, Signal
+from PySide6.QtWidgets import QWidget
+
+from ..monitor.Timeline import startupPhase
+
+
+class DeferredInit(QObject):
+    """
+    Builds the contents of registered pages when they are shown for the first time.
+
+    Signals:
+        built (QWidget): Emitted after the contents of a page have been built.
+    """
+
+    built = Signal(QWidget)
+
+    def __init__(self, parent=None):
+        """
+        Initializes the DeferredInit instance.
+
+        :param parent: The parent QObject. Default is None.
+        """
+        super().__init__(parent)
+        self._builders = {}  # page -> (builder, name)
+
+    def defer(self, page, builder, name=None):
+        """
+        Registers a page whose contents are built on its first Show event.
+
+        If the page is already visible, it is built immediately.
+
+        :param page: The (usually empty) page widget.
+        :param builder: A callable taking the page and creating its contents.
+        :param name: The name used in the startup timeline. Defaults to the object name of the page.
+        """
+        self._builders[page] = (builder, name or page.objectName() or type(page).__name__)
+        if page.isVisible():
+            self.ensureBuilt(page)
+            return
+        page.installEventFilter(self)
+        page.destroyed.connect(lambda *args, key=page: self._builders.pop(key, None))
+
+    def isPending(self, page):
+        """
+        Checks whether the contents of a page have not been built yet.
+
+        :param page: The page widget.
+        :return: True if the page is registered and not built yet.
+        """
+        return page in self._builders
+
+    def pendingCount(self):
+        """
+        Gets the number of pages not built yet.
+
+        :return: The number of pending pages.
+        """
+        return len(self._builders)
+
+    def ensureBuilt(self, page):
+        """
+        Builds the contents of a page now if they have not been built yet, e.g. before reading values from it.
+
+        :param page: The page widget.
+        """
+        if page not in self._builders:
+            return
+        builder, name = self._builders.pop(page)
+        page.removeEventFilter(self)
+        with startupPhase(f"build {name}", 'widget'):
+            builder(page)
+        self.built.emit(page)
+
+    def buildAll(self):
+        """
+        Builds the contents of all pending pages, e.g. when the application becomes idle.
+        """
+        for page in list(self._builders):
+            self.ensureBuilt(page)
+
+    def eventFilter(self, obj, event):
+        """
+        Builds the contents of a page when it is shown for the first time.
+
+        :param obj: The watched page.
+        :param event: The event delivered to the page.
+        :return: False, so the event is always processed further.
+        """
+        if event.type() == QEvent.Show and obj in self._builders:
+            self.ensureBuilt(obj)
+        return super().eventFilter(obj, event)
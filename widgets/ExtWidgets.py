@@ -3,11 +3,12 @@ import cv2
 from IMcore.IMextension import IMageLabel, IMessageBox, IMExtWindow
 from PySide6 import QtCore, QtGui
 from PySide6.QtCore import Qt, QPoint
-from PySide6.QtGui import QPixmap
 from PySide6.QtWidgets import QToolButton, QMessageBox, QApplication, QPushButton, QDialog
 
 from .. import __package_name__
 from ..config.QfConfig import QF_Config
+from ..monitor.Timeline import traceStartup
+from ..utils.Resources import cachedIcon
 
 AVATAR = ":/default_icons/default_avatar.png"
 HOME = ":/default_icons/home.png"
@@ -27,6 +28,7 @@ class FImageLabel(IMageLabel):
     decreasing the size by 10%.
     """
 
+    @traceStartup(category='widget')
     def __init__(self, parent=None, *args, **kwargs):
         """
         Initializes the FImageLabel instance.
@@ -124,9 +126,7 @@ class FImageLabel(IMageLabel):
         button_normal.setFixedSize(button_size, button_size)
         button_normal.setStyleSheet("""QToolButton{background-color: transparent;border-image: none;}
                                     QToolButton::hover{border: 0px;} """)
-        icon = QtGui.QIcon()
-        icon.addPixmap(QPixmap(HOME), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        button_normal.setIcon(icon)
+        button_normal.setIcon(cachedIcon(HOME))
         button_normal.setIconSize(QtCore.QSize(button_size, button_size))
         button_normal.clicked.connect(self.normButton)
 
@@ -136,9 +136,7 @@ class FImageLabel(IMageLabel):
         button_bigger.setFixedSize(button_size, button_size)
         button_bigger.setStyleSheet("""QToolButton{background-color: transparent;border-image: none;}
                                         QToolButton::hover{border: 0px;} """)
-        icon = QtGui.QIcon()
-        icon.addPixmap(QPixmap(BIG_SIZE), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        button_bigger.setIcon(icon)
+        button_bigger.setIcon(cachedIcon(BIG_SIZE))
         button_bigger.setIconSize(QtCore.QSize(button_size, button_size))
         button_bigger.clicked.connect(self.bigButton)
 
@@ -147,9 +145,7 @@ class FImageLabel(IMageLabel):
         button_smaller.setFixedSize(button_size, button_size)
         button_smaller.setStyleSheet("""QToolButton{background-color: transparent;border-image: none;}
                                        QToolButton::hover{border: 0px;} """)
-        icon = QtGui.QIcon()
-        icon.addPixmap(QPixmap(SMALL_SIZE), QtGui.QIcon.Normal, QtGui.QIcon.Off)
-        button_smaller.setIcon(icon)
+        button_smaller.setIcon(cachedIcon(SMALL_SIZE))
         button_smaller.setIconSize(QtCore.QSize(button_size, button_size))
         button_smaller.clicked.connect(self.smallButton)
 
@@ -178,6 +174,7 @@ class FWindowCtrls(IMExtWindow):
     Inherits from QMainWindow.
     """
 
+    @traceStartup(category='widget')
     def __init__(self, main_window, exit_title, exit_message, icon=AVATAR,
                  button_sizes=(20, 20),
                  button_gaps=30, button_right_margin=80, hint_flag=False):
@@ -0,0 +1,717 @@
+# QtFusion, AGPL-3.0 license
+"""
+Table models for high-rate detection logs.
+
+DetectionTableModel is a QAbstractTableModel that replaces per-cell QTableWidgetItem updates. Rows are buffered as
+they arrive and handed to the view in batches at a fixed UI rate, with one beginInsertRows/endInsertRows pair per
+batch. Values are stored column by column in a ring buffer bounded by max_rows, and are formatted as text only when
+the view asks for them.
+
+ArrayTableModel keeps the same update scheme but stores columns in NumPy arrays, so histories of millions of rows cost
+a few bytes per value. ArrayProxyModel sorts and filters it with argsort and boolean masks.
+"""
+import numpy as np
+from PySide6.QtCore import QAbstractProxyModel, QAbstractTableModel, QModelIndex, Qt, QTimer, Signal
+
+
+def formatCell(value):
+    """
+    Format a cell value the way updateTable does: sequences are joined with commas, everything else uses str().
+
+    :param value: The cell value.
+    :return: The cell text.
+    """
+    if isinstance(value, (list, tuple)):
+        return ",".join(map(str, value))
+    return str(value)
+
+
+class DetectionTableModel(QAbstractTableModel):
+    """
+    An append-only, bounded table model with batched, rate-limited updates.
+
+    Signals:
+        rowsFlushed (int): Emitted after a batch of rows has been handed to the views, with the number of rows.
+    """
+
+    rowsFlushed = Signal(int)
+
+    def __init__(self, headers, max_rows=10000, update_rate=10, alignment=Qt.AlignCenter, parent=None):
+        """
+        Initializes the model.
+
+        :param headers: The column header labels.
+        :param max_rows: The maximum number of rows kept. The oldest rows are dropped once it is exceeded.
+        :param update_rate: How many times per second pending rows are handed to the views. 0 flushes them on the next
+                            event loop iteration.
+        :param alignment: The text alignment of the cells.
+        :param parent: The parent QObject. Default is None.
+        """
+        super().__init__(parent)
+        if max_rows <= 0:
+            raise ValueError(f"max_rows must be positive, got {max_rows}")
+        self._headers = list(headers)
+        self._capacity = max_rows
+        self._columns = [[None] * max_rows for _ in self._headers]
+        self._start = 0  # physical index of the first row
+        self._count = 0
+        self._pending = []
+        self._alignment = alignment
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(int(1000 / update_rate) if update_rate else 0)
+        self._timer.timeout.connect(self.flush)
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return formatCell(self.value(index.row(), index.column()))
+        if role == Qt.TextAlignmentRole:
+            return int(self._alignment)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self._headers):
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+
+    # Data access
+
+    def value(self, row, column):
+        """
+        Gets the raw value of a cell.
+
+        :param row: The row, counted from the oldest row kept.
+        :param column: The column.
+        :return: The stored value.
+        """
+        return self._columns[column][(self._start + row) % self._capacity]
+
+    def maxRows(self):
+        """
+        Gets the maximum number of rows kept.
+
+        :return: The row limit.
+        """
+        return self._capacity
+
+    def pendingCount(self):
+        """
+        Gets the number of rows waiting for the next flush.
+
+        :return: The number of pending rows.
+        """
+        return len(self._pending)
+
+    def appendRow(self, *values):
+        """
+        Queues a row for insertion. The row becomes visible at the next flush.
+
+        :param values: One value per column.
+        """
+        if len(values) != len(self._headers):
+            raise ValueError(f"Expected {len(self._headers)} values, got {len(values)}.")
+        self._pending.append(values)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def appendRows(self, rows):
+        """
+        Queues several rows for insertion.
+
+        :param rows: An iterable of rows, each with one value per column.
+        """
+        for row in rows:
+            self.appendRow(*row)
+
+    def setRow(self, row, values):
+        """
+        Sets a row by number: existing rows are replaced, including pending ones (which count after the visible rows),
+        and rows past the end are appended after the pending rows.
+
+        :param row: The row number, counted from the oldest row kept.
+        :param values: One value per column.
+        """
+        if len(values) != len(self._headers):
+            raise ValueError(f"Expected {len(self._headers)} values, got {len(values)}.")
+        if row < self._count:
+            physical = (self._start + row) % self._capacity
+            for column, value in enumerate(values):
+                self._columns[column][physical] = value
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self._headers) - 1))
+        elif row < self._count + len(self._pending):
+            self._pending[row - self._count] = tuple(values)
+        else:
+            self.appendRow(*values)
+
+    def flush(self):
+        """
+        Hands all pending rows to the views in one batch, dropping the oldest rows if the limit is exceeded.
+        """
+        self._timer.stop()
+        rows, self._pending = self._pending, []
+        if not rows:
+            return
+
+        if len(rows) >= self._capacity:
+            # The batch alone fills the buffer: nothing of the current content survives.
+            self.beginResetModel()
+            self._start, self._count = 0, 0
+            for values in rows[-self._capacity:]:
+                self._store(values)
+            self.endResetModel()
+            self.rowsFlushed.emit(self._capacity)
+            return
+
+        overflow = self._count + len(rows) - self._capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self._start = (self._start + overflow) % self._capacity
+            self._count -= overflow
+            self.endRemoveRows()
+
+        self.beginInsertRows(QModelIndex(), self._count, self._count + len(rows) - 1)
+        for values in rows:
+            self._store(values)
+        self.endInsertRows()
+        self.rowsFlushed.emit(len(rows))
+
+    def clear(self):
+        """
+        Removes all rows, including pending ones.
+        """
+        self._timer.stop()
+        self.beginResetModel()
+        self._pending = []
+        self._start, self._count = 0, 0
+        self._columns = [[None] * self._capacity for _ in self._headers]
+        self.endResetModel()
+
+    def _store(self, values):
+        physical = (self._start + self._count) % self._capacity
+        for column, value in enumerate(values):
+            self._columns[column][physical] = value
+        self._count += 1
+
+
+def attachTableModel(view, model, follow=True):
+    """
+    Sets a model on a QTableView and optionally keeps the newest row in view.
+
+    :param view: The QTableView.
+    :param model: The model, e.g. a DetectionTableModel.
+    :param follow: If True, the view scrolls to the bottom once per flushed batch.
+    """
+    view.setModel(model)
+    if follow and hasattr(model, 'rowsFlushed'):
+        model.rowsFlushed.connect(lambda count: view.scrollToBottom())
+
+
+class ArrayTableModel(QAbstractTableModel):
+    """
+    A table model backed by NumPy column buffers, intended for very large detection histories.
+
+    Each column is a NumPy array (optionally with a fixed number of components per row, e.g. 4 for boxes). Batches of
+    rows are appended as arrays, handed to the views at a fixed UI rate, and formatted as text only in data(), i.e.
+    only for the rows a view actually displays. Use ArrayProxyModel to sort and filter without touching Python objects.
+
+    Signals:
+        rowsFlushed (int): Emitted after a batch of rows has been handed to the views, with the number of rows.
+    """
+
+    rowsFlushed = Signal(int)
+
+    def __init__(self, columns, max_rows=None, update_rate=10, alignment=Qt.AlignCenter, labels=None, precision=2,
+                 parent=None):
+        """
+        Initializes the model.
+
+        :param columns: A list of (header, dtype) or (header, dtype, components) tuples, one per column.
+        :param max_rows: The maximum number of rows kept, or None for no limit. The oldest rows are dropped first.
+        :param update_rate: How many times per second pending rows are handed to the views. 0 flushes them on the next
+                            event loop iteration.
+        :param alignment: The text alignment of the cells.
+        :param labels: Optional class names. Integer columns whose header contains 'class' display the name.
+        :param precision: The number of decimals shown for floating point values.
+        :param parent: The parent QObject. Default is None.
+        """
+        super().__init__(parent)
+        self._headers = [column[0] for column in columns]
+        self._dtypes = [np.dtype(column[1]) for column in columns]
+        self._shapes = [tuple(column[2:3]) for column in columns]
+        self._max_rows = max_rows
+        self._alignment = alignment
+        self._labels = list(labels) if labels is not None else None
+        self._precision = precision
+        self._formatters = {}
+        self._capacity = 0
+        self._arrays = [np.empty((0,) + shape, dtype) for shape, dtype in zip(self._shapes, self._dtypes)]
+        self._start = 0
+        self._count = 0
+        self._pending = []
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(int(1000 / update_rate) if update_rate else 0)
+        self._timer.timeout.connect(self.flush)
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            column = index.column()
+            return self.formatValue(column, self._arrays[column][self._start + index.row()])
+        if role == Qt.TextAlignmentRole:
+            return int(self._alignment)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self._headers):
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+
+    # Formatting
+
+    def setFormatter(self, column, formatter):
+        """
+        Sets a custom formatter for a column.
+
+        :param column: The column.
+        :param formatter: A callable taking the raw value (a NumPy scalar or 1-D array) and returning the cell text.
+        """
+        self._formatters[column] = formatter
+
+    def formatValue(self, column, value):
+        """
+        Formats a raw value of a column as cell text.
+
+        :param column: The column.
+        :param value: The raw value.
+        :return: The cell text.
+        """
+        formatter = self._formatters.get(column)
+        if formatter is not None:
+            return formatter(value)
+        kind = self._dtypes[column].kind
+        if self._shapes[column]:
+            if kind == 'f':
+                return ",".join(f"{x:.{self._precision}f}" for x in value)
+            return ",".join(map(str, value.tolist()))
+        if kind == 'f':
+            return f"{value:.{self._precision}f}"
+        if kind in 'iu' and self._labels is not None and 'class' in self._headers[column].lower():
+            return self._labels[int(value)] if 0 <= value < len(self._labels) else str(value)
+        return str(value)
+
+    # Data access
+
+    def columnArray(self, column):
+        """
+        Gets the values of a column as an array view. The view is invalidated by the next flush.
+
+        :param column: The column.
+        :return: An array with one entry per row.
+        """
+        return self._arrays[column][self._start:self._start + self._count]
+
+    def pendingCount(self):
+        """
+        Gets the number of rows waiting for the next flush.
+
+        :return: The number of pending rows.
+        """
+        return sum(len(batch[0]) for batch in self._pending)
+
+    def appendArrays(self, *arrays):
+        """
+        Queues a batch of rows given column by column. The rows become visible at the next flush.
+
+        :param arrays: One array-like per column, all with the same number of rows.
+        """
+        if len(arrays) != len(self._headers):
+            raise ValueError(f"Expected {len(self._headers)} arrays, got {len(arrays)}.")
+        batch = [np.asarray(array, dtype).reshape((-1,) + shape)
+                 for array, dtype, shape in zip(arrays, self._dtypes, self._shapes)]
+        if len({len(array) for array in batch}) != 1:
+            raise ValueError("All arrays must have the same number of rows.")
+        if len(batch[0]):
+            self._pending.append(batch)
+            if not self._timer.isActive():
+                self._timer.start()
+
+    def appendRow(self, *values):
+        """
+        Queues a single row. Prefer appendArrays for batches.
+
+        :param values: One value per column.
+        """
+        self.appendArrays(*([value] for value in values))
+
+    def flush(self):
+        """
+        Hands all pending rows to the views in one batch, dropping the oldest rows if the limit is exceeded.
+        """
+        self._timer.stop()
+        batches, self._pending = self._pending, []
+        if not batches:
+            return
+        new = [np.concatenate(parts) for parts in zip(*batches)]
+        count = len(new[0])
+
+        if self._max_rows is not None and count >= self._max_rows:
+            self.beginResetModel()
+            self._start, self._count = 0, 0
+            self._write([array[-self._max_rows:] for array in new])
+            self.endResetModel()
+            self.rowsFlushed.emit(self._count)
+            return
+
+        overflow = self._count + count - self._max_rows if self._max_rows is not None else 0
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self._start += overflow
+            self._count -= overflow
+            self.endRemoveRows()
+
+        self.beginInsertRows(QModelIndex(), self._count, self._count + count - 1)
+        self._write(new)
+        self.endInsertRows()
+        self.rowsFlushed.emit(count)
+
+    def clear(self):
+        """
+        Removes all rows, including pending ones.
+        """
+        self._timer.stop()
+        self.beginResetModel()
+        self._pending = []
+        self._start, self._count = 0, 0
+        self.endResetModel()
+
+    def _write(self, new):
+        """
+        Copies new rows behind the live rows, compacting or growing the buffers when they run out of space.
+        """
+        count = len(new[0])
+        needed = self._count + count
+        if self._start + needed > self._capacity:
+            if needed <= self._capacity // 2 or (self._max_rows is not None and needed <= self._capacity):
+                # Enough room once the dropped rows at the front are reclaimed.
+                for array in self._arrays:
+                    array[:self._count] = array[self._start:self._start + self._count]
+            else:
+                capacity = max(needed * 2, 1024)
+                if self._max_rows is not None:
+                    capacity = max(min(capacity, self._max_rows * 2), needed)
+                arrays = []
+                for array, shape, dtype in zip(self._arrays, self._shapes, self._dtypes):
+                    grown = np.empty((capacity,) + shape, dtype)
+                    grown[:self._count] = array[self._start:self._start + self._count]
+                    arrays.append(grown)
+                self._arrays, self._capacity = arrays, capacity
+            self._start = 0
+        end = self._start + self._count
+        for array, values in zip(self._arrays, new):
+            array[end:end + count] = values
+        self._count = needed
+
+
+class ArrayProxyModel(QAbstractProxyModel):
+    """
+    A sorting and filtering proxy for ArrayTableModel that works on the column arrays.
+
+    Sorting uses a stable argsort of the column values (the first component for multi-component columns), filtering
+    uses boolean masks. Rows appended to the source are merged into the current order with searchsorted instead of
+    resorting everything, and rows dropped from the front of the source are removed with a single mask.
+
+    Every source change is announced before the source changes: unsorted and unfiltered, the proxy forwards the row
+    insertions and removals; otherwise it brackets the change with layoutAboutToBeChanged/layoutChanged and moves the
+    persistent indexes (selection, current item) along with their source rows.
+    """
+
+    def __init__(self, parent=None):
+        """
+        Initializes the proxy.
+
+        :param parent: The parent QObject. Default is None.
+        """
+        super().__init__(parent)
+        self._order = None  # source rows in ascending key order, or None for the identity mapping
+        self._keys = None  # sort keys matching _order, or None when not sorted
+        self._inverse = None
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+        self._filter = None
+        self._layout_pending = None  # (persistent indexes, their (source row, column)) during a layout change
+
+    def setSourceModel(self, model):
+        """
+        Sets the ArrayTableModel to sort and filter.
+
+        :param model: The source model.
+        """
+        old = self.sourceModel()
+        if old is not None:
+            old.rowsAboutToBeInserted.disconnect(self._sourceRowsAboutToBeInserted)
+            old.rowsInserted.disconnect(self._sourceRowsInserted)
+            old.rowsAboutToBeRemoved.disconnect(self._sourceRowsAboutToBeRemoved)
+            old.rowsRemoved.disconnect(self._sourceRowsRemoved)
+            old.modelAboutToBeReset.disconnect(self.beginResetModel)
+            old.modelReset.disconnect(self._sourceReset)
+            old.dataChanged.disconnect(self._sourceDataChanged)
+        self.beginResetModel()
+        super().setSourceModel(model)
+        model.rowsAboutToBeInserted.connect(self._sourceRowsAboutToBeInserted)
+        model.rowsInserted.connect(self._sourceRowsInserted)
+        model.rowsAboutToBeRemoved.connect(self._sourceRowsAboutToBeRemoved)
+        model.rowsRemoved.connect(self._sourceRowsRemoved)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self._sourceReset)
+        model.dataChanged.connect(self._sourceDataChanged)
+        self._compute()
+        self.endResetModel()
+
+    # Qt proxy interface
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < self.rowCount() and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self._order is None else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and self.sourceModel() is not None:
+            return self.sourceModel().headerData(section, orientation, role)
+        return super().headerData(section, orientation, role)
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid() or self.sourceModel() is None:
+            return QModelIndex()
+        return self.sourceModel().index(self.sourceRow(proxy_index.row()), proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        if self._order is None:
+            return self.index(source_index.row(), source_index.column())
+        if self._inverse is None:
+            self._inverse = np.full(self.sourceModel().rowCount(), -1, np.int64)
+            self._inverse[self._order] = np.arange(len(self._order))
+        row = int(self._inverse[source_index.row()])
+        if row < 0:
+            return QModelIndex()
+        if self._sort_order == Qt.DescendingOrder:
+            row = len(self._order) - 1 - row
+        return self.index(row, source_index.column())
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Sorts the rows by a column. Called by views with sorting enabled.
+
+        :param column: The column, or -1 to restore the source order.
+        :param order: Qt.AscendingOrder or Qt.DescendingOrder.
+        """
+        self._sort_column, self._sort_order = column, order
+        self._relayout(self._compute)
+
+    # Filtering
+
+    def setRowFilter(self, mask_func):
+        """
+        Sets a row filter.
+
+        :param mask_func: A callable taking the source model and a row slice, and returning a boolean mask for the
+                          rows in the slice, e.g. lambda model, rows: model.columnArray(2)[rows] > 0.5.
+                          None removes the filter.
+        """
+        self._filter = mask_func
+        self._relayout(self._compute)
+
+    def setValueRange(self, column, low=None, high=None):
+        """
+        Keeps only rows whose value in a column lies within [low, high].
+
+        :param column: The column.
+        :param low: The lower bound, or None.
+        :param high: The upper bound, or None.
+        """
+        def mask(model, rows):
+            values = model.columnArray(column)[rows]
+            keep = np.ones(len(values), bool)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            return keep
+        self.setRowFilter(mask if low is not None or high is not None else None)
+
+    def setValueFilter(self, column, values):
+        """
+        Keeps only rows whose value in a column is one of the given values, e.g. a set of class ids.
+
+        :param column: The column.
+        :param values: The accepted values, or None to remove the filter.
+        """
+        if values is None:
+            self.setRowFilter(None)
+        else:
+            accepted = np.asarray(list(values))
+            self.setRowFilter(lambda model, rows: np.isin(model.columnArray(column)[rows], accepted))
+
+    def sourceRow(self, row):
+        """
+        Maps a proxy row to a source row.
+
+        :param row: The proxy row.
+        :return: The source row.
+        """
+        if self._order is None:
+            return row
+        if self._sort_order == Qt.DescendingOrder:
+            row = len(self._order) - 1 - row
+        return int(self._order[row])
+
+    # Internal helpers
+
+    def _sortKeys(self, rows):
+        values = self.sourceModel().columnArray(self._sort_column)[rows]
+        return values[:, 0] if values.ndim > 1 else values
+
+    def _compute(self):
+        """
+        Recomputes the order of all source rows from scratch.
+        """
+        self._inverse = None
+        source = self.sourceModel()
+        sorted_ = 0 <= self._sort_column < source.columnCount()
+        if not sorted_ and self._filter is None:
+            self._order, self._keys = None, None
+            return
+        rows = np.arange(source.rowCount())
+        if self._filter is not None:
+            rows = rows[self._filter(source, slice(0, len(rows)))]
+        if sorted_:
+            keys = self._sortKeys(rows)
+            order = np.argsort(keys, kind='stable')
+            self._order, self._keys = rows[order], keys[order]
+        else:
+            self._order, self._keys = rows, None
+
+    def _relayout(self, update):
+        """
+        Applies an update of the row order while keeping persistent indexes (selection, current item) valid.
+        """
+        self._beginRelayout()
+        update()
+        self._endRelayout()
+
+    def _beginRelayout(self):
+        """
+        Announces a layout change and remembers the source positions of the persistent indexes, while the proxy
+        mapping still matches the source.
+        """
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        sources = [(self.sourceRow(index.row()), index.column()) if index.isValid() else None for index in persistent]
+        self._layout_pending = (persistent, sources)
+
+    def _endRelayout(self, moved=None):
+        """
+        Moves the persistent indexes to the new positions of their source rows and completes the layout change.
+
+        :param moved: A callable mapping an old source row to its new source row, or to -1 if the row was removed.
+                      Default is None (source rows are unchanged).
+        """
+        persistent, sources = self._layout_pending
+        self._layout_pending = None
+        source = self.sourceModel()
+        targets = []
+        for position in sources:
+            row = -1 if position is None else position[0] if moved is None else moved(position[0])
+            targets.append(self.mapFromSource(source.index(row, position[1])) if row >= 0 else QModelIndex())
+        self.changePersistentIndexList(persistent, targets)
+        self.layoutChanged.emit()
+
+    def _sourceReset(self):
+        self._compute()
+        self.endResetModel()
+
+    def _sourceRowsAboutToBeInserted(self, parent, first, last):
+        if self._order is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+        else:
+            self._beginRelayout()
+
+    def _sourceRowsInserted(self, parent, first, last):
+        if self._layout_pending is None:
+            self.endInsertRows()
+            return
+
+        # ArrayTableModel only appends rows, so the new rows are merged without shifting the existing ones.
+        self._inverse = None
+        rows = np.arange(first, last + 1)
+        if self._filter is not None:
+            rows = rows[self._filter(self.sourceModel(), slice(first, last + 1))]
+        if self._keys is None:
+            self._order = np.concatenate([self._order, rows])
+        else:
+            keys = self._sortKeys(rows)
+            order = np.argsort(keys, kind='stable')
+            rows, keys = rows[order], keys[order]
+            positions = np.searchsorted(self._keys, keys, side='right')
+            self._order = np.insert(self._order, positions, rows)
+            self._keys = np.insert(self._keys, positions, keys)
+        self._endRelayout()
+
+    def _sourceRowsAboutToBeRemoved(self, parent, first, last):
+        if self._order is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+        else:
+            self._beginRelayout()
+
+    def _sourceRowsRemoved(self, parent, first, last):
+        if self._layout_pending is None:
+            self.endRemoveRows()
+            return
+
+        # ArrayTableModel only removes rows from the front.
+        count = last - first + 1
+        self._inverse = None
+        keep = self._order > last
+        self._order = self._order[keep] - count
+        if self._keys is not None:
+            self._keys = self._keys[keep]
+        self._endRelayout(lambda row: row - count if row > last else row if row < first else -1)
+
+    def _sourceDataChanged(self, top_left, bottom_right, roles=()):
+        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columnCount() - 1))
@@ -0,0 +1,254 @@
+# QtFusion, AGPL-3.0 license
+"""
+Per-window index of the widget tree.
+
+A WidgetIndex maps every widget of a window to the layout that holds it and caches the results of typed child
+queries, so findContainLayout, replaceWidget and set_buttons_enabled do not walk the layouts or the object tree on
+every call. The index is built once and kept current through ChildAdded and ChildRemoved events of the containers,
+i.e. the widgets that own a layout or have child widgets: removals are applied directly, additions mark the layout
+map for a rebuild on the next lookup (a widget is reparented before it is placed in a layout, so its position is not
+known yet when the event arrives). Children added to a widget that had neither a layout nor child widgets when the
+index was built are not seen by children() until the next rebuild or invalidate().
+
+Moving a widget between layouts of the same parent, or adding an already parented widget to a layout, sends no child
+event, so every cached layout is checked with QLayout.indexOf() before it is returned. A widget that is not found is
+looked up in the layout of its parent only, the one layout that can hold it, and a widget that was never added to a
+layout (Qt.WA_LaidOut is not set) is answered without any search, so failing lookups do not rebuild the index.
+"""
+from PySide6.QtCore import QEvent, QObject, Qt
+from PySide6.QtWidgets import QWidget
+
+
+class WidgetIndex(QObject):
+    """
+    An index of the widgets, layouts and typed child lists of one window.
+    """
+
+    def __init__(self, root):
+        """
+        Initializes the index and watches the widget tree of 'root'.
+
+        :param root: The window (or any widget) whose descendants are indexed.
+        """
+        super().__init__(root)
+        self.root = root
+        self._layouts = {}  # widget -> layout directly containing it
+        self._children = {}  # widget type -> list of descendants of that type
+        self._watched = set()
+        self._dirty = True
+        self._suspended = False
+
+    def layoutOf(self, widget):
+        """
+        Gets the layout directly containing a widget.
+
+        :param widget: The widget.
+        :return: The layout, or None if the widget is not in a layout of the indexed tree.
+        """
+        if self._dirty:
+            self._rebuild()
+        layout = self._layouts.get(widget)
+        if layout is not None and _holds(layout, widget):
+            return layout
+        self._layouts.pop(widget, None)
+        if not widget.testAttribute(Qt.WA_LaidOut):
+            return None
+        parent = widget.parentWidget()
+        if parent is None or parent.layout() is None or not _descends(parent, self.root):
+            return None
+        layout = _findLayout(parent.layout(), widget)
+        if layout is not None:
+            self._layouts[widget] = layout
+        return layout
+
+    def locate(self, widget):
+        """
+        Gets the layout directly containing a widget and the position of the widget in it.
+
+        :param widget: The widget.
+        :return: A (layout, index) tuple, or (None, -1) if the widget is not in a layout of the indexed tree.
+        """
+        layout = self.layoutOf(widget)
+        if layout is None:
+            return None, -1
+        return layout, layout.indexOf(widget)
+
+    def children(self, widget_type):
+        """
+        Gets all descendants of the indexed widget of a given type, like findChildren, from a cache.
+
+        :param widget_type: The widget class.
+        :return: The list of widgets. The list is shared between callers and must not be modified.
+        """
+        children = self._children.get(widget_type)
+        if children is None:
+            if self._dirty:
+                self._rebuild()
+            children = self._children[widget_type] = self.root.findChildren(widget_type)
+        return children
+
+    def invalidate(self):
+        """
+        Drops all cached information; it is rebuilt on the next lookup.
+        """
+        self._dirty = True
+        self._children.clear()
+
+    def replaceWidgets(self, replacements, properties=("minimumSize", "maximumSize", "objectName", "styleSheet")):
+        """
+        Replaces many widgets with instances of derived classes in one pass.
+
+        Repaints of the window are suspended while the widgets are swapped, and the index is updated directly instead of
+        being rebuilt.
+
+        :param replacements: An iterable of (original widget, derived class) pairs.
+        :param properties: The properties copied from each original widget to its replacement.
+        :return: The list of new widgets, in the order of 'replacements'.
+        """
+        replacements = list(replacements)
+        located = []
+        for original, derived_class in replacements:
+            layout = self.layoutOf(original)
+            if layout is None:
+                raise Exception("Original widget is not in a layout, cannot replace widget.")
+            located.append((original, derived_class, layout))
+
+        window = self.root.window()
+        updates_enabled = window.updatesEnabled()
+        window.setUpdatesEnabled(False)
+        self._suspended = True
+        derived_widgets = []
+        try:
+            for original, derived_class, layout in located:
+                derived = derived_class()
+                _copyProperties(original, derived, properties)
+                if layout.replaceWidget(original, derived, Qt.FindDirectChildrenOnly) is None:
+                    derived.deleteLater()
+                    self._dirty = True
+                    raise Exception("Original widget is no longer in its layout, cannot replace widget.")
+                self._layouts.pop(original, None)
+                self._layouts[derived] = layout
+                if derived.layout() is not None or derived.findChildren(QWidget, "", Qt.FindDirectChildrenOnly):
+                    self._watch(derived)
+                original.deleteLater()
+                derived_widgets.append(derived)
+        finally:
+            self._suspended = False
+            self._children.clear()
+            window.setUpdatesEnabled(updates_enabled)
+        return derived_widgets
+
+    def eventFilter(self, obj, event):
+        """
+        Keeps the index current when widgets are added to or removed from the watched tree.
+
+        :param obj: The watched widget.
+        :param event: The event delivered to it.
+        :return: False, so the event is always processed further.
+        """
+        event_type = event.type()
+        if event_type == QEvent.ChildAdded and not self._suspended:
+            if isinstance(event.child(), QWidget):
+                self._children.clear()
+                self._dirty = True
+        elif event_type == QEvent.ChildRemoved and not self._suspended:
+            # A child being destroyed is no longer a QWidget at this point, so its type is not checked.
+            child = event.child()
+            self._children.clear()
+            self._layouts.pop(child, None)
+            self._watched.discard(child)
+        return False
+
+    def _watch(self, widget):
+        if widget not in self._watched:
+            self._watched.add(widget)
+            widget.installEventFilter(self)
+
+    def _rebuild(self):
+        """
+        Walks the widget tree once, mapping every widget to its layout and watching the containers for child events.
+        """
+        self._layouts.clear()
+        widgets = self.root.findChildren(QWidget)
+        parents = {widget.parentWidget() for widget in widgets}
+        self._watch(self.root)
+        for widget in [self.root] + widgets:
+            layout = widget.layout()
+            if layout is not None:
+                self._watch(widget)
+                self._indexLayout(layout)
+            elif widget in parents:
+                self._watch(widget)
+        self._dirty = False
+
+    def _indexLayout(self, layout):
+        for i in range(layout.count()):
+            item = layout.itemAt(i)
+            if item.widget() is not None:
+                self._layouts[item.widget()] = layout
+            elif item.layout() is not None:
+                self._indexLayout(item.layout())
+
+
+def widgetIndex(widget):
+    """
+    Gets the WidgetIndex of the window containing a widget, creating it on first use.
+
+    :param widget: Any widget of the window.
+    :return: The shared WidgetIndex of the window.
+    """
+    window = widget.window()
+    index = getattr(window, '_widgetIndex', None)
+    if index is None:
+        index = window._widgetIndex = WidgetIndex(window)
+    return index
+
+
+def _descends(widget, root):
+    """
+    Checks whether a widget is 'root' or one of its descendants, including those in child windows.
+    """
+    while widget is not None:
+        if widget is root:
+            return True
+        widget = widget.parentWidget()
+    return False
+
+
+def _findLayout(layout, widget):
+    """
+    Finds the layout or nested layout directly holding a widget.
+    """
+    if layout.indexOf(widget) >= 0:
+        return layout
+    for i in range(layout.count()):
+        child = layout.itemAt(i).layout()
+        if child is not None:
+            found = _findLayout(child, widget)
+            if found is not None:
+                return found
+    return None
+
+
+def _holds(layout, widget):
+    """
+    Checks whether a layout directly holds a widget. A deleted layout holds nothing.
+    """
+    try:
+        return layout.indexOf(widget) >= 0
+    except RuntimeError:
+        return False
+
+
+def _copyProperties(original, derived, properties):
+    """
+    Copies Qt properties from one widget to another.
+    """
+    meta = original.metaObject()
+    for property_name in properties:
+        index = meta.indexOfProperty(property_name)
+        if index == -1:
+            raise Exception(f"Original widget does not have property '{property_name}'.")
+        prop = meta.property(index)
+        if not prop.write(derived, prop.read(original)):
+            raise Exception(f"Failed to set property '{property_name}' on derived widget.")
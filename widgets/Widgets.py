@@ -82,6 +82,36 @@ class QMainWindow(FBaseWindow):
         """
         self.styles.set_named_style(self, style_name)
 
+    def setAppStyle(self, style_name='STYLE_TRANS'):
+        """
+        Apply a predefined style to the whole application instead of this window only.
+
+        Args:
+            style_name (str): The name of the predefined style to apply, or the path of a QSS file.
+
+        Returns:
+            bool: True if the style was applied, False if no QApplication instance exists yet.
+        """
+        return self.styles.set_app_style(style_name)
+
+    def setTheme(self, style_name='STYLE_TRANS', widget=None, detach_hidden=False):
+        """
+        Apply a predefined style to this window, or to one of its sub-trees.
+
+        The change is batched while updates are disabled, and the elapsed time is logged through the
+        'QtFusion.styles.Themes' logger. With detach_hidden, hidden QStackedWidget and QTabWidget pages are taken out
+        of the widget tree and styled when they are first shown (see ThemeApplier).
+
+        Args:
+            style_name (str): The name of the predefined style to apply, or the path of a QSS file.
+            widget (QWidget, optional): The root of the sub-tree to style. Defaults to this window.
+            detach_hidden (bool): Whether hidden pages are detached and styled on first show. Defaults to False.
+
+        Returns:
+            dict: The style name, scope, number of styled widgets and deferred pages, and elapsed milliseconds.
+        """
+        return self.styles.apply_theme(widget or self, style_name, detach_hidden)
+
     def setStyleText(self, style_text):
         """
         Apply a given style text to a widget.
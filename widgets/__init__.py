@@ -1,9 +1,14 @@
 # QtFusion, AGPL-3.0 license
-from .BaseFrame import (verbose_class, findContainLayout, replaceWidget, moveCenter, addTableItem, updateTable,
-                        fadeIn, zoomIn)
+from .BaseFrame import (verbose_class, findContainLayout, replaceWidget, replaceWidgets, moveCenter, addTableItem,
+                        updateTable, fadeIn, zoomIn)
 from .Widgets import QMainWindow, QLoginDialog, QImageLabel, QWindowCtrls, QMessageBox
+from .ChartWidgets import FBarChart
+from .Deferred import DeferredInit
+from .TableModels import DetectionTableModel, ArrayTableModel, ArrayProxyModel, attachTableModel
+from .WidgetIndex import WidgetIndex, widgetIndex
 
-__all__ = ("verbose_class", "findContainLayout", "replaceWidget", "moveCenter", "addTableItem", "updateTable",
-           "fadeIn", "zoomIn", "QMainWindow", "QLoginDialog",
-           "QImageLabel", "QWindowCtrls", "QMessageBox")
-
+__all__ = ("verbose_class", "findContainLayout", "replaceWidget", "replaceWidgets", "moveCenter", "addTableItem",
+           "updateTable", "fadeIn", "zoomIn", "QMainWindow", "QLoginDialog",
+           "QImageLabel", "QWindowCtrls", "QMessageBox", "DetectionTableModel", "ArrayTableModel",
+           "ArrayProxyModel", "attachTableModel", "FBarChart",
+           "WidgetIndex", "widgetIndex", "DeferredInit")